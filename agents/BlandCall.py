@@ -1,4 +1,4 @@
-import requests
+from utils.Transport import get_api_session
 import re
 import os
 import json
@@ -115,7 +115,7 @@ def call(recipient_no, task):
             "Content-Type": "application/json"
         }
 
-        response = requests.post("https://api.bland.ai/v1/calls", json=payload, headers=headers)
+        response = get_api_session().post("https://api.bland.ai/v1/calls", json=payload, headers=headers)
 
         if response.status_code == 200:
             return {
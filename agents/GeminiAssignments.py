@@ -17,6 +17,7 @@ from reportlab.pdfgen import canvas
 from pathlib import Path
 import re
 import textwrap
+from utils.Transport import configure_generativeai
 
 
 
@@ -65,7 +66,7 @@ def process_assignment(folder_path: str, completed_assignments_path:str, instruc
     """
     wait_for_download(folder_path)
 
-    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    configure_generativeai()
 
     model = genai.GenerativeModel(model_name=model_name)
 
@@ -3,11 +3,10 @@ import sys
 import subprocess
 import json
 import time
-import requests
-import tempfile
-import pygame
 import random
 from dotenv import load_dotenv
+from bot.jarvis_config import speak
+from utils.Transport import get_api_session
 
 DEBUG = True
 
@@ -28,17 +27,6 @@ if not api_key:
     print("Please create a .env file with your GEMINI_API_KEY")
     sys.exit(1)
 
-elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
-if not elevenlabs_api_key:
-    print("Error: ELEVENLABS_API_KEY not found in environment variables")
-    print("Please add it to your .env file")
-    sys.exit(1)
-
-CALLUM_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "MF3mGyEYCl7XYWbV9V6O")
-
-pygame.mixer.init()
-
-
 SPOTIFY_PATHS = [
     "C:\\Program Files\\WindowsApps\\SpotifyAB.SpotifyMusic_1.262.580.0_x64__zpdnekdrzrea0\\Spotify.exe",
     "C:\\Users\\{}\\AppData\\Roaming\\Spotify\\Spotify.exe".format(os.getenv('USERNAME')),
@@ -59,61 +47,6 @@ def get_process_state():
     return process_running
 
 
-def speak(text):
-    """Use ElevenLabs API to convert text to speech with Callum's voice and play it"""
-    print(f"JARVIS: {text}")
-
-    if not elevenlabs_api_key or elevenlabs_api_key == "your_elevenlabs_api_key_here":
-        print("No valid ElevenLabs API key. Skipping voice synthesis.")
-        return
-
-    url = f"https://api.elevenlabs.io/v1/text-to-speech/{CALLUM_VOICE_ID}"
-
-    headers = {
-        "Accept": "audio/mpeg",
-        "Content-Type": "application/json",
-        "xi-api-key": elevenlabs_api_key
-    }
-
-    data = {
-        "text": text,
-        "model_id": "eleven_monolingual_v1",
-        "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.8
-        }
-    }
-
-    try:
-        response = requests.post(url, json=data, headers=headers)
-
-        if response.status_code == 200:
-            temp_audio_path = os.path.join(tempfile.gettempdir(), f"jarvis_speech_{int(time.time())}.mp3")
-
-            with open(temp_audio_path, "wb") as temp_audio:
-                temp_audio.write(response.content)
-
-            try:
-                pygame.mixer.music.load(temp_audio_path)
-                pygame.mixer.music.play()
-
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)
-
-                try:
-                    pygame.mixer.music.unload()
-                    time.sleep(0.5)  # Give system time to release the file
-                    os.remove(temp_audio_path)
-                except Exception as e:
-                    print(f"Warning: Could not remove temp file: {e}")
-            except Exception as e:
-                print(f"Error playing audio: {e}")
-        else:
-            print(f"Error with ElevenLabs API: {response.status_code} - {response.text}")
-    except Exception as e:
-        print(f"Error using ElevenLabs API: {e}")
-
-
 def get_spotify_path():
     """Find the correct Spotify executable path"""
     for path in SPOTIFY_PATHS:
@@ -186,7 +119,7 @@ def process_command_with_gemini(user_input):
     }
 
     try:
-        response = requests.post(url, json=payload, headers=headers)
+        response = get_api_session().post(url, json=payload, headers=headers)
 
         if response.status_code != 200:
             print(f"Error with Gemini API: {response.status_code} - {response.text}")
@@ -349,18 +282,21 @@ def close_spotify():
         return True
 
 
+SPOTIFY_RESPONSES = {
+    "open": "Opening Spotify for you, sir. Ready to enhance your auditory experience.",
+    "close": "Shutting down Spotify as requested. Is there anything else you need?",
+    "play": "Playing music for you now, sir.",
+    "pause": "Pausing your music. The silence can be deafening, can't it?",
+    "next": "Skipping to the next track. I hope this one suits your taste better.",
+    "previous": "Going back to the previous track. Good choice, sir.",
+    "repeat": "Toggling repeat mode. Some things are worth experiencing more than once."
+}
+
+SPOTIFY_DEFAULT_RESPONSE = "Command executed, sir. Would there be anything else?"
+
+
 def jarvis_response(command, song=None, artist=None, volume=None):
     """Generate a JARVIS-like response based on the command"""
-    responses = {
-        "open": "Opening Spotify for you, sir. Ready to enhance your auditory experience.",
-        "close": "Shutting down Spotify as requested. Is there anything else you need?",
-        "play": "Playing music for you now, sir.",
-        "pause": "Pausing your music. The silence can be deafening, can't it?",
-        "next": "Skipping to the next track. I hope this one suits your taste better.",
-        "previous": "Going back to the previous track. Good choice, sir.",
-        "repeat": "Toggling repeat mode. Some things are worth experiencing more than once."
-    }
-
     if command == "volume" and volume is not None:
         if volume == 0:
             return "Muting the audio, sir. Silence can be golden at times."
@@ -389,7 +325,7 @@ def jarvis_response(command, song=None, artist=None, volume=None):
         else:
             return f"Playing {song} for you now. Enjoy, sir."
 
-    return responses.get(command, "Command executed, sir. Would there be anything else?")
+    return SPOTIFY_RESPONSES.get(command, SPOTIFY_DEFAULT_RESPONSE)
 
 
 def control_spotify(command_data, user_query=""):
@@ -415,12 +351,9 @@ def control_spotify(command_data, user_query=""):
         return open_spotify()
 
     elif command == "close":
-        result = close_spotify()
-        if result:
-            speak("Shutting down Spotify assistant as well. Goodbye, sir.")
-            time.sleep(1)
-            sys.exit(0)
-        return result
+        # Only closes the app; leaving the interactive assistant is run_interactive_mode's call,
+        # since this also runs inside JARVIS' tool threads
+        return close_spotify()
 
     elif command == "volume" and volume_level is not None:
         try:
@@ -588,8 +521,12 @@ def control_spotify(command_data, user_query=""):
     return True
 
 
-def process_spotify_command(text):
-    """Process a user command for Spotify - function that can be called from frontend"""
+def process_spotify_command(text, command_data=None):
+    """
+    Process a user command for Spotify - function that can be called from frontend.
+    command_data skips the Gemini interpretation step when the command is already known
+    (e.g. {"command": "pause"} from the local intent router).
+    """
     global process_running
 
     try:
@@ -599,7 +536,8 @@ def process_spotify_command(text):
             process_running = False
             return {"status": "success", "message": "Shutdown complete", "command": "exit"}
 
-        command_data = process_command_with_gemini(text)
+        if command_data is None:
+            command_data = process_command_with_gemini(text)
         debug_print(f"Gemini response: {command_data}")
 
         result = control_spotify(command_data, text)
@@ -642,10 +580,13 @@ def run_interactive_mode():
 
             if result["command"] == "exit":
                 break
+            if result["command"] == "close" and result["status"] == "success":
+                speak("Shutting down Spotify assistant as well. Goodbye, sir.", wait=True)
+                break
 
         except KeyboardInterrupt:
             print("\nDetected keyboard interrupt. Shutting down...")
-            speak("Emergency shutdown initiated. Goodbye, sir.")
+            speak("Emergency shutdown initiated. Goodbye, sir.", wait=True)
             break
         except Exception as e:
             print(f"Unexpected error: {e}")
@@ -0,0 +1,120 @@
+"""
+Compare speech recognition backends on recorded WAV fixtures.
+
+Every fixture is a pair: <name>.wav (mono, any sample rate) and <name>.txt with the
+reference transcript. For each backend the script reports load time, mean and p95
+transcription latency and word error rate against the references.
+
+fetch_fixtures.py creates the fixtures listed in fixtures/manifest.json; see "ASR
+benchmark" in the README for setting up the vosk model.
+
+Usage (from the repository root):
+    python benchmarks/fetch_fixtures.py --record
+    python benchmarks/asr_benchmark.py --fixtures benchmarks/fixtures --backends google vosk whisper
+"""
+import os
+import re
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import speech_recognition as sr
+from utils.SpeechToText import BACKENDS, load_asr_backend
+
+
+def normalize_words(text):
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_error_rate(reference, hypothesis):
+    """Levenshtein distance over words divided by the reference length."""
+    ref = normalize_words(reference)
+    hyp = normalize_words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def load_fixtures(fixtures_dir):
+    fixtures = []
+    for name in sorted(os.listdir(fixtures_dir)):
+        if not name.lower().endswith(".wav"):
+            continue
+        transcript_path = os.path.join(fixtures_dir, name[:-4] + ".txt")
+        if not os.path.exists(transcript_path):
+            print(f"Skipping {name}: no {os.path.basename(transcript_path)}")
+            continue
+        with sr.AudioFile(os.path.join(fixtures_dir, name)) as source:
+            audio = sr.Recognizer().record(source)
+        with open(transcript_path, "r", encoding="utf-8") as f:
+            fixtures.append((name, audio, f.read().strip()))
+    return fixtures
+
+
+def run_backend(name, fixtures):
+    start = time.perf_counter()
+    backend = load_asr_backend(name)
+    load_time = time.perf_counter() - start
+
+    latencies = []
+    errors = []
+    for fixture_name, audio, reference in fixtures:
+        start = time.perf_counter()
+        try:
+            hypothesis = backend.transcribe(audio)
+        except (sr.UnknownValueError, sr.RequestError):
+            hypothesis = ""
+        latencies.append(time.perf_counter() - start)
+        errors.append(word_error_rate(reference, hypothesis))
+        print(f"  [{name}] {fixture_name}: {latencies[-1] * 1000:.0f} ms, WER {errors[-1]:.2f} -> '{hypothesis}'")
+
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(round(0.95 * (len(latencies) - 1))))]
+    return {
+        "backend": name,
+        "load_s": load_time,
+        "mean_ms": statistics.mean(latencies) * 1000,
+        "p95_ms": p95 * 1000,
+        "wer": statistics.mean(errors)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=os.path.join(os.path.dirname(__file__), "fixtures"))
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.fixtures):
+        print(f"Fixture directory {args.fixtures} does not exist. Record some <name>.wav + <name>.txt pairs first.")
+        return 1
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        print(f"No fixtures found in {args.fixtures}. Run benchmarks/fetch_fixtures.py (--record) first.")
+        return 1
+
+    results = []
+    for name in args.backends:
+        try:
+            results.append(run_backend(name, fixtures))
+        except Exception as e:
+            print(f"  [{name}] could not run: {e}")
+
+    print(f"\n{len(fixtures)} fixture(s)")
+    print(f"{'backend':<10}{'load (s)':>10}{'mean (ms)':>12}{'p95 (ms)':>12}{'WER':>8}")
+    for r in results:
+        print(f"{r['backend']:<10}{r['load_s']:>10.2f}{r['mean_ms']:>12.0f}{r['p95_ms']:>12.0f}{r['wer']:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Create the fixtures asr_benchmark.py reads, from fixtures/manifest.json.
+
+Entries with a "url" are public recordings (Harvard sentences from the Open Speech
+Repository) and are downloaded. The others are short JARVIS commands you record
+yourself with --record: what matters most is how the backends do on your voice and
+your microphone. Fixtures that already exist are left alone.
+
+Usage (from the repository root):
+    python benchmarks/fetch_fixtures.py             # download the public clips
+    python benchmarks/fetch_fixtures.py --record    # and record the command phrases
+"""
+import os
+import sys
+import json
+import argparse
+import requests
+import speech_recognition as sr
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+RECORD_SAMPLE_RATE = 16000
+
+
+def write_transcript(fixtures_dir, entry):
+    with open(os.path.join(fixtures_dir, entry["name"] + ".txt"), "w", encoding="utf-8") as f:
+        f.write(entry["text"] + "\n")
+
+
+def download(entry, wav_path):
+    response = requests.get(entry["url"], timeout=30)
+    response.raise_for_status()
+    with open(wav_path, "wb") as f:
+        f.write(response.content)
+
+
+def record(entry, wav_path, recognizer, source):
+    input(f"\nPress Enter, then say: \"{entry['text']}\"")
+    audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
+    with open(wav_path, "wb") as f:
+        f.write(audio.get_wav_data())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR)
+    parser.add_argument("--record", action="store_true", help="record the entries that have no url")
+    args = parser.parse_args()
+
+    with open(os.path.join(args.fixtures, "manifest.json"), "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    for entry in manifest:
+        write_transcript(args.fixtures, entry)
+
+    missing = [entry for entry in manifest
+               if not os.path.exists(os.path.join(args.fixtures, entry["name"] + ".wav"))]
+    to_record = [entry for entry in missing if not entry.get("url")]
+    failed = 0
+    for entry in missing:
+        if entry not in to_record:
+            wav_path = os.path.join(args.fixtures, entry["name"] + ".wav")
+            try:
+                download(entry, wav_path)
+                print(f"Downloaded {entry['name']}")
+            except requests.RequestException as e:
+                print(f"Could not download {entry['name']}: {e}")
+                failed += 1
+
+    if to_record and not args.record:
+        print(f"{len(to_record)} command phrase(s) not recorded yet, run with --record to record them")
+    elif to_record:
+        recognizer = sr.Recognizer()
+        with sr.Microphone(sample_rate=RECORD_SAMPLE_RATE) as source:
+            print("Measuring background noise, stay quiet for a second...")
+            recognizer.adjust_for_ambient_noise(source, duration=1)
+            for entry in to_record:
+                wav_path = os.path.join(args.fixtures, entry["name"] + ".wav")
+                try:
+                    record(entry, wav_path, recognizer, source)
+                    print(f"Recorded {entry['name']}")
+                except sr.WaitTimeoutError:
+                    print(f"Heard nothing for {entry['name']}, skipped")
+                    failed += 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
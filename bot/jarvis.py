@@ -3,13 +3,12 @@ import json
 import re
 from datetime import datetime
 import PyPDF2
-from google import genai
 from google.genai import types
 from utils.BrowserController import (
-    setup_browser_with_profile, search, collect_search_links, summarize_page, click_element_by_text,
-    click_search_result_link, login_truman, click_youtube_video, go_back, navigate_to_url, close_tab
+    setup_browser_with_profile, search, collect_search_links, click_element_by_text,
+    click_search_result_link, login_truman, click_youtube_video, go_back, go_forward, scroll_down, scroll_up,
+    navigate_to_url, close_tab
 )
-import keyboard
 import random
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
@@ -20,21 +19,63 @@ from dotenv import load_dotenv
 from agents.GeminiAssignments import process_assignment
 import time
 import urllib
-from jarvis_config import speak, function_declarations, remember_info, recall_info
-from ai_tools.SpotifyAI import process_spotify_command
+from jarvis_config import speak, stop_speaking, warm_speech_cache, function_declarations, remember_info, recall_info
+from ai_tools.SpotifyAI import process_spotify_command, SPOTIFY_RESPONSES, SPOTIFY_DEFAULT_RESPONSE
 from ai_tools.Email import send_email
 import speech_recognition as sr
 from agents.BlandCall import call
+from utils.BrowserPool import get_browser_pool, quit_driver_async, SharedBrowser
+from utils.PageFetcher import summarize_pages
+from utils.HttpFetcher import get_fetch_stats
+from utils.PageCache import get_page_cache
+from utils.SpeechToText import get_asr_backend
+from utils.VoiceCapture import get_microphone_stream, make_vad, listen_and_transcribe, dialog_lock, PRE_ROLL_MS
+from utils.InputTrigger import make_trigger, QUIT
+from utils.WakeWord import start_wake_word, WakeWordDetector
+from utils.KnowledgeBase import get_knowledge_base, KNOWLEDGEBASE_FILE, CONTACTS_FILE
+from utils.KnowledgeRetrieval import build_context_prompt
+from utils.IntentRouter import get_intent_router
+from utils.FollowUpPolicy import FollowUpEngine
+from utils.StreamingSpeech import STREAM_TURNS, stream_model_turn, model_turn
+from utils.Transport import get_genai_client, prewarm_connections
+from utils.ToolEngine import ToolRegistry, ToolEngine, ToolCancelled, check_cancelled as check_tool_cancelled
+from utils.JobManager import get_job_manager, report_progress, check_cancelled, JobCancelled
+from utils.Diagnostics import capture_failure
 load_dotenv()
 import logging
 
-def load_knowledge_base(knowledgebase_file="knowledgebase.txt", contacts_file="contacts.json"):
+SUCCESS_PHRASES = [
+    "Alright, sir",
+    "Okay, sir",
+    "Of Course, Sir"
+]
+
+# Phrases that are spoken verbatim often enough to be worth pre-rendering at startup
+FIXED_SPEECH_PHRASES = SUCCESS_PHRASES + list(SPOTIFY_RESPONSES.values()) + [
+    SPOTIFY_DEFAULT_RESPONSE,
+    "Sorry, I didn't catch that.",
+    "Oops, sir, I got an error! You built me, so maybe it’s a feature, not a bug?"
+]
+
+# Tools that return a list for the user to pick from, and the key of that list
+SELECTION_TOOLS = {"click_youtube_video": "videos", "click_search_result_link": "links"}
+# Tools whose result main speaks itself instead of a success phrase
+JOB_TOOLS = ("do_homework", "list_jobs", "job_status", "cancel_job")
+SPOKEN_RESULT_TOOLS = ("research_topic",) + JOB_TOOLS
+SPEECH_INPUT_TIMEOUT = 15  # Seconds a job waits for the user to start answering
+SPEECH_INPUT_ATTEMPTS = 3
+SPEECH_INPUT_RETRY_PAUSE = 1.0  # Seconds between attempts, so main can take a command in between
+
+def load_knowledge_base(knowledgebase_file=KNOWLEDGEBASE_FILE, contacts_file=CONTACTS_FILE):
     """
     Load content from knowledgebase.txt and contacts.json into a structured dictionary.
 
+    The parsed files are kept in memory by utils.KnowledgeBase and only re-read when they
+    change on disk, so this is cheap to call on every turn.
+
     Args:
-        knowledgebase_file (str): Path to the knowledgebase text file (default: "knowledgebase.txt").
-        contacts_file (str): Path to the contacts JSON file (default: "contacts.json").
+        knowledgebase_file (str): Path to the knowledgebase text file (default: "../knowledgebase.txt").
+        contacts_file (str): Path to the contacts JSON file (default: "../contacts.json").
 
     Returns:
         dict: A dictionary with:
@@ -44,96 +85,74 @@ def load_knowledge_base(knowledgebase_file="knowledgebase.txt", contacts_file="c
                 - knowledgebase: List of non-comment lines from knowledgebase.txt
                 - contacts: List of contact dictionaries from contacts.json
     """
-    result = {
-        "status": "success",
-        "message": "Successfully loaded knowledge base and contacts",
-        "data": {
-            "knowledgebase": [],
-            "contacts": []
-        }
-    }
-
-    try:
-        if os.path.exists(knowledgebase_file):
-            with open(knowledgebase_file, "r", encoding="utf-8") as f:
-                lines = f.readlines()
-            knowledgebase_content = [line.strip() for line in lines if line.strip() and not line.startswith("#")]
-            result["data"]["knowledgebase"] = knowledgebase_content
-            logging.info(f"Loaded {len(knowledgebase_content)} entries from {knowledgebase_file}")
-        else:
-            logging.warning(f"Knowledgebase file {knowledgebase_file} does not exist")
-            result["message"] = f"Warning: {knowledgebase_file} not found, returning empty knowledgebase"
-
-        if os.path.exists(contacts_file):
-            with open(contacts_file, "r", encoding="utf-8") as f:
-                contacts = json.load(f)
-            if isinstance(contacts, list):
-                result["data"]["contacts"] = contacts
-                logging.info(f"Loaded {len(contacts)} contacts from {contacts_file}")
-            else:
-                logging.error(f"Invalid format in {contacts_file}: expected a JSON array")
-                result["status"] = "error"
-                result["message"] = f"Invalid format in {contacts_file}: expected a JSON array"
-                return result
-        else:
-            logging.warning(f"Contacts file {contacts_file} does not exist")
-            if "not found" in result["message"]:
-                result["message"] = "Warning: Both knowledgebase.txt and contacts.json not found"
-            else:
-                result["message"] = f"Warning: {contacts_file} not found, returning empty contacts"
-
-        return result
+    return get_knowledge_base(knowledgebase_file, contacts_file).load()
+def speech_input(prompt="", attempts=SPEECH_INPUT_ATTEMPTS):
+    """
+    Ask prompt and return the answer, lower-cased. Used by background jobs, so main doesn't
+    take the answer for a command; no answer after a few attempts counts as "cancel".
 
-    except json.JSONDecodeError as e:
-        logging.error(f"Failed to parse {contacts_file}: {str(e)}")
-        result["status"] = "error"
-        result["message"] = f"Failed to parse {contacts_file}: {str(e)}"
-        return result
-    except Exception as e:
-        logging.error(f"Failed to load knowledge base: {str(e)}")
-        result["status"] = "error"
-        result["message"] = f"Failed to load knowledge base: {str(e)}"
-        return result
-def speech_input(prompt=""):
-    if prompt:
-        speak(prompt)
-    recognizer = sr.Recognizer()
-    with sr.Microphone() as source:
-        print("Listening...")
-        audio = recognizer.listen(source)
-    try:
-        return recognizer.recognize_google(audio).lower().strip()
-    except sr.UnknownValueError:
-        speak("Sorry, I didn't catch that.")
-        return speech_input(prompt)  # Retry on failure
-    except sr.RequestError:
-        speak("Sorry, speech service is unavailable.")
-        return ""
+    The dialog lock is held for one question and answer at a time, not across retries,
+    and a cancelled job stops before the next attempt (or while waiting for the lock).
+    """
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(SPEECH_INPUT_RETRY_PAUSE)
+        check_cancelled()
+        while not dialog_lock.acquire(timeout=0.5):
+            check_cancelled()  # main is taking a command; give up waiting if the job was cancelled
+        try:
+            check_cancelled()
+            if prompt:
+                speak(prompt, wait=True)
+            print("Listening...")
+            return listen_and_transcribe(start_timeout=SPEECH_INPUT_TIMEOUT).lower().strip()
+        except sr.UnknownValueError:
+            speak("Sorry, I didn't catch that.")
+        except sr.WaitTimeoutError:
+            print("Debug: No answer, asking again")
+        except sr.RequestError:
+            speak("Sorry, speech service is unavailable.")
+            return ""
+        finally:
+            dialog_lock.release()
+    return "cancel"
 
 def search_contact_info(organization: str) -> dict:
     """
     Search for an organization's contact info by collecting web pages and using Gemini to extract phone numbers and emails.
+    A browser is only leased when the search results aren't in the page cache.
     """
-    driver = setup_browser_with_profile(headless=False)
-    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    browser_pool = get_browser_pool()
+    page_cache = get_page_cache()
+    driver = None
+    client = get_genai_client()
     error_occurred = False
     try:
         search_query = f"{organization} contact information"
-        search(driver, search_query)
-
-        links = collect_search_links(driver, max_links=1)
+        links = page_cache.get_search(search_query, 1)
+        if links:
+            print(f"Debug: Using cached search results for '{search_query}'")
+        else:
+            driver = browser_pool.acquire()
+            search(driver, search_query)
+            check_tool_cancelled()
+            links = [link for link in collect_search_links(driver, max_links=1) if link["url"]]
+            if links:
+                page_cache.put_search(search_query, links, 1)
+            # The page is fetched over HTTP, or with a browser of its own if it needs one
+            browser_pool.release(driver)
+            driver = None
         if not links or not links[0]["url"]:
             raise Exception("No valid search result links found")
 
+        check_tool_cancelled()
         page_contents = []
-        for link in links:
-            if link["url"]:
-                content = summarize_page(driver, link["url"])
-                page_contents.append({
-                    "title": link["title"],
-                    "url": link["url"],
-                    "content": content
-                })
+        for link, content in zip(links, summarize_pages([link["url"] for link in links])):
+            page_contents.append({
+                "title": link["title"],
+                "url": link["url"],
+                "content": content
+            })
 
         prompt = (
             f"Extract contact information (phone numbers, email addresses) for {organization} from the following web page contents. "
@@ -142,6 +161,7 @@ def search_contact_info(organization: str) -> dict:
         )
         for idx, page in enumerate(page_contents, 1):
             prompt += f"Page {idx}: {page['title']} ({page['url']})\nContent: {page['content']}\n\n"
+        check_tool_cancelled()
 
         response = client.models.generate_content(
             model="gemini-2.0-flash",
@@ -150,48 +170,65 @@ def search_contact_info(organization: str) -> dict:
         contact_info = response.text.strip()
 
         return {"contact_info": contact_info}
+    except ToolCancelled:
+        error_occurred = True  # Stopped somewhere in the middle, don't hand the driver out again
+        raise
     except Exception as e:
         print(f"Error in search_contact_info: {e}")
         error_occurred = True
+        capture_failure(driver, "search_contact_info", e, {"organization": organization})
         return {"contact_info": f"Error: {str(e)}"}
     finally:
-        if not error_occurred:
-            driver.quit()
-        else:
-            print("Browser left open for debugging. Close manually or press Enter to quit.")
-            input()
-            driver.quit()
+        if driver is not None:
+            browser_pool.release(driver, recycle=error_occurred)
 
 def research_topic(topic: str, max_links: int = 6) -> dict:
     """
     Research a topic by collecting and summarizing links from Bing search.
+    Search results and page summaries come from the page cache when the topic was
+    researched recently.
     """
-    driver = setup_browser_with_profile(headless=False)
+    browser_pool = get_browser_pool()
+    page_cache = get_page_cache()
+    driver = None
     error_occurred = False
     try:
-        search(driver, topic)
-        links = collect_search_links(driver, max_links)
+        links = page_cache.get_search(topic, max_links)
+        if links:
+            print(f"Debug: Using cached search results for '{topic}'")
+        else:
+            driver = browser_pool.acquire()
+            search(driver, topic)
+            check_tool_cancelled()
+            links = [link for link in collect_search_links(driver, max_links) if link["url"]]
+            if links:
+                page_cache.put_search(topic, links, max_links)
+            # Hand the search driver back before fanning out, the page workers lease their own
+            browser_pool.release(driver)
+            driver = None
+
+        check_tool_cancelled()
+        page_summaries = summarize_pages([link["url"] for link in links])
+        print(f"Debug: Page fetch tiers so far: {get_fetch_stats()['tiers']}")
         summaries = []
-        for link in links:
-            if link["url"]:
-                summary = summarize_page(driver, link["url"])
-                summaries.append({
-                    "title": link["title"],
-                    "url": link["url"],
-                    "summary": summary
-                })
+        for link, summary in zip(links, page_summaries):
+            summaries.append({
+                "title": link["title"],
+                "url": link["url"],
+                "summary": summary
+            })
         return {"summaries": summaries}
+    except ToolCancelled:
+        error_occurred = True
+        raise
     except Exception as e:
         print(f"Error in research_topic: {e}")
         error_occurred = True
+        capture_failure(driver, "research_topic", e, {"topic": topic, "max_links": max_links})
         return {"summaries": [{"title": "Error", "url": "", "summary": str(e)}]}
     finally:
-        if not error_occurred:
-            driver.quit()
-        else:
-            print("Browser left open for debugging. Close manually or press Enter to quit.")
-            input()
-            driver.quit()
+        if driver is not None:
+            browser_pool.release(driver, recycle=error_occurred)
 
 def parse_due_date(due_date_str):
     """Parse due date string into a datetime object for comparison."""
@@ -230,8 +267,8 @@ def do_homework(subject: str) -> dict:
     extract homework instructions, download files, and get a response from a simulated Gemini.
     """
     driver = setup_browser_with_profile(headless=False)
-    error_occurred = False
     try:
+        report_progress(0.05, "Opening Brightspace")
         # Enable network tracking via Chrome DevTools Protocol
         driver.execute_cdp_cmd('Network.enable', {})
 
@@ -281,6 +318,7 @@ def do_homework(subject: str) -> dict:
             EC.presence_of_element_located((By.TAG_NAME, "d2l-my-courses"))
         )
         print("Found d2l-my-courses element")
+        report_progress(0.15, "Reading your courses")
 
         page_source = driver.page_source
         print("Page source after finding d2l-my-courses:")
@@ -289,6 +327,7 @@ def do_homework(subject: str) -> dict:
         print("Waiting for network responses...")
         start_time = time.time()
         while time.time() - start_time < 30:
+            check_cancelled()
             logs = driver.get_log('performance')
             for log in logs:
                 process_network_log(log)
@@ -312,6 +351,8 @@ def do_homework(subject: str) -> dict:
             raise Exception(f"No course found matching '{subject}'")
 
         print(f"Found course: {course_name} (ID: {course_id})")
+        check_cancelled()
+        report_progress(0.25, f"Loading the {course_name} assignments")
 
         assignments_url = f"https://learn.truman.edu/d2l/lms/dropbox/user/folders_list.d2l?ou={course_id}&isprv=0"
         driver.get(assignments_url)
@@ -332,6 +373,7 @@ def do_homework(subject: str) -> dict:
         print("Waiting for folders_list.d2l network response...")
         start_time = time.time()
         while time.time() - start_time < 30:
+            check_cancelled()
             logs = driver.get_log('performance')
             for log in logs:
                 message = json.loads(log['message'])['message']
@@ -404,6 +446,7 @@ def do_homework(subject: str) -> dict:
             key=lambda x: parse_due_date(x['due_date']) or datetime.max
         )
 
+        report_progress(0.35, "Waiting for you to pick the assignment")
         speak("\nAlright sir, Let's find the assignment that you want me to work on.")
         selected_assignment = None
         remaining_assignments = assignments_sorted.copy()
@@ -456,6 +499,8 @@ def do_homework(subject: str) -> dict:
             speak("sorry sir, I couldn't find the assignment that you wanted me to work on.")
             raise Exception("Failed to identify an assignment to work on")
 
+        check_cancelled()
+        report_progress(0.45, f"Reading {selected_assignment['title']}")
         assignment_link = selected_assignment['link']
         print(f"Navigating to assignment: {selected_assignment['title']} at {assignment_link}")
         driver.get(assignment_link)
@@ -478,7 +523,9 @@ def do_homework(subject: str) -> dict:
 
         original_window = driver.current_window_handle
 
+        report_progress(0.55, "Downloading the attached files")
         for link in links:
+            check_cancelled()
             href = link['href']
             href = urllib.parse.unquote(href)
             if not href.startswith('http'):
@@ -587,6 +634,7 @@ def do_homework(subject: str) -> dict:
             original_window = driver.current_window_handle
 
             for idx, row in enumerate(rows):
+                check_cancelled()
                 try:
                     link = row.find_element(By.XPATH, ".//td[1]/span/a")
                     file_name = link.text.strip() or f"file_{idx}"
@@ -667,6 +715,8 @@ def do_homework(subject: str) -> dict:
                         driver.switch_to.window(original_window)
                     continue
 
+        except JobCancelled:
+            raise
         except Exception as e:
             print(f"No downloadable files found in table: {e}")
 
@@ -676,8 +726,11 @@ def do_homework(subject: str) -> dict:
         if downloaded_files:
             gemini_prompt += "Downloaded Files:\n" + "\n".join(downloaded_files) + "\n\n"
 
+        check_cancelled()
+        report_progress(0.7, "Writing the solution with Gemini")
         speak("\nAlright Sir, I am working on your assignment as we speak....")
         gemini_response = process_assignment("../downloads", "completed_assignments", gemini_prompt)
+        report_progress(0.95, "Saving the submission files")
         print("Gemini Response:")
         is_completed_voice = False
         speak("\nI have completed the assignment sir. You can view it in the completed assignments folder.")
@@ -711,67 +764,139 @@ def do_homework(subject: str) -> dict:
             "result": f"Successfully processed the {selected_assignment['title']} assignment",
             "gemini_response": gemini_response
         }
+    except JobCancelled:
+        print("do_homework cancelled, closing its browser")
+        raise
     except Exception as e:
         print(f"Error in do_homework: {e}")
-        error_occurred = True
+        capture_failure(driver, "do_homework", e, {"subject": subject})
         return {"result": f"Error: {str(e)}"}
     finally:
-        if not error_occurred:
-            pass
-        else:
-            print("Browser left open for debugging. Close manually or press Enter to quit.")
-            input()
-            pass
+        # Every run starts its own Chrome, so it goes on every way out: done, declined by the
+        # user, cancelled or failed. The quit waits for a failure capture still using the driver.
+        quit_driver_async(driver)
+
+def build_tool_registry(browser, jobs):
+    """
+    The tools Gemini can call, with their timeouts in seconds.
+
+    Tools that drive main's browser (a SharedBrowser) hold the "browser" resource so they
+    run one at a time; search_contact_info, research_topic and do_homework use browsers
+    of their own.
+    do_homework takes minutes, so it is submitted to the job manager and returns at once.
+    """
+    registry = ToolRegistry()
+    exclusive = ("browser",)
+    registry.register("search_contact_info", lambda args: search_contact_info(**args), timeout=120)
+    registry.register("research_topic", lambda args: research_topic(**args), timeout=180)
+    registry.register("do_homework", lambda args: jobs.submit("do_homework", do_homework, args).describe(),
+                      timeout=5)
+    registry.register("list_jobs", jobs.list_jobs_tool, timeout=5)
+    registry.register("job_status", jobs.job_status_tool, timeout=5)
+    registry.register("cancel_job", jobs.cancel_job_tool, timeout=5)
+    registry.register("click_element", lambda args: click_element_by_text(browser.driver, **args),
+                      timeout=30, resources=exclusive)
+    registry.register("search_web", lambda args: search(browser.driver, **args), timeout=30, resources=exclusive)
+    registry.register("click_youtube_video", lambda args: click_youtube_video(browser.driver, **args),
+                      timeout=30, resources=exclusive)
+    registry.register("click_search_result_link", lambda args: click_search_result_link(browser.driver, **args),
+                      timeout=30, resources=exclusive)
+    registry.register("go_back", lambda args: go_back(browser.driver), timeout=15, resources=exclusive)
+    registry.register("go_forward", lambda args: go_forward(browser.driver), timeout=15, resources=exclusive)
+    registry.register("scroll_down", lambda args: scroll_down(browser.driver), timeout=15, resources=exclusive)
+    registry.register("scroll_up", lambda args: scroll_up(browser.driver), timeout=15, resources=exclusive)
+    registry.register("navigate_to_url", lambda args: navigate_to_url(browser.driver, **args), timeout=30,
+                      resources=exclusive)
+    registry.register("close_tab", lambda args: close_tab(browser.driver), timeout=15, resources=exclusive)
+    registry.register("login_truman", lambda args: login_truman(browser.driver, **args), timeout=60,
+                      resources=exclusive)
+    registry.register("remember_info", lambda args: remember_info(**args), timeout=10)
+    registry.register("recall_info", lambda args: recall_info(**args), timeout=10)
+    registry.register("send_email", lambda args: send_email(**args), timeout=30)
+    registry.register("call", lambda args: call(**args), timeout=30)
+    registry.register("process_spotify_command", lambda args: process_spotify_command(**args), timeout=30)
+    return registry
+
 
 def main():
-    client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+    client = get_genai_client()
+    prewarm_connections(model="gemini-2.0-flash")  # TLS handshakes happen while the browser starts
     tools = types.Tool(function_declarations=function_declarations)
     config = types.GenerateContentConfig(tools=[tools])
 
-    driver = setup_browser_with_profile(headless=False)
+    browser = SharedBrowser(headless=False)
+    browser.driver  # Start Chrome now rather than on the first browser command
+    browser_pool = get_browser_pool()
+    browser_pool.warm()
     conversation_history = []
     last_function_call = None
-
-    recognizer = sr.Recognizer()
-    microphone = sr.Microphone()
-
-    print("Adjusting for ambient noise... Please wait.")
-    with microphone as source:
-        recognizer.adjust_for_ambient_noise(source, duration=5)
-    print("Ready to listen. Hold spacebar and say your command (or 'quit' to exit).")
-
-    success_phrases = [
-        "Alright, sir",
-        "Okay, sir",
-        "Of Course, Sir"
-    ]
+    context_content = None
+
+    warm_speech_cache(FIXED_SPEECH_PHRASES)
+    get_asr_backend()  # Load the speech model now rather than on the first command
+
+    microphone = get_microphone_stream()  # Opened once; every turn reads from its ring buffer
+
+    if not microphone.noise.calibrated:
+        # First run only; the noise floor is saved and tracked in the background from then on
+        print("Adjusting for ambient noise... Please wait.")
+        microphone.calibrate()
+    vad = make_vad(microphone.noise)
+    trigger = make_trigger()
+    wake_word = start_wake_word(trigger)
+    print(f"Ready to listen. {trigger.prompt}")
+
+    success_phrases = SUCCESS_PHRASES
+    intent_router = get_intent_router()
+    follow_ups = FollowUpEngine(lambda contents: client.models.generate_content(
+        model="gemini-2.0-flash",
+        config=config,
+        contents=contents
+    ))
+    jobs = get_job_manager()
+    jobs.set_notifier(lambda job: speak(f"Sir, {job.summary()}"))
+    # A browser command that times out gets its driver recycled, so the next one isn't stuck behind it
+    tool_engine = ToolEngine(build_tool_registry(browser, jobs), resets={"browser": browser.recycle})
 
     try:
         while True:
-            if not keyboard.is_pressed('space'):
-                print("Hold spacebar to give a command...")
-                time.sleep(0.1)
-                continue
+            if wake_word:
+                wake_word.resume()
+            event = trigger.wait()
+            if wake_word:
+                wake_word.pause()  # Don't spend CPU on the wake word while a command is running
+            if event.kind == QUIT:
+                speak("Farewell, sir! Shutting down JARVIS.", wait=True)
+                print("Exiting JARVIS.")
+                break
 
+            if not dialog_lock.acquire(blocking=False):
+                # A background job asked the user something; what they say now is its answer
+                print("Debug: A background job is waiting for an answer, ignoring the trigger")
+                continue
+            stop_speaking()  # Barge-in: the user wants to talk, JARVIS stops
             print("Listening...")
             try:
-                with microphone as source:
-                    audio = recognizer.listen(source, timeout=5, phrase_time_limit=10)
-                try:
-                    user_input = recognizer.recognize_google(audio).strip()
-                    print(f"You said: {user_input}")
-                except sr.UnknownValueError:
-                    print("Sorry, sir, my ears are failing me! Could you repeat that?")
-                    continue
-                except sr.RequestError as e:
-                    print(f"Oops, sir, the speech service gave me a headache: {e}")
-                    continue
+                # Start reading at the moment of the key press (plus pre-roll), not when we woke up.
+                # After a wake word the command follows it directly, so no pre-roll there.
+                pre_roll_ms = 0 if event.source == WakeWordDetector.name else PRE_ROLL_MS
+                frames = microphone.frames(start=microphone.position_at(event.time), pre_roll_ms=pre_roll_ms)
+                user_input = listen_and_transcribe(frames, vad, start_timeout=5, max_seconds=10).strip()
+                print(f"You said: {user_input}")
+            except sr.UnknownValueError:
+                print("Sorry, sir, my ears are failing me! Could you repeat that?")
+                continue
+            except sr.RequestError as e:
+                print(f"Oops, sir, the speech service gave me a headache: {e}")
+                continue
             except sr.WaitTimeoutError:
                 print("No speech detected, sir. Speak up while holding spacebar!")
                 continue
+            finally:
+                dialog_lock.release()
 
             if user_input.lower() == 'quit':
-                speak("Farewell, sir! Shutting down JARVIS.")
+                speak("Farewell, sir! Shutting down JARVIS.", wait=True)
                 print("Exiting JARVIS.")
                 break
 
@@ -795,7 +920,7 @@ def main():
                                 index = int(user_input) - 1
                                 if last_function_call.name == "click_youtube_video" and 0 <= index < len(
                                         last_result["videos"]):
-                                    result = navigate_to_url(driver, last_result["videos"][index]["url"])
+                                    tool_engine.run([("navigate_to_url", {"url": last_result["videos"][index]["url"]})])
                                     print(f"Selected video {index + 1}: {last_result['videos'][index]['title']}")
                                     speak(random.choice(success_phrases))
                                     last_function_call = None
@@ -807,7 +932,7 @@ def main():
                                     continue
                                 elif last_function_call.name == "click_search_result_link" and 0 <= index < len(
                                         last_result["links"]):
-                                    result = navigate_to_url(driver, last_result["links"][index]["url"])
+                                    tool_engine.run([("navigate_to_url", {"url": last_result["links"][index]["url"]})])
                                     print(f"Selected link {index + 1}: {last_result['links'][index]['title']}")
                                     speak(random.choice(success_phrases))
                                     last_function_call = None
@@ -830,180 +955,157 @@ def main():
                     print("Debug: No valid function response in history, sir. Let’s start fresh!")
                     last_function_call = None
 
-            knowledge_base_content = load_knowledge_base()
-            context_prompt = f"Context from knowledge base: {knowledge_base_content}\n\nUse the above context to inform your response."
+            # Only the knowledge base entries relevant to this utterance, so the prompt stays small
+            context_prompt = build_context_prompt(user_input)
+            previous_context = context_content
             context_content = types.Content(role="user", parts=[types.Part(text=context_prompt)])
 
+            conversation_history = [c for c in conversation_history if c is not previous_context]
             conversation_history.append(types.Content(role="user", parts=[types.Part(text=user_input)]))
             conversation_history = [context_content] + conversation_history[-5:]  # Include context in every prompt
 
-            try:
-                response = client.models.generate_content(
-                    model="gemini-2.0-flash",
-                    contents=conversation_history,
-                    config=config
-                )
-                print("Debug: Gemini response parts:", [part.__dict__ for part in response.candidates[0].content.parts])
-            except Exception as e:
-                print(f"Ouch, sir, Gemini gave me a digital bruise: {e}")
-                conversation_history = [types.Content(role="model", parts=[types.Part(text=f"Error: {e}")])]
-                continue
+            # Simple commands go straight to their tool without a model round trip
+            route = intent_router.route(user_input)
+            response = None
+            function_calls = []
+            if route:
+                print(f"Debug: Routed locally: {route}")
+                function_calls = [types.FunctionCall(name=route.name, args=route.args)]
+            else:
+                try:
+                    model_start = time.perf_counter()
+                    if STREAM_TURNS:
+                        # Sentences are spoken while the rest of the answer is still being generated
+                        response = stream_model_turn(client.models.generate_content_stream(
+                            model="gemini-2.0-flash",
+                            contents=conversation_history,
+                            config=config
+                        ), speak)
+                        print(f"Debug: Gemini stream - first token {response.first_token_seconds}s, "
+                              f"first sentence {response.first_sentence_seconds}s, total {response.total_seconds:.2f}s")
+                    else:
+                        response = model_turn(client.models.generate_content(
+                            model="gemini-2.0-flash",
+                            contents=conversation_history,
+                            config=config
+                        ))
+                    intent_router.record_model_latency(time.perf_counter() - model_start)
+                except Exception as e:
+                    print(f"Ouch, sir, Gemini gave me a digital bruise: {e}")
+                    conversation_history = [types.Content(role="model", parts=[types.Part(text=f"Error: {e}")])]
+                    continue
 
-            function_call = None
-            if response.candidates and response.candidates[0].content.parts:
-                part = response.candidates[0].content.parts[0]
-                if part.function_call:
-                    function_call = part.function_call
-                elif part.text and part.text.startswith("```tool_outputs"):
+                if response.function_calls:
+                    function_calls = response.function_calls
+                elif response.text.startswith("```tool_outputs"):
                     try:
-                        tool_output = json.loads(part.text.split("```tool_outputs\n")[1].split("\n```")[0])
+                        tool_output = json.loads(response.text.split("```tool_outputs\n")[1].split("\n```")[0])
                         for key, value in tool_output.items():
                             function_name = key.replace("_response", "")
                             args = value if isinstance(value, dict) else {}
-                            function_call = types.FunctionCall(name=function_name, args=args)
+                            function_calls.append(types.FunctionCall(name=function_name, args=args))
                             print(f"Debug: Parsed tool_outputs - Function: {function_name}, Args: {args}")
-                            break
                     except Exception as e:
                         print(f"Debug: Sir, I fumbled parsing those tool outputs: {e}")
                         conversation_history = [
                             types.Content(role="model", parts=[types.Part(text=f"Error parsing response: {e}")])]
                         continue
 
-            if function_call:
-                last_function_call = function_call
-                function_name = function_call.name
-                args = function_call.args
-                print(f"Debug: Function call - Name: {function_name}, Args: {args}")
+            if function_calls:
+                last_function_call = function_calls[-1]
+                for function_call in function_calls:
+                    print(f"Debug: Function call - Name: {function_call.name}, Args: {function_call.args}")
             else:
                 print("No function call suggested, sir. Here’s the direct response:")
-                print(response.text or "No response text available.")
+                if not response.spoken:
+                    print(response.text or "No response text available.")
                 conversation_history = [types.Content(role="model", parts=[
                     types.Part(text=response.text or "No response text available.")])]
                 last_function_call = None
                 continue
 
-            result = None
-            try:
-                if function_name == "search_contact_info":
-                    result = search_contact_info(**args)
-                    speak(random.choice(success_phrases))
-                elif function_name == "research_topic":
-                    result = research_topic(**args)
-                    speak(result)
-                elif function_name == "do_homework":
-                    result = do_homework(**args)
-                    speak(random.choice(success_phrases))
-                elif function_name == "click_element":
-                    print(f"Debug: Executing click_element with args: {args}")
-                    result = click_element_by_text(driver, **args)
-                    print(f"Debug: click_element result: {result}")
-                    speak(random.choice(success_phrases))
-                elif function_name == "search_web":
-                    result = search(driver, **args)
-                    speak(random.choice(success_phrases))
-                elif function_name == "click_youtube_video":
-                    print(f"Debug: Executing click_youtube_video with args: {args}")
-                    result = click_youtube_video(driver, **args)
-                    print(f"Debug: click_youtube_video result: {result}")
-                    if isinstance(result, dict) and "videos" in result:
-                        print(result["message"])
-                        for i, video in enumerate(result["videos"], 1):
-                            print(f"{i}. {video['title']} ({video['url']})")
-                        conversation_history = [types.Content(
-                            role="model",
-                            parts=[types.Part(text="Please say the number of the video you want to select.")]
-                        ), types.Content(
-                            role="user",
-                            parts=[types.Part.from_function_response(name=function_name, response={"result": result})]
-                        )]
-                        continue
-                    speak(random.choice(success_phrases))
-                elif function_name == "go_back":
-                    result = go_back(driver)
-                    speak(random.choice(success_phrases))
-                elif function_name == "navigate_to_url":
-                    result = navigate_to_url(driver, **args)
-                    speak(random.choice(success_phrases))
-                elif function_name == "close_tab":
-                    result = close_tab(driver)
-                    speak(random.choice(success_phrases))
-                elif function_name == "login_truman":
-                    result = login_truman(driver, **args)
-                    speak(random.choice(success_phrases))
-                elif function_name == "remember_info":
-                    result = remember_info(**args)
-                    speak(random.choice(success_phrases))
-                elif function_name == "recall_info":
-                    result = recall_info(**args)
-                    speak(random.choice(success_phrases))
-                elif function_name == "send_email":
-                    result = send_email(**args)
-                    speak(random.choice(success_phrases))
-                elif function_name == "call":
-                    result = call(**args)
-                    speak(random.choice(success_phrases))
-                elif function_name == "process_spotify_command":
-                    result = process_spotify_command(**args)
-                    speak(random.choice(success_phrases))
-                elif function_name == "click_search_result_link":
-                    print(f"Debug: Executing click_search_result_link with args: {args}")
-                    result = click_search_result_link(driver, **args)
-                    print(f"Debug: click_search_result_link result: {result}")
-                    if isinstance(result, dict) and "links" in result:
-                        print(result["message"])
-                        for i, link in enumerate(result["links"], 1):
-                            print(f"{i}. {link['title']} ({link['url']})")
-                        conversation_history = [types.Content(
-                            role="model",
-                            parts=[types.Part(text="Please say the number of the link you want to select.")]
-                        ), types.Content(
-                            role="user",
-                            parts=[types.Part.from_function_response(name=function_name, response={"result": result})]
-                        )]
-                        continue
-                    speak(random.choice(success_phrases))
-                else:
-                    print(f"Unknown function: {function_name}, sir. Did I miss a memo?")
-                    continue
-            except Exception as e:
-                print(f"Error executing function {function_name}: {e}")
+            # All calls of the turn run at once; each is bounded by its tool's timeout
+            calls = tool_engine.run([(function_call.name, function_call.args) for function_call in function_calls])
+            for tool_call in calls:
+                if not tool_call.ok:
+                    print(f"Error executing function {tool_call.name}: {tool_call.response()['message']}")
+            if not any(tool_call.ok for tool_call in calls):
                 speak(f"Oops, sir, I got an error! You built me, so maybe it’s a feature, not a bug?")
-                conversation_history = [types.Content(role="model", parts=[types.Part(text=f"Error: {e}")])]
+                errors = "; ".join(tool_call.response()["message"] for tool_call in calls)
+                conversation_history = [types.Content(role="model", parts=[types.Part(text=f"Error: {errors}")])]
                 continue
 
+            # A list of videos or links to pick from: the next utterance is the number
+            selection = None
+            for function_call, tool_call in zip(function_calls, calls):
+                key = SELECTION_TOOLS.get(tool_call.name)
+                if tool_call.ok and key and isinstance(tool_call.result, dict) and key in tool_call.result:
+                    selection = function_call, tool_call
+            if selection:
+                function_call, tool_call = selection
+                last_function_call = function_call
+                print(tool_call.result["message"])
+                for i, item in enumerate(tool_call.result[SELECTION_TOOLS[tool_call.name]], 1):
+                    print(f"{i}. {item['title']} ({item['url']})")
+                noun = "video" if tool_call.name == "click_youtube_video" else "link"
+                conversation_history = [types.Content(
+                    role="model",
+                    parts=[types.Part(text=f"Please say the number of the {noun} you want to select.")]
+                ), types.Content(
+                    role="user",
+                    parts=[types.Part.from_function_response(name=tool_call.name, response={"result": tool_call.result})]
+                )]
+                continue
+
+            for tool_call in calls:
+                if tool_call.ok and tool_call.name == "research_topic":
+                    speak(tool_call.result)
+                elif tool_call.ok and tool_call.name in JOB_TOOLS:
+                    speak(tool_call.result["message"])
+            if any(tool_call.ok and tool_call.name not in SPOKEN_RESULT_TOOLS for tool_call in calls):
+                speak(random.choice(success_phrases))
+
             try:
-                function_response_part = types.Part.from_function_response(
-                    name=function_name,
-                    response={"result": result}
-                )
+                results = [(tool_call.name, tool_call.response()) for tool_call in calls]
                 conversation_history = [types.Content(
                     role="model",
-                    parts=[types.Part(function_call=last_function_call)]
+                    parts=[types.Part(function_call=function_call) for function_call in function_calls]
                 ), types.Content(
                     role="user",
-                    parts=[function_response_part]
+                    parts=[types.Part.from_function_response(name=name, response={"result": result})
+                           for name, result in results]
                 ), types.Content(
                     role="model",
-                    parts=[types.Part(text=result if isinstance(result, str) else "Function executed.")]
+                    parts=[types.Part(text="\n".join(result if isinstance(result, str) else "Function executed."
+                                                      for _, result in results))]
                 )]
-                final_response = client.models.generate_content(
-                    model="gemini-2.0-flash",
-                    config=config,
-                    contents=conversation_history
-                )
-                print(final_response.text)
+                # Skipped, rendered locally or narrated in the background depending on the tools
+                follow_ups.handle_batch(results, list(conversation_history))
             except Exception as e:
                 print(f"Sir, I tripped over the function response: {e}")
                 conversation_history = [types.Content(role="model", parts=[types.Part(text=f"Error: {e}")])]
                 continue
     except KeyboardInterrupt:
         print("\nInterrupted by user, sir. JARVIS is signing off!")
-        speak("Catch you later, sir!")
+        speak("Catch you later, sir!", wait=True)
     except Exception as e:
         print(f"Critical error, sir, I’m having an identity crisis: {e}")
-        speak("Help, sir, I’m malfunctioning! Time for a reboot!")
+        speak("Help, sir, I’m malfunctioning! Time for a reboot!", wait=True)
     finally:
-        driver.quit()
+        print(f"Debug: Intent router stats: {intent_router.stats()}")
+        print(f"Debug: Follow-up stats: {follow_ups.stats()}")
+        print(f"Debug: Tool stats: {tool_engine.stats()}")
+        print(f"Debug: Job stats: {jobs.stats()}")
+        tool_engine.cancel_all()
+        jobs.close()
+        follow_ups.close()
+        if wake_word:
+            print(f"Debug: Wake word stats: {wake_word.stats()}")
+            wake_word.close()
+        trigger.close()
+        microphone.close()
+        browser_pool.close()
+        browser.quit()
 
 
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
 import os
 from flask import Flask, request, Response, jsonify
-import requests
 from dotenv import load_dotenv
 from flask_cors import CORS
 load_dotenv()
@@ -10,6 +9,13 @@ import time
 import tempfile
 import re
 import json
+import threading
+from concurrent.futures import ThreadPoolExecutor, CancelledError, TimeoutError as FutureTimeoutError
+from utils.SpeechCache import get_speech_cache, make_cache_key
+from utils.SpeechQueue import get_speech_queue
+from utils.KnowledgeBase import invalidate_knowledge_bases
+from utils.Transport import get_api_session
+from utils.AudioFormat import stream_format, to_mixer_channels
 
 elevenlabs_api_key = os.getenv("ELEVENLABS_API_KEY")
 if not elevenlabs_api_key:
@@ -19,19 +25,126 @@ if not elevenlabs_api_key:
 
 CALLUM_VOICE_ID = os.getenv("ELEVENLABS_VOICE_ID", "MF3mGyEYCl7XYWbV9V6O")
 
-pygame.mixer.init()
+# Streaming mode asks ElevenLabs for raw 16-bit mono PCM so chunks can be handed to the
+# mixer as they arrive. The PCM has to match the format the mixer really opened with
+# (see utils.AudioFormat); when it can't, speech falls back to MP3.
+STREAM_SPEECH = os.getenv("JARVIS_STREAM_SPEECH", "1") != "0"
+STREAM_SAMPLE_RATE = 22050
+STREAM_CHUNK_SIZE = 4096
+RENDER_POLL_SECONDS = 0.1  # How often a prefetched utterance waiting for its audio checks for barge-in
+
+TTS_MODEL_ID = "eleven_monolingual_v1"
+TTS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.8
+}
+
+try:
+    # allowedchanges=0: SDL converts to the device's format instead of opening the mixer in it
+    pygame.mixer.init(frequency=STREAM_SAMPLE_RATE, size=-16, channels=1, allowedchanges=0)
+except TypeError:  # pygame 1.x
+    pygame.mixer.init(frequency=STREAM_SAMPLE_RATE, size=-16, channels=1)
+STREAM_FORMAT = stream_format(pygame.mixer.get_init())
+if STREAM_SPEECH and STREAM_FORMAT is None:
+    print(f"Warning: Mixer opened as {pygame.mixer.get_init()}, streamed speech would play at the wrong "
+          f"speed; using MP3 instead")
+    STREAM_SPEECH = False
+STREAM_MIN_BUFFER = (STREAM_FORMAT.rate if STREAM_FORMAT else STREAM_SAMPLE_RATE) // 2  # ~250ms before playback
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 current_process = ""
 
-def speak(text):
-    """Use ElevenLabs API to convert text to speech with Callum's voice and play it"""
-    print(f"JARVIS: {text}")
 
-    if not elevenlabs_api_key or elevenlabs_api_key == "your_elevenlabs_api_key_here":
-        print("No valid ElevenLabs API key. Skipping voice synthesis.")
-        return
+def _play_pcm_stream(chunks, cancelled=None):
+    """
+    Play raw PCM chunks through a mixer channel while they are still being downloaded.
+
+    The first Sound is played as soon as STREAM_MIN_BUFFER bytes are in, everything after
+    that is queued on the same channel whenever its queue slot is free. Playback stops
+    early once the optional cancelled event is set.
+    """
+    channel = pygame.mixer.Channel(0)
+    pending = bytearray()
+    started = False
+
+    def is_cancelled():
+        if cancelled is not None and cancelled.is_set():
+            channel.stop()
+            return True
+        return False
+
+    def flush(data):
+        nonlocal started
+        sound = pygame.mixer.Sound(buffer=to_mixer_channels(data, STREAM_FORMAT.channels))
+        if not started:
+            channel.play(sound)
+            started = True
+        else:
+            while channel.get_queue() is not None:
+                if is_cancelled():
+                    return
+                pygame.time.wait(10)
+            channel.queue(sound)
+
+    for chunk in chunks:
+        if is_cancelled():
+            return
+        if not chunk:
+            continue
+        pending.extend(chunk)
+        ready = not started and len(pending) >= STREAM_MIN_BUFFER
+        ready = ready or (started and channel.get_queue() is None)
+        if ready:
+            # Keep sample boundaries intact, 16-bit PCM is 2 bytes per sample
+            cut = len(pending) - (len(pending) % 2)
+            flush(pending[:cut])
+            del pending[:cut]
+
+    if len(pending) >= 2:
+        flush(pending[:len(pending) - (len(pending) % 2)])
+
+    while channel.get_busy() or channel.get_queue() is not None:
+        if is_cancelled():
+            return
+        pygame.time.wait(10)
+
+
+def _play_mp3(audio, cancelled=None):
+    """Play a complete MP3 payload through pygame.mixer.music."""
+    temp_audio_path = os.path.join(tempfile.gettempdir(), f"jarvis_speech_{int(time.time())}.mp3")
+
+    with open(temp_audio_path, "wb") as temp_audio:
+        temp_audio.write(audio)
 
+    try:
+        pygame.mixer.music.load(temp_audio_path)
+        pygame.mixer.music.play()
+
+        while pygame.mixer.music.get_busy():
+            if cancelled is not None and cancelled.is_set():
+                pygame.mixer.music.stop()
+                break
+            pygame.time.Clock().tick(10)
+
+        try:
+            pygame.mixer.music.unload()
+            time.sleep(0.5)
+            os.remove(temp_audio_path)
+        except Exception as e:
+            print(f"Warning: Could not remove temp file: {e}")
+    except Exception as e:
+        print(f"Error playing audio: {e}")
+
+
+def _output_format(stream):
+    return STREAM_FORMAT.output_format if stream else "mp3_44100_128"
+
+
+def _speech_cache_key(text, stream):
+    return make_cache_key(CALLUM_VOICE_ID, TTS_MODEL_ID, TTS_VOICE_SETTINGS, text, _output_format(stream))
+
+
+def _tts_request(text):
     url = f"https://api.elevenlabs.io/v1/text-to-speech/{CALLUM_VOICE_ID}"
 
     headers = {
@@ -42,43 +155,189 @@ def speak(text):
 
     data = {
         "text": text,
-        "model_id": "eleven_monolingual_v1",
-        "voice_settings": {
-            "stability": 0.5,
-            "similarity_boost": 0.8
-        }
+        "model_id": TTS_MODEL_ID,
+        "voice_settings": TTS_VOICE_SETTINGS
     }
+    return url, headers, data
+
+
+def speak(text, stream=None, wait=False, prefetch=False):
+    """
+    Queue text to be spoken with Callum's voice and return a SpeechHandle right away.
+
+    Utterances play in order on the speech worker thread. Pass wait=True (or call
+    handle.wait()) when the caller has to block until JARVIS is done talking, e.g. before
+    listening for an answer. prefetch=True starts synthesizing immediately instead of
+    when the utterance's turn comes, so it is ready the moment the one before it ends.
+    """
+    print(f"JARVIS: {text}")
+
+    if not elevenlabs_api_key or elevenlabs_api_key == "your_elevenlabs_api_key_here":
+        print("No valid ElevenLabs API key. Skipping voice synthesis.")
+        return None
+
+    if stream is None:
+        stream = STREAM_SPEECH
+    stream = stream and STREAM_FORMAT is not None
+
+    if prefetch:
+        rendered = _prefetch_executor.submit(_render_speech, text, stream)
+        handle = get_speech_queue().submit(text, lambda h: _play_rendered(rendered, stream, h.cancelled))
+    else:
+        handle = get_speech_queue().submit(text, lambda h: _speak_now(text, stream, h.cancelled))
+    if wait:
+        handle.wait()
+    return handle
+
+
+def stop_speaking():
+    """Barge-in: cancel whatever JARVIS is saying and everything queued after it."""
+    get_speech_queue().cancel_all()
+
+
+def wait_for_speech():
+    """Block until every queued utterance has been played."""
+    get_speech_queue().wait_until_idle()
+
+
+def _speak_now(text, stream, cancelled=None):
+    """Synthesize text with ElevenLabs (or the speech cache) and play it. Runs on the speech worker."""
+    cache = get_speech_cache()
+    cache_key = _speech_cache_key(text, stream)
+    cached_audio = cache.get(cache_key)
+    if cached_audio:
+        try:
+            if stream:
+                _play_pcm_stream([cached_audio], cancelled)
+            else:
+                _play_mp3(cached_audio, cancelled)
+        except Exception as e:
+            print(f"Error playing cached audio: {e}")
+        return
+
+    url, headers, data = _tts_request(text)
+
+    if stream:
+        headers["Accept"] = "audio/pcm"
+        try:
+            with get_api_session().post(f"{url}/stream", params={"output_format": _output_format(stream)},
+                                           json=data, headers=headers, stream=True) as response:
+                if response.status_code != 200:
+                    print(f"Error with ElevenLabs API: {response.status_code} - {response.text}")
+                    return
+
+                audio = bytearray()
+                complete = False
+
+                def record(chunks):
+                    nonlocal complete
+                    for chunk in chunks:
+                        audio.extend(chunk)
+                        yield chunk
+                    complete = True
+
+                _play_pcm_stream(record(response.iter_content(chunk_size=STREAM_CHUNK_SIZE)), cancelled)
+                # A barged-in utterance is only partially downloaded, don't cache it
+                if complete:
+                    cache.put(cache_key, bytes(audio))
+        except Exception as e:
+            print(f"Error streaming ElevenLabs audio: {e}")
+        return
 
     try:
-        response = requests.post(url, json=data, headers=headers)
+        response = get_api_session().post(url, json=data, headers=headers)
 
         if response.status_code == 200:
-            temp_audio_path = os.path.join(tempfile.gettempdir(), f"jarvis_speech_{int(time.time())}.mp3")
-
-            with open(temp_audio_path, "wb") as temp_audio:
-                temp_audio.write(response.content)
-
-            try:
-                pygame.mixer.music.load(temp_audio_path)
-                pygame.mixer.music.play()
-
-                while pygame.mixer.music.get_busy():
-                    pygame.time.Clock().tick(10)
-
-                try:
-                    pygame.mixer.music.unload()
-                    time.sleep(0.5)
-                    os.remove(temp_audio_path)
-                except Exception as e:
-                    print(f"Warning: Could not remove temp file: {e}")
-            except Exception as e:
-                print(f"Error playing audio: {e}")
+            cache.put(cache_key, response.content)
+            _play_mp3(response.content, cancelled)
         else:
             print(f"Error with ElevenLabs API: {response.status_code} - {response.text}")
     except Exception as e:
         print(f"Error using ElevenLabs API: {e}")
 
 
+def _render_speech(text, stream):
+    """Return the complete audio for text from the speech cache or ElevenLabs (None on failure)."""
+    cache = get_speech_cache()
+    cache_key = _speech_cache_key(text, stream)
+    cached_audio = cache.get(cache_key)
+    if cached_audio:
+        return cached_audio
+
+    url, headers, data = _tts_request(text)
+    if stream:
+        headers["Accept"] = "audio/pcm"
+    try:
+        response = get_api_session().post(url, params={"output_format": _output_format(stream)}, json=data, headers=headers)
+        if response.status_code != 200:
+            print(f"Warning: Could not render '{text}': {response.status_code}")
+            return None
+        cache.put(cache_key, response.content)
+        return response.content
+    except Exception as e:
+        print(f"Warning: Could not render '{text}': {e}")
+        return None
+
+
+def _play_rendered(rendered, stream, cancelled=None):
+    """
+    Play the audio of a _render_speech future once it is ready. Runs on the speech worker.
+
+    Waits in short slices, so after a barge-in the worker moves on at once instead of
+    holding the queue until the ElevenLabs request of a cancelled sentence returns.
+    """
+    while True:
+        if cancelled is not None and cancelled.is_set():
+            rendered.cancel()  # Drops it if it hasn't started; a running render just goes unplayed
+            return
+        try:
+            audio = rendered.result(timeout=RENDER_POLL_SECONDS)
+            break
+        except FutureTimeoutError:
+            continue
+        except CancelledError:
+            return
+    if not audio or (cancelled is not None and cancelled.is_set()):
+        return
+    try:
+        if stream:
+            _play_pcm_stream([audio], cancelled)
+        else:
+            _play_mp3(audio, cancelled)
+    except Exception as e:
+        print(f"Error playing prefetched audio: {e}")
+
+
+_prefetch_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tts-prefetch")
+
+
+def warm_speech_cache(phrases, stream=None):
+    """
+    Pre-render fixed phrases into the speech cache so they play without a network round trip.
+
+    Runs in a background thread and returns it, startup does not wait for the API.
+    """
+    if not elevenlabs_api_key or elevenlabs_api_key == "your_elevenlabs_api_key_here":
+        return None
+
+    if stream is None:
+        stream = STREAM_SPEECH
+
+    def worker():
+        cache = get_speech_cache()
+        rendered = 0
+        for phrase in dict.fromkeys(phrases):
+            if _speech_cache_key(phrase, stream) in cache:
+                continue
+            if _render_speech(phrase, stream):
+                rendered += 1
+        print(f"Speech cache warm-up done: {rendered} new phrase(s), {cache.stats()}")
+
+    thread = threading.Thread(target=worker, name="speech-cache-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
 import logging
 
 logging.basicConfig(filename="../knowledgebase.log", level=logging.INFO)
@@ -134,6 +393,7 @@ def remember_info(name=None, number=None, info=None):
 
             with open(contacts_file, "w", encoding="utf-8") as f:
                 json.dump(contacts, f, indent=4)
+            invalidate_knowledge_bases()
 
             return {
                 "status": "success",
@@ -152,6 +412,7 @@ def remember_info(name=None, number=None, info=None):
 
             with open(knowledgebase_file, "a", encoding="utf-8") as f:
                 f.write(entry)
+            invalidate_knowledge_bases()
 
             logging.info(f"Stored info in knowledgebase: {info}")
             return {
@@ -282,6 +543,40 @@ function_declarations = [
             "required": ["subject"]
         }
     },
+    {
+        "name": "list_jobs",
+        "description": "List the background jobs (like homework being done) with their progress. Use this for 'what are you working on', 'list my jobs' or 'is my homework done'.",
+        "parameters": {
+            "type": "object",
+            "properties": {}
+        }
+    },
+    {
+        "name": "job_status",
+        "description": "Report the progress of one background job. Without a job id, the most recent job.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "job_id": {
+                    "type": "integer",
+                    "description": "The number of the job, as announced when it started (e.g., 2)."
+                }
+            }
+        }
+    },
+    {
+        "name": "cancel_job",
+        "description": "Stop a background job. Without a job id, the most recent running job. Use this for 'stop the homework' or 'cancel job 2'.",
+        "parameters": {
+            "type": "object",
+            "properties": {
+                "job_id": {
+                    "type": "integer",
+                    "description": "The number of the job to cancel (e.g., 2)."
+                }
+            }
+        }
+    },
     {
         "name": "click_element",
         "description": "Go to a section by clicking a button or a link. Click a button or link on the current webpage by its visible text or partial text match, such as 'Apply', 'Images', 'News', or 'Submit'. Use this for navigation links, buttons, menu items, or tabs (e.g., 'Images' tab on a search results page), but not for search result links. The user can also ask like go to '<link text>'  ",
@@ -0,0 +1,29 @@
+from array import array
+import pytest
+from utils.AudioFormat import stream_format, to_mixer_channels
+
+
+@pytest.mark.parametrize("mixer_init,output_format,channels", [
+    ((22050, -16, 1), "pcm_22050", 1),
+    ((44100, -16, 2), "pcm_44100", 2),
+    ((24000, -16, 2), "pcm_24000", 2),
+])
+def test_streams_at_the_rate_the_mixer_opened_with(mixer_init, output_format, channels):
+    chosen = stream_format(mixer_init)
+    assert (chosen.output_format, chosen.channels) == (output_format, channels)
+
+
+@pytest.mark.parametrize("mixer_init", [
+    (48000, -16, 2),  # a common device rate ElevenLabs PCM doesn't come in
+    (22050, 16, 1),   # unsigned samples
+    (22050, -16, 6),  # surround
+    None,             # mixer not initialized
+])
+def test_mismatched_mixer_falls_back_to_mp3(mixer_init):
+    assert stream_format(mixer_init) is None
+
+
+def test_mono_is_duplicated_for_a_stereo_mixer():
+    mono = array("h", [1, -2, 300]).tobytes()
+    assert to_mixer_channels(mono, 1) == mono
+    assert array("h", to_mixer_channels(mono, 2)).tolist() == [1, 1, -2, -2, 300, 300]
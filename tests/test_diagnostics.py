@@ -0,0 +1,43 @@
+import json
+import threading
+from utils import Diagnostics
+
+
+class SlowDriver:
+    """A driver whose page_source blocks until released, like a browser that stopped answering."""
+
+    current_url = "https://example.com"
+    title = "Example"
+    window_handles = ["main"]
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    @property
+    def page_source(self):
+        self.release.wait(5)
+        return "<html></html>"
+
+    def get_screenshot_as_png(self):
+        return b"png"
+
+    def get_log(self, kind):
+        return []
+
+
+def test_capture_times_out_but_keeps_the_driver_until_it_finishes(tmp_path, monkeypatch):
+    monkeypatch.setattr(Diagnostics, "DIAGNOSTICS_DIR", str(tmp_path))
+    driver = SlowDriver()
+    directory = Diagnostics.capture_failure(driver, "research_topic", RuntimeError("boom"), timeout=0.1)
+    with open(f"{directory}/info.json", encoding="utf-8") as f:
+        info = json.load(f)
+    assert "timeout" in info["capture_errors"]
+
+    assert not Diagnostics.wait_for_capture(driver, timeout=0.1)
+    driver.release.set()
+    assert Diagnostics.wait_for_capture(driver, timeout=5)
+    assert (tmp_path / directory / "screenshot.png").exists()
+
+
+def test_no_capture_means_nothing_to_wait_for():
+    assert Diagnostics.wait_for_capture(SlowDriver(), timeout=0)
@@ -0,0 +1,37 @@
+import pytest
+from utils import HtmlExtract
+from utils.HtmlExtract import extract_text_blocks, extract_result_links
+
+BACKENDS = [name for name in HtmlExtract.BACKENDS if name != "lxml" or HtmlExtract.etree is not None]
+
+
+@pytest.fixture(params=BACKENDS)
+def backend(request):
+    previous = HtmlExtract.get_backend()
+    HtmlExtract.set_backend(request.param)
+    yield request.param
+    HtmlExtract.set_backend(previous)
+
+
+@pytest.mark.parametrize("html,text", [
+    ("<ul><li>a<li>b</ul>", "a b"),
+    ("<li>a<li>b", "a b"),
+    ("<p>a<p>b", "a b"),
+    ("<ul><li>a<ul><li>x<li>y</ul><li>b</ul>", "axy x y b"),
+    ("<dl><dt>t<dd>d<dt>u</dl>", "t d u"),
+    ("<h1>Title</h1><script>var x;</script><p>Body</p>", "Title Body"),
+])
+def test_implicit_end_tags(backend, html, text):
+    assert extract_text_blocks(html, tags=("p", "li", "dt", "dd", "h1")) == text
+
+
+def test_result_links_without_closing_li(backend):
+    html = ('<ol><li class="b_algo"><h2><a href="https://a.example">A</a></h2>'
+            '<li class="b_algo"><h2><a href="https://b.example">B</a></h2></ol>')
+    assert extract_result_links(html) == [{"title": "A", "href": "https://a.example"},
+                                          {"title": "B", "href": "https://b.example"}]
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        HtmlExtract.set_backend("html5lib")
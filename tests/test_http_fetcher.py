@@ -0,0 +1,65 @@
+import pytest
+from utils import HttpFetcher
+from utils.HttpFetcher import needs_browser, extract_summary, fetch_summary_over_http, NO_CONTENT
+from utils.PageCache import PageCache
+
+ARTICLE = "<html><body><h1>Title</h1>" + "<p>" + "word " * 120 + "</p></body></html>"
+SHORT_PAGE = "<html><body><h1>Contact</h1><p>Call us at 555 0100.</p></body></html>"
+EMPTY_ROOT = '<html><body><div id="root"></div><script src="/app.js"></script></body></html>'
+NOSCRIPT = "<html><body><noscript>You need to enable JavaScript to run this app.</noscript></body></html>"
+MOSTLY_SCRIPTS = "<html><body><p>Loading</p><script>" + "var x = 1;" * 500 + "</script></body></html>"
+ARTICLE_WITH_NOSCRIPT = ARTICLE.replace("</body>", "<noscript>Please enable JavaScript for comments.</noscript></body>")
+
+
+@pytest.mark.parametrize("html,reason", [
+    (ARTICLE, ""),
+    (SHORT_PAGE, ""),
+    (ARTICLE_WITH_NOSCRIPT, ""),
+    (EMPTY_ROOT, "javascript shell"),
+    (NOSCRIPT, "javascript shell"),
+    (MOSTLY_SCRIPTS, "mostly scripts"),
+])
+def test_needs_browser(html, reason):
+    assert needs_browser(html, extract_summary(html)) == reason
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {"Content-Type": "text/html; charset=utf-8"}
+
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeSession:
+    def __init__(self, text):
+        self.text = text
+
+    def get(self, url, **kwargs):
+        return FakeResponse(self.text)
+
+
+@pytest.fixture
+def page_cache(tmp_path, monkeypatch):
+    cache = PageCache(path=str(tmp_path / "page_cache.sqlite3"))
+    monkeypatch.setattr(HttpFetcher, "get_page_cache", lambda: cache)
+    return cache
+
+
+def test_empty_page_says_so_and_is_not_cached(page_cache, monkeypatch):
+    monkeypatch.setattr(HttpFetcher, "get_http_session", lambda: FakeSession("<html><body><div></div></body></html>"))
+    assert fetch_summary_over_http("https://example.com/empty") == (NO_CONTENT, "")
+    assert page_cache.get_page("https://example.com/empty") is None
+
+
+def test_article_is_cached(page_cache, monkeypatch):
+    monkeypatch.setattr(HttpFetcher, "get_http_session", lambda: FakeSession(ARTICLE))
+    summary, reason = fetch_summary_over_http("https://example.com/article")
+    assert summary.startswith("Title word word") and reason == ""
+    assert page_cache.get_page("https://example.com/article")["summary"] == summary
+
+
+def test_page_fetch_session_does_not_retry():
+    adapter = HttpFetcher.get_http_session().get_adapter("https://example.com")
+    assert adapter.max_retries.total == 0
+    assert not adapter.max_retries.status_forcelist
@@ -0,0 +1,95 @@
+import pytest
+from utils.IntentRouter import IntentRouter
+
+ROUTED = [
+    ("go back", "go_back"),
+    ("jarvis, go back please", "go_back"),
+    ("back a page", "go_back"),
+    ("take me back", "go_back"),
+    ("go forward", "go_forward"),
+    ("forward one page", "go_forward"),
+    ("scroll down", "scroll_down"),
+    ("scroll the page up a bit", "scroll_up"),
+    ("close this tab", "close_tab"),
+    ("show me the jobs", "list_jobs"),
+    ("pause the music", "music_pause"),
+    ("could you stop the music", "music_pause"),
+    ("skip this song", "music_next"),
+    ("play the next track", "music_next"),
+    ("previous song", "music_previous"),
+    ("repeat this song", "music_repeat"),
+    ("turn on repeat", "music_repeat"),
+    ("repeat mode", "music_repeat"),
+    ("open spotify", "music_open"),
+    ("close spotify", "music_close"),
+    ("mute the music", "music_mute"),
+    ("unmute spotify", "music_unmute"),
+    ("set the volume to 40", "music_volume"),
+]
+
+FALL_THROUGH = [
+    "",
+    "repeat",
+    "can you repeat",
+    "can you repeat that",
+    "could you repeat that please",
+    "back",
+    "forward",
+    "next",
+    "skip",
+    "pause",
+    "can you pause",
+    "mute",
+    "unmute",
+    "stop",
+    "i'm back",
+    "welcome back",
+    "go back to sleep",
+    "how do i go back",
+    "pause for a second",
+    "pause the video",
+    "skip to the end",
+    "skip this one",
+    "next time",
+    "next page",
+    "go to the next page",
+    "show me the next page of results",
+    "what is the next step",
+    "what was the last song",
+    "forward this email to alice",
+    "move the meeting forward",
+    "volume up",
+    "what's the volume",
+    "search for the best pizza near me and open the first result",
+]
+
+VOLUMES = [
+    ("set the volume to 40", 40),
+    ("volume 0", 0),
+    ("turn the spotify volume to 100 percent", 100),
+    ("volume at 150%", 100),
+    ("set volume to 999", 100),
+]
+
+
+@pytest.fixture(scope="module")
+def router():
+    return IntentRouter()
+
+
+@pytest.mark.parametrize("utterance,intent", ROUTED)
+def test_routes(router, utterance, intent):
+    route = router.route(utterance)
+    assert route is not None and route.intent == intent
+
+
+@pytest.mark.parametrize("utterance", FALL_THROUGH)
+def test_falls_through_to_the_model(router, utterance):
+    assert router.route(utterance) is None
+
+
+@pytest.mark.parametrize("utterance,level", VOLUMES)
+def test_volume_is_clamped(router, utterance, level):
+    route = router.route(utterance)
+    assert route.name == "process_spotify_command"
+    assert route.args["command_data"] == {"command": "volume", "volume_level": level}
@@ -0,0 +1,35 @@
+import pytest
+from utils.JobManager import JobManager, JobCancelled, DONE, FAILED, CANCELLED
+
+
+def run_job(fn):
+    jobs = JobManager(max_workers=1)
+    job = jobs.submit("test_job", fn)
+    job.future.result(timeout=5)
+    jobs.close()
+    return job
+
+
+@pytest.mark.parametrize("result,state,error", [
+    ({"result": "Successfully processed the essay assignment"}, DONE, None),
+    ({"status": "success", "message": "Done"}, DONE, None),
+    (None, DONE, None),
+    ({"result": "Error: login page did not load"}, FAILED, "login page did not load"),
+    ({"status": "error", "message": "No assignments found"}, FAILED, "No assignments found"),
+])
+def test_error_results_count_as_failed(result, state, error):
+    job = run_job(lambda: result)
+    assert job.state == state
+    assert job.error == error
+
+
+def test_exceptions_and_cancellation():
+    def fail():
+        raise RuntimeError("boom")
+
+    def cancelled():
+        raise JobCancelled()
+
+    failed = run_job(fail)
+    assert (failed.state, failed.error) == (FAILED, "boom")
+    assert run_job(cancelled).state == CANCELLED
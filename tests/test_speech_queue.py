@@ -0,0 +1,44 @@
+import threading
+from utils.SpeechQueue import SpeechQueue
+
+
+def test_cancel_all_right_after_dequeue_skips_the_utterance():
+    speech = SpeechQueue()
+    played = []
+    dequeue = speech._queue.get
+
+    def get_then_barge_in(*args, **kwargs):
+        # cancel_all() lands between the worker's dequeue and its check of the handle
+        item = dequeue(*args, **kwargs)
+        if item[0].text == "stale" and not item[0].cancelled.is_set():
+            speech.cancel_all()
+        return item
+
+    # The worker is already blocked in the original get(); it picks up the patched one
+    # after the first utterance
+    speech._queue.get = get_then_barge_in
+    speech.submit("first", lambda handle: played.append(handle.text)).wait(2)
+    stale = speech.submit("stale", lambda handle: played.append(handle.text))
+    assert stale.wait(2)
+    assert stale.cancelled.is_set()
+    speech.submit("after", lambda handle: played.append(handle.text)).wait(2)
+    assert played == ["first", "after"]
+
+
+def test_cancel_all_drops_queued_and_cuts_off_current():
+    speech = SpeechQueue()
+    started = threading.Event()
+    played = []
+
+    def play_until_cancelled(handle):
+        started.set()
+        handle.cancelled.wait(2)
+        played.append(handle.text)
+
+    current = speech.submit("current", play_until_cancelled)
+    queued = speech.submit("queued", lambda handle: played.append(handle.text))
+    assert started.wait(2)
+    speech.cancel_all()
+    assert current.wait(2) and queued.wait(2)
+    assert current.cancelled.is_set() and queued.cancelled.is_set()
+    assert played == ["current"]
@@ -0,0 +1,49 @@
+import numpy as np
+from utils.VoiceCapture import AmbientNoise, EnergyVad, MicrophoneStream, FRAME_SAMPLES, FRAME_MS
+
+SECOND = 1000 // FRAME_MS
+
+
+def make_frame(amplitude, seed=0):
+    rng = np.random.default_rng(seed)
+    return (rng.standard_normal(FRAME_SAMPLES) * amplitude).astype(np.int16).tobytes()
+
+
+def make_stream(tmp_path, playing=False):
+    noise = AmbientNoise(path=str(tmp_path / "noise_profile.json"))
+    noise.seed(100.0)
+    return MicrophoneStream(noise=noise, noise_vad=EnergyVad(noise), is_playing=lambda: playing)
+
+
+def test_an_utterance_does_not_raise_the_floor(tmp_path):
+    stream = make_stream(tmp_path)
+    loud = make_frame(3000)
+    for _ in range(10 * SECOND):
+        stream.track_noise(loud)
+    assert stream.noise.floor == 100.0
+
+
+def test_a_sustained_louder_room_raises_the_floor(tmp_path):
+    # Steadily above the 150 threshold the old floor gives, so the VAD calls all of it speech
+    stream = make_stream(tmp_path)
+    louder_room = make_frame(400)
+    for _ in range(60 * SECOND):
+        stream.track_noise(louder_room)
+    assert 350 < stream.noise.floor < 450
+    assert not stream.noise_vad.is_speech(louder_room)
+
+
+def test_frames_while_speaking_are_ignored(tmp_path):
+    stream = make_stream(tmp_path, playing=True)
+    quiet = make_frame(50)
+    for _ in range(5 * SECOND):
+        stream.track_noise(quiet)
+    assert stream.noise.floor == 100.0
+
+
+def test_quiet_frames_update_the_floor(tmp_path):
+    stream = make_stream(tmp_path)
+    quiet = make_frame(50)
+    for _ in range(5 * SECOND):
+        stream.track_noise(quiet)
+    assert 40 < stream.noise.floor < 60
@@ -0,0 +1,61 @@
+from array import array
+
+# Streamed speech is raw 16-bit mono PCM from ElevenLabs, handed to pygame.mixer.Sound
+# as is. pygame doesn't resample a raw buffer: if the mixer runs at another rate or
+# channel count, the speech plays at the wrong speed and pitch. The mixer is opened with
+# allowedchanges=0, and whatever it really opened is checked here:
+#
+#   - a rate ElevenLabs can send (pcm_<rate>) and 16-bit: stream at that rate, mono
+#     samples are duplicated for a stereo mixer
+#   - anything else: no streaming, speech uses the MP3 path (SDL decodes it to the
+#     mixer's format)
+
+PCM_RATES = (16000, 22050, 24000, 44100)
+SAMPLE_WIDTH = 2
+
+
+class StreamFormat:
+    __slots__ = ("rate", "channels")
+
+    def __init__(self, rate, channels):
+        self.rate = rate
+        self.channels = channels
+
+    @property
+    def output_format(self):
+        """The ElevenLabs output_format to request."""
+        return f"pcm_{self.rate}"
+
+    def __repr__(self):
+        return f"StreamFormat({self.rate} Hz, {self.channels} channel(s))"
+
+
+def stream_format(mixer_init):
+    """
+    Decide how to stream speech to a mixer.
+
+    Args:
+        mixer_init (tuple or None): pygame.mixer.get_init(), i.e. (frequency, size, channels).
+
+    Returns:
+        StreamFormat or None: The PCM format to request, or None when streamed PCM can't
+        be played correctly and speech should fall back to MP3.
+    """
+    if not mixer_init:
+        return None
+    frequency, size, channels = mixer_init
+    if frequency not in PCM_RATES or size != -16 or channels not in (1, 2):
+        return None
+    return StreamFormat(frequency, channels)
+
+
+def to_mixer_channels(pcm, channels):
+    """Turn 16-bit mono PCM bytes into the mixer's channel count (1 or 2)."""
+    if channels == 1:
+        return bytes(pcm)
+    mono = array("h")
+    mono.frombytes(bytes(pcm))
+    stereo = array("h", bytes(len(mono) * 2 * SAMPLE_WIDTH))
+    stereo[0::2] = mono
+    stereo[1::2] = mono
+    return stereo.tobytes()
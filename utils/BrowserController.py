@@ -12,9 +12,13 @@ import requests
 import time
 import random
 import re
-from bs4 import BeautifulSoup
 from urllib.parse import urljoin
 import os
+from utils.HttpFetcher import fetch_summary_over_http, extract_summary, record_fetch
+from utils.PageCache import get_page_cache
+from utils.HtmlExtract import extract_result_links, extract_anchors, extract_text_nodes
+
+NEWS_CONTAINERS = [("div", "news-card"), ("div", "t_sdiv"), ("main", None)]
 
 def setup_browser_with_profile(headless=False):
     download_dir = os.path.join(os.getcwd(), "../downloads")
@@ -156,28 +160,20 @@ def click_search_result_link(driver, text, first_only=False):
 
         # Collect links based on page type
         page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
         links = []
         if is_news_page:
             # News page: Find <a> elements within news article containers
-            news_elements = soup.select("div.news-card a, div.t_sdiv a, main a")
+            news_elements = extract_anchors(page_source, within=NEWS_CONTAINERS)
             print(f"Debug: Found {len(news_elements)} news elements.")
             for elem in news_elements:
-                if 'href' in elem.attrs:
-                    title = elem.text.strip()
-                    if title:  # Only include links with non-empty text
-                        url = urljoin(driver.current_url, elem['href'])
-                        links.append({"title": title, "url": url})
+                if elem["title"]:  # Only include links with non-empty text
+                    links.append({"title": elem["title"], "url": urljoin(current_url, elem["href"])})
         else:
             # Standard search: Find <li class="b_algo"> elements
-            result_elements = soup.find_all('li', class_='b_algo')
+            result_elements = extract_result_links(page_source)
             print(f"Debug: Found {len(result_elements)} search result elements.")
             for elem in result_elements:
-                link = elem.find('a')
-                if link and 'href' in link.attrs:
-                    title = link.text.strip()
-                    url = urljoin(driver.current_url, link['href'])
-                    links.append({"title": title, "url": url})
+                links.append({"title": elem["title"], "url": urljoin(current_url, elem["href"])})
 
         # Log all link titles for debugging
         print("Debug: Available link titles:")
@@ -268,6 +264,133 @@ def normalize_text(text):
     """Normalize text by removing spaces and converting to lowercase."""
     return re.sub(r'\s+', '', text).lower()
 
+# Describes a list of elements in a single WebDriver round trip. Mirrors what the
+# per-element getters (textContent, .text, aria-label, is_displayed, ...) used to return.
+ELEMENT_DESCRIPTOR_JS = """
+return arguments[0].map(function (el) {
+    if (!el || !el.tagName) {
+        return null;
+    }
+    var style = window.getComputedStyle(el);
+    var rect = el.getBoundingClientRect();
+    var displayed = style.display !== 'none' && style.visibility !== 'hidden' &&
+        style.opacity !== '0' && (rect.width > 0 || rect.height > 0 || el.getClientRects().length > 0);
+    var href = (typeof el.href === 'string') ? el.href : el.getAttribute('href');
+    var innerText = (typeof el.innerText === 'string') ? el.innerText.trim() : '';
+    return {
+        textContent: el.textContent || '',
+        visibleText: (displayed && innerText) || el.getAttribute('aria-label') || el.getAttribute('title') || '',
+        ariaLabel: el.getAttribute('aria-label'),
+        title: el.getAttribute('title'),
+        tagName: el.tagName.toLowerCase(),
+        className: el.getAttribute('class') || '',
+        href: href || null,
+        hasOnclick: !!el.getAttribute('onclick'),
+        displayed: displayed,
+        enabled: !el.disabled
+    };
+});
+"""
+
+
+def inspect_elements(driver, elements):
+    """
+    Snapshot the attributes used for ranking click targets, for all elements at once.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        elements: WebElements to describe.
+
+    Returns:
+        list: One descriptor dict per element, in the same order. Elements that went
+        stale are described as hidden so they are never picked.
+    """
+    if not elements:
+        return []
+    try:
+        descriptors = driver.execute_script(ELEMENT_DESCRIPTOR_JS, elements)
+    except Exception as e:
+        print(f"Debug: Batched element inspection failed: {e}")
+        descriptors = [None] * len(elements)
+    empty = {
+        "textContent": "", "visibleText": "", "ariaLabel": None, "title": None, "tagName": "",
+        "className": "", "href": None, "hasOnclick": False, "displayed": False, "enabled": False
+    }
+    return [descriptor or dict(empty) for descriptor in descriptors]
+
+
+# Finds spans inside open shadow roots whose own text matches and returns their closest
+# clickable ancestor, all inside the page. Discovered shadow hosts are cached on window,
+# so the cache lives exactly as long as the page; it is rebuilt when the light DOM grows
+# or shrinks, or when a cached host has been detached.
+SHADOW_TEXT_LOCATOR_JS = """
+var needles = arguments[0], partial = arguments[1];
+var lightCount = document.getElementsByTagName('*').length;
+var cache = window.__jarvisShadowRoots;
+var cached = !!cache && cache.lightCount === lightCount &&
+    cache.hosts.every(function (host) { return host.isConnected && host.shadowRoot; });
+if (!cached) {
+    var hosts = [];
+    var collect = function (root) {
+        var all = root.querySelectorAll('*');
+        for (var i = 0; i < all.length; i++) {
+            if (all[i].shadowRoot) {
+                hosts.push(all[i]);
+                collect(all[i].shadowRoot);
+            }
+        }
+    };
+    collect(document);
+    cache = window.__jarvisShadowRoots = {lightCount: lightCount, hosts: hosts};
+}
+var matches = function (text) {
+    for (var n = 0; n < needles.length; n++) {
+        if (partial ? text.toLowerCase().indexOf(needles[n].toLowerCase()) !== -1 : text.trim() === needles[n]) {
+            return true;
+        }
+    }
+    return false;
+};
+var found = [];
+cache.hosts.forEach(function (host) {
+    var spans = host.shadowRoot.querySelectorAll('span');
+    for (var i = 0; i < spans.length; i++) {
+        var ownText = '';
+        for (var c = spans[i].firstChild; c; c = c.nextSibling) {
+            if (c.nodeType === Node.TEXT_NODE) {
+                ownText += c.nodeValue;
+            }
+        }
+        if (!ownText || !matches(ownText)) {
+            continue;
+        }
+        var clickable = spans[i].closest('a, button, [onclick]');
+        if (clickable && found.indexOf(clickable) === -1) {
+            found.push(clickable);
+        }
+    }
+});
+return {roots: cache.hosts.length, cached: cached, elements: found};
+"""
+
+
+def find_in_shadow_dom(driver, texts, partial=True):
+    """
+    Locate clickable ancestors of matching spans inside open shadow roots with one script call.
+
+    Args:
+        driver: Selenium WebDriver instance.
+        texts: Candidate texts (e.g. original and space-removed forms).
+        partial: Case-insensitive substring match if True, exact match otherwise.
+
+    Returns:
+        dict: {"roots": number of shadow roots, "cached": whether the root cache was reused,
+        "elements": list of WebElements}
+    """
+    result = driver.execute_script(SHADOW_TEXT_LOCATOR_JS, [t for t in texts if t], partial)
+    return result or {"roots": 0, "cached": False, "elements": []}
+
+
 def click_element_by_text(driver, text, partial=True):
     """
     Click an element (link, button, or clickable element) containing the specified text or attribute, including child elements or spans.
@@ -370,29 +493,12 @@ def click_element_by_text(driver, text, partial=True):
         # Span elements and their clickable parents, including shadow DOM
         span_elements = []
         try:
-            # Search all elements for shadow DOM
-            all_elements = driver.find_elements(By.CSS_SELECTOR, "*")
-            shadow_roots_found = 0
-            for host in all_elements:
-                try:
-                    shadow_root = driver.execute_script("return arguments[0].shadowRoot", host)
-                    if shadow_root:
-                        shadow_roots_found += 1
-                        print(
-                            f"Debug: Found shadow DOM in element: {host.tag_name}, classes: {host.get_attribute('class') or 'none'}")
-                        for xpath in [span_xpath_original, span_xpath_normalized]:
-                            shadow_spans = shadow_root.find_elements(By.XPATH, xpath)
-                            for span in shadow_spans:
-                                try:
-                                    parent = span.find_element(By.XPATH,
-                                                               "./ancestor::*[self::a or self::button or @onclick][1]")
-                                    elements.append(parent)
-                                    span_elements.append(span)
-                                except:
-                                    continue
-                except:
-                    continue
-            print(f"Debug: Total shadow DOM roots found: {shadow_roots_found}")
+            shadow_result = find_in_shadow_dom(driver, [original_text, normalized_text], partial)
+            print(f"Debug: Total shadow DOM roots found: {shadow_result['roots']} "
+                  f"({'cached' if shadow_result['cached'] else 'scanned'})")
+            for parent in shadow_result["elements"]:
+                if parent not in elements:
+                    elements.append(parent)
         except Exception as e:
             print(f"Debug: Shadow DOM search failed: {e}")
 
@@ -416,45 +522,40 @@ def click_element_by_text(driver, text, partial=True):
             return f"No elements found with text '{original_text}'."
 
         print(f"Debug: Found {len(elements)} matching elements (including spans with clickable parents).")
-        # Prioritize elements: <a> with href, <button> or onclick, then others
+        # Prioritize elements: <a> with href, <button> or onclick, then others.
+        # Everything needed for ranking comes from one execute_script snapshot.
+        descriptors = inspect_elements(driver, elements)
         prioritized_elements = []
-        for i, elem in enumerate(elements):
-            raw_text = elem.get_attribute("textContent") or ""
-            visible_text = elem.text.strip() or elem.get_attribute("aria-label") or elem.get_attribute(
-                "title") or f"Element {i}"
+        for i, (elem, info) in enumerate(zip(elements, descriptors)):
+            raw_text = info["textContent"]
+            visible_text = info["visibleText"] or f"Element {i}"
             normalized_elem_text = normalize_text(raw_text)
-            is_displayed = elem.is_displayed()
-            is_enabled = elem.is_enabled()
-            tag_name = elem.tag_name
-            classes = elem.get_attribute("class") or ""
-            href = elem.get_attribute("href") or "No href"
-            aria_label = elem.get_attribute("aria-label") or "No aria-label"
-            has_onclick = bool(elem.get_attribute("onclick"))
+            href = info["href"] or "No href"
+            aria_label = info["ariaLabel"] or "No aria-label"
             print(
-                f"Debug: Element {i}: RawText='{raw_text}', NormalizedText='{normalized_elem_text}', VisibleText='{visible_text}', Tag={tag_name}, Classes='{classes}', Href='{href}', AriaLabel='{aria_label}', Displayed={is_displayed}, Enabled={is_enabled}, HasOnclick={has_onclick}")
+                f"Debug: Element {i}: RawText='{raw_text}', NormalizedText='{normalized_elem_text}', VisibleText='{visible_text}', Tag={info['tagName']}, Classes='{info['className']}', Href='{href}', AriaLabel='{aria_label}', Displayed={info['displayed']}, Enabled={info['enabled']}, HasOnclick={info['hasOnclick']}")
 
             # Categorize elements
-            if tag_name == "a" and href.startswith(('http:', 'https:')):
-                prioritized_elements.append((0, i, elem))  # Priority 0: <a> with valid href
-            elif tag_name == "button" or has_onclick:
-                prioritized_elements.append((1, i, elem))  # Priority 1: <button> or onclick
+            if info["tagName"] == "a" and href.startswith(('http:', 'https:')):
+                prioritized_elements.append((0, i, elem, info))  # Priority 0: <a> with valid href
+            elif info["tagName"] == "button" or info["hasOnclick"]:
+                prioritized_elements.append((1, i, elem, info))  # Priority 1: <button> or onclick
             else:
-                prioritized_elements.append((2, i, elem))  # Priority 2: Others (e.g., <span>, <div>)
+                prioritized_elements.append((2, i, elem, info))  # Priority 2: Others (e.g., <span>, <div>)
 
         # Sort by priority and original index to maintain order within priority
         prioritized_elements.sort(key=lambda x: (x[0], x[1]))
-        clickable_elements = [e[2] for e in prioritized_elements if e[2].is_displayed() and e[2].is_enabled()]
+        clickable_elements = [(e[2], e[3]) for e in prioritized_elements if e[3]["displayed"] and e[3]["enabled"]]
 
         if not clickable_elements:
             print("Debug: No visible and enabled elements found.")
             return f"No visible and enabled elements found with text '{original_text}'."
 
         # Try clicking the first clickable element
-        element = clickable_elements[0]
-        visible_text = element.text.strip() or element.get_attribute("aria-label") or element.get_attribute(
-            "title") or "Element"
-        href = element.get_attribute("href") or None
-        tag_name = element.tag_name
+        element, info = clickable_elements[0]
+        visible_text = info["visibleText"] or "Element"
+        href = info["href"] or None
+        tag_name = info["tagName"]
         print(f"Debug: Targeting element with text: '{visible_text}', Tag={tag_name}, Href={href or 'No href'}")
 
         # Scroll to element and remove target attribute
@@ -508,14 +609,12 @@ def click_youtube_video(driver, video_description=None):
     try:
         wait_until_loaded(driver, By.TAG_NAME, "body", timeout=10)
         page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
+        current_url = driver.current_url
 
         youtube_links = []
-        for a in soup.find_all('a', href=True):
-            href = a['href']
-            if 'youtube.com/watch' in href or 'youtu.be' in href:
-                title = a.text.strip() or href
-                youtube_links.append({"title": title, "url": urljoin(driver.current_url, href)})
+        anchors = extract_anchors(page_source, href_filter=lambda href: 'youtube.com/watch' in href or 'youtu.be' in href)
+        for a in anchors:
+            youtube_links.append({"title": a["title"] or a["href"], "url": urljoin(current_url, a["href"])})
 
         if not youtube_links:
             return "No YouTube videos found on the page."
@@ -628,12 +727,11 @@ def extract_contact_info(driver, organization):
     try:
         wait_until_loaded(driver, By.TAG_NAME, "body", timeout=10)
         page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
 
         phone_regex = r'\b(\+?1[-.\s]?)?(\(?\d{3}\)?[-.\s]?)?\d{3}[-.\s]?\d{4}\b'
         phone_numbers = set()
 
-        for text in soup.find_all(text=True):
+        for text in extract_text_nodes(page_source):
             matches = re.findall(phone_regex, text)
             for match in matches:
                 phone = ''.join(filter(str.isdigit, ''.join(match)))
@@ -652,48 +750,51 @@ def collect_search_links(driver, max_links=10):
     """
     Collect the first max_links from the search results page.
     Returns a list of dictionaries with URL and title.
+    Callers cache the links under the query they searched for (PageCache.put_search) and
+    check that cache before loading the search page at all.
     """
     try:
         wait_until_loaded(driver, By.TAG_NAME, "body", timeout=10)
         page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
+        current_url = driver.current_url
 
         links = []
-        result_elements = soup.find_all('li', class_='b_algo')[:max_links]
-
-        for elem in result_elements:
-            link = elem.find('a')
-            if link and 'href' in link.attrs:
-                title = link.text.strip()
-                url = link['href']
-                url = urljoin(driver.current_url, url)
-                links.append({"title": title, "url": url})
+        # Parsing stops once max_links results are in
+        for elem in extract_result_links(page_source, max_links):
+            links.append({"title": elem["title"], "url": urljoin(current_url, elem["href"])})
 
         return links if links else [{"title": "No links found", "url": ""}]
     except Exception as e:
         print(f"Error collecting links: {e}")
         return [{"title": "Error collecting links", "url": ""}]
 
-def summarize_page(driver, url):
+def summarize_page(driver, url, http_first=True):
     """
-    Navigate to a URL and summarize its content.
-    Returns a brief summary of the page.
+    Summarize the content of a URL.
+    Tries a plain HTTP fetch first and only navigates the driver when the page needs
+    JavaScript to render. Returns a brief summary of the page.
     """
+    reason = ""
+    if http_first:
+        summary, reason = fetch_summary_over_http(url)
+        if summary is not None:
+            return summary
+    if driver is None:
+        record_fetch(url, "failed", reason or "no browser available")
+        return f"Error summarizing page {url}."
+
     try:
         driver.get(url)
         wait_until_loaded(driver, By.TAG_NAME, "body", timeout=10)
-        page_source = driver.page_source
-        soup = BeautifulSoup(page_source, 'html.parser')
-
-        text_elements = soup.find_all(['p', 'h1', 'h2', 'h3', 'li'])
-        text = ' '.join(elem.get_text().strip() for elem in text_elements if elem.get_text().strip())
-
-        words = text.split()[:200]
-        summary = ' '.join(words)
+        summary = extract_summary(driver.page_source)
+        record_fetch(url, "browser", reason)
+        if summary:
+            get_page_cache().put_page(url, summary)
 
         return summary if summary else "No content found to summarize."
     except Exception as e:
         print(f"Error summarizing page {url}: {e}")
+        record_fetch(url, "failed", str(e))
         return f"Error summarizing page {url}."
 
 def fill_form(driver, url, form_data):
@@ -0,0 +1,231 @@
+import os
+import threading
+from contextlib import contextmanager
+from utils.BrowserController import setup_browser_with_profile
+from utils.Diagnostics import wait_for_capture
+
+# Keeps a few warm headless Chrome instances around so tools like research_topic don't
+# pay several seconds of Chrome startup on every call.
+
+POOL_SIZE = int(os.getenv("JARVIS_BROWSER_POOL_SIZE", "2"))
+MAX_USES = int(os.getenv("JARVIS_BROWSER_MAX_USES", "20"))
+
+
+def is_driver_healthy(driver):
+    """Return True if the driver still answers and has a window to work with."""
+    try:
+        driver.current_window_handle
+        driver.execute_script("return 1")
+        return True
+    except Exception:
+        return False
+
+
+def _quit_driver(driver):
+    # A failure capture that outlived its caller may still be reading from the browser
+    if not wait_for_capture(driver):
+        print("Warning: Failure capture is still running, quitting the browser anyway")
+    try:
+        driver.quit()
+    except Exception as e:
+        print(f"Warning: Could not quit pooled browser: {e}")
+
+
+def quit_driver_async(driver):
+    """Quit driver on a background thread; a browser that hangs on quit doesn't hold up the caller."""
+    threading.Thread(target=_quit_driver, args=(driver,), name="quit-browser", daemon=True).start()
+
+
+class BrowserPool:
+    """
+    Pool of headless Chrome drivers with a lease/return API.
+
+    Drivers are health checked when they are leased and when they come back, and are
+    recycled (quit and replaced lazily) after max_uses leases or when a caller reports
+    that something went wrong with them.
+    """
+
+    def __init__(self, size=POOL_SIZE, max_uses=MAX_USES, headless=True):
+        self.size = size
+        self.max_uses = max_uses
+        self.headless = headless
+        self._idle = []
+        self._uses = {}
+        self._total = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _create(self):
+        driver = setup_browser_with_profile(headless=self.headless)
+        with self._condition:
+            self._uses[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver, wait=False):
+        with self._condition:
+            self._uses.pop(id(driver), None)
+            self._total -= 1
+            self._condition.notify()
+        if wait:
+            _quit_driver(driver)  # Shutting down: the process may exit before a background quit ran
+        else:
+            quit_driver_async(driver)
+
+    def acquire(self, timeout=None):
+        """Lease a driver, starting a new one if the pool isn't full yet."""
+        while True:
+            with self._condition:
+                if self._closed:
+                    raise Exception("Browser pool is closed")
+                if not self._idle and self._total >= self.size:
+                    if not self._condition.wait(timeout):
+                        raise Exception("Timed out waiting for a browser from the pool")
+                    continue
+                if self._idle:
+                    driver = self._idle.pop()
+                else:
+                    driver = None
+                    self._total += 1
+
+            if driver is None:
+                try:
+                    return self._create()
+                except Exception:
+                    with self._condition:
+                        self._total -= 1
+                        self._condition.notify()
+                    raise
+
+            if is_driver_healthy(driver):
+                return driver
+            print("Debug: Pooled browser failed health check, replacing it.")
+            self._discard(driver)
+
+    def release(self, driver, recycle=False):
+        """Return a leased driver. recycle=True quits it instead of reusing it."""
+        with self._condition:
+            uses = self._uses.get(id(driver), 0) + 1
+            self._uses[id(driver)] = uses
+            closed = self._closed
+
+        if closed or recycle or uses >= self.max_uses or not self._reset(driver):
+            self._discard(driver, wait=closed)
+            return
+
+        with self._condition:
+            self._idle.append(driver)
+            self._condition.notify()
+
+    def _reset(self, driver):
+        """Bring a driver back to a single blank tab before handing it out again."""
+        try:
+            handles = driver.window_handles
+            for handle in handles[1:]:
+                driver.switch_to.window(handle)
+                driver.close()
+            driver.switch_to.window(handles[0])
+            driver.get("about:blank")
+            return True
+        except Exception as e:
+            print(f"Debug: Could not reset pooled browser: {e}")
+            return False
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """Context manager around acquire()/release(); the driver is recycled if the block raises."""
+        driver = self.acquire(timeout)
+        failed = False
+        try:
+            yield driver
+        except Exception:
+            failed = True
+            raise
+        finally:
+            self.release(driver, recycle=failed)
+
+    def warm(self, count=None):
+        """Start up to count idle drivers in a background thread."""
+        count = self.size if count is None else min(count, self.size)
+
+        def worker():
+            for _ in range(count):
+                with self._condition:
+                    if self._closed or self._total >= self.size:
+                        return
+                    self._total += 1
+                try:
+                    driver = self._create()
+                except Exception as e:
+                    print(f"Warning: Could not pre-start pooled browser: {e}")
+                    with self._condition:
+                        self._total -= 1
+                        self._condition.notify()
+                    return
+                with self._condition:
+                    self._idle.append(driver)
+                    self._condition.notify()
+
+        thread = threading.Thread(target=worker, name="browser-pool-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def close(self):
+        """Quit every idle driver; drivers still leased are quit when they are released."""
+        with self._condition:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._total -= len(idle)
+            self._condition.notify_all()
+        for driver in idle:
+            self._uses.pop(id(driver), None)
+            _quit_driver(driver)
+
+
+class SharedBrowser:
+    """
+    The visible browser main's tools drive. recycle() throws it away (after a tool got
+    stuck on it) and the next use starts a fresh one.
+    """
+
+    def __init__(self, headless=False):
+        self.headless = headless
+        self._driver = None
+        self._lock = threading.Lock()
+
+    @property
+    def driver(self):
+        with self._lock:
+            if self._driver is None:
+                self._driver = setup_browser_with_profile(headless=self.headless)
+            return self._driver
+
+    def recycle(self):
+        """Quit the current driver in the background; returns at once."""
+        with self._lock:
+            driver, self._driver = self._driver, None
+        if driver is not None:
+            quit_driver_async(driver)
+
+    def quit(self):
+        with self._lock:
+            driver, self._driver = self._driver, None
+        if driver is not None:
+            _quit_driver(driver)
+
+
+_browser_pool = None
+_browser_pool_lock = threading.Lock()
+
+
+def get_browser_pool():
+    """Return the process-wide BrowserPool."""
+    global _browser_pool
+    with _browser_pool_lock:
+        if _browser_pool is None:
+            _browser_pool = BrowserPool()
+        return _browser_pool
+
+
+def lease_browser(timeout=None):
+    """Shortcut for get_browser_pool().lease()."""
+    return get_browser_pool().lease(timeout)
@@ -0,0 +1,135 @@
+import os
+import json
+import time
+import shutil
+import threading
+import traceback
+
+# Failure capture for browser tools. They used to stop at input() on an error and leave
+# the browser open for someone at the terminal, which froze a voice session until Enter
+# was pressed. Now the state of the browser is saved under ../diagnostics and the driver
+# is released right away:
+#
+#   info.json      - tool, arguments, error, traceback, URL, title and open windows
+#   page.html      - the page source
+#   screenshot.png - what the browser showed
+#   cdp_log.jsonl  - the last CDP_LOG_TAIL entries of the performance (DevTools) log
+#
+# A wedged driver can't hold anything up: capture gets CAPTURE_TIMEOUT seconds and
+# whatever is done by then is kept. A capture that is still running then keeps its
+# driver alive: BrowserPool calls wait_for_capture() before quitting a driver, so the
+# browser isn't torn down under it (for at most CAPTURE_JOIN_TIMEOUT seconds).
+
+DIAGNOSTICS_DIR = os.path.join(os.getcwd(), "../diagnostics")
+CAPTURE_TIMEOUT = float(os.getenv("JARVIS_CAPTURE_TIMEOUT", "10"))
+CDP_LOG_TAIL = 200
+MAX_CAPTURES = int(os.getenv("JARVIS_MAX_CAPTURES", "20"))
+CAPTURE_JOIN_TIMEOUT = 120  # Selenium's own command timeout; a capture can't take longer per step
+
+_prune_lock = threading.Lock()
+_captures = {}  # id(driver) -> capture thread still talking to it
+_captures_lock = threading.Lock()
+
+
+def _write(path, data, mode="w"):
+    with open(path, mode, **({} if "b" in mode else {"encoding": "utf-8"})) as f:
+        f.write(data)
+
+
+def _capture(driver, directory, info):
+    steps = [
+        ("url", lambda: info.__setitem__("url", driver.current_url)),
+        ("title", lambda: info.__setitem__("title", driver.title)),
+        ("windows", lambda: info.__setitem__("windows", len(driver.window_handles))),
+        ("page.html", lambda: _write(os.path.join(directory, "page.html"), driver.page_source)),
+        ("screenshot.png", lambda: _write(os.path.join(directory, "screenshot.png"),
+                                          driver.get_screenshot_as_png(), "wb")),
+        ("cdp_log.jsonl", lambda: _write(os.path.join(directory, "cdp_log.jsonl"), "".join(
+            json.dumps(entry) + "\n" for entry in driver.get_log("performance")[-CDP_LOG_TAIL:]))),
+    ]
+    try:
+        for name, step in steps:
+            try:
+                step()
+                info["captured"].append(name)
+            except Exception as e:
+                info["capture_errors"][name] = str(e)
+    finally:
+        with _captures_lock:
+            if _captures.get(id(driver)) is threading.current_thread():
+                del _captures[id(driver)]
+
+
+def wait_for_capture(driver, timeout=CAPTURE_JOIN_TIMEOUT):
+    """
+    Wait until no failure capture is using driver anymore; call before quitting it.
+
+    Returns:
+        bool: False if a capture was still running after timeout seconds.
+    """
+    with _captures_lock:
+        worker = _captures.get(id(driver))
+    if worker is None:
+        return True
+    worker.join(timeout)
+    return not worker.is_alive()
+
+
+def _prune(keep=MAX_CAPTURES):
+    with _prune_lock:
+        try:
+            captures = sorted(entry for entry in os.listdir(DIAGNOSTICS_DIR)
+                              if os.path.isdir(os.path.join(DIAGNOSTICS_DIR, entry)))
+        except FileNotFoundError:
+            return
+        for entry in captures[:max(0, len(captures) - keep)]:
+            shutil.rmtree(os.path.join(DIAGNOSTICS_DIR, entry), ignore_errors=True)
+
+
+def capture_failure(driver, tool, error, args=None, timeout=CAPTURE_TIMEOUT):
+    """
+    Save what the browser looked like when a tool failed. Never raises.
+
+    Args:
+        driver: The Selenium driver the tool was using (None to record only the error).
+        tool (str): Name of the tool that failed.
+        error (Exception): What went wrong; the traceback is taken from it.
+        args (dict, optional): The tool's arguments.
+        timeout (float): Seconds to spend talking to the driver at most.
+
+    Returns:
+        str or None: The directory the capture was written to.
+    """
+    try:
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        directory = os.path.join(DIAGNOSTICS_DIR, f"{stamp}-{int(time.time() * 1000) % 1000:03d}-{tool}")
+        os.makedirs(directory, exist_ok=True)
+        info = {
+            "tool": tool,
+            "args": args,
+            "error": str(error),
+            "error_type": type(error).__name__,
+            "traceback": "".join(traceback.format_exception(type(error), error, error.__traceback__)),
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "captured": [],
+            "capture_errors": {}
+        }
+        if driver is not None:
+            # On its own thread so a driver that stopped answering can't stall the caller
+            worker = threading.Thread(target=_capture, args=(driver, directory, info), name="failure-capture",
+                                      daemon=True)
+            with _captures_lock:
+                _captures[id(driver)] = worker
+            worker.start()
+            worker.join(timeout)
+            if worker.is_alive():
+                info["capture_errors"]["timeout"] = f"Driver did not answer within {timeout:.0f}s"
+        # Copied, since a timed out capture thread may still be adding to it
+        snapshot = {key: value.copy() if isinstance(value, (list, dict)) else value for key, value in info.items()}
+        _write(os.path.join(directory, "info.json"), json.dumps(snapshot, indent=2, default=str))
+        _prune()
+        print(f"Debug: Saved diagnostics for {tool} to {directory}")
+        return directory
+    except Exception as e:
+        print(f"Warning: Could not save diagnostics for {tool}: {e}")
+        return None
@@ -0,0 +1,171 @@
+import os
+import time
+import threading
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+# Decides what happens after a tool ran. main used to send every function response back
+# to Gemini and wait for it, only to print the reply, which doubled the model latency of
+# every command. Per tool the follow-up is now one of:
+#
+#   skip     - nothing; the tool already spoke or the result needs no words
+#   template - a one-line summary rendered locally from the result
+#   async    - the model narrates the result on a background thread, main moves on
+#   sync     - the old behaviour: wait for the model's narration
+#
+# JARVIS_FOLLOWUP_POLICY overrides single tools, e.g. "do_homework=sync,go_back=skip".
+
+SKIP = "skip"
+TEMPLATE = "template"
+ASYNC = "async"
+SYNC = "sync"
+MODES = (SKIP, TEMPLATE, ASYNC, SYNC)
+DEFAULT_MODE = ASYNC
+
+TOOL_POLICIES = {
+    "research_topic": SKIP,  # The summary is spoken by main
+    "process_spotify_command": SKIP,  # SpotifyAI speaks its own response
+    "go_back": TEMPLATE,
+    "go_forward": TEMPLATE,
+    "scroll_down": TEMPLATE,
+    "scroll_up": TEMPLATE,
+    "close_tab": TEMPLATE,
+    "navigate_to_url": TEMPLATE,
+    "click_element": TEMPLATE,
+    "click_youtube_video": TEMPLATE,
+    "click_search_result_link": TEMPLATE,
+    "search_web": TEMPLATE,
+    "login_truman": TEMPLATE,
+    "remember_info": TEMPLATE,
+    "recall_info": TEMPLATE,
+    "send_email": TEMPLATE,
+    "call": TEMPLATE,
+    "search_contact_info": ASYNC,
+    "do_homework": SKIP,  # Job tools: main speaks their message, the job manager announces the result
+    "list_jobs": SKIP,
+    "job_status": SKIP,
+    "cancel_job": SKIP,
+}
+
+
+def _parse_overrides(value):
+    overrides = {}
+    for item in (value or "").split(","):
+        name, _, mode = item.partition("=")
+        if name.strip() and mode.strip() in MODES:
+            overrides[name.strip()] = mode.strip()
+    return overrides
+
+
+TOOL_POLICIES.update(_parse_overrides(os.getenv("JARVIS_FOLLOWUP_POLICY")))
+
+
+def render_template(function_name, result):
+    """One line describing a tool result, without a model."""
+    if result is None:
+        return f"{function_name} finished."
+    if isinstance(result, str):
+        return result
+    if isinstance(result, dict):
+        for key in ("message", "value", "result"):
+            if result.get(key):
+                return str(result[key])
+        if result.get("status"):
+            return f"{function_name}: {result['status']}"
+    return f"{function_name} finished."
+
+
+class FollowUpEngine:
+    """
+    Applies the follow-up policy for each tool result and counts what it avoided.
+
+    generate(contents) is the model call used for async and sync follow-ups; it must
+    return a response with a .text attribute.
+    """
+
+    def __init__(self, generate, policies=TOOL_POLICIES, default_mode=DEFAULT_MODE):
+        self.generate = generate
+        self.policies = policies
+        self.default_mode = default_mode
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="follow-up")
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self._seconds = 0.0
+        self._narrated = 0
+
+    def mode_for(self, function_name, result):
+        mode = self.policies.get(function_name, self.default_mode)
+        # Errors are reported as they are; no need to ask the model to rephrase them
+        if mode in (ASYNC, SYNC) and isinstance(result, dict) and result.get("status") == "error":
+            return TEMPLATE
+        return mode
+
+    def handle(self, function_name, result, contents):
+        """
+        Run the follow-up for one tool call.
+
+        Args:
+            function_name (str): The tool that ran.
+            result: What the tool returned.
+            contents (list): The conversation to send if the model is asked to narrate.
+
+        Returns:
+            str: The mode that was applied.
+        """
+        return self.handle_batch([(function_name, result)], contents)[0]
+
+    def handle_batch(self, results, contents):
+        """
+        Run the follow-ups for the tool calls of one turn.
+
+        Templates are printed per tool, but the model is asked to narrate at most once
+        for the whole turn (synchronously if any of the tools wants that).
+
+        Args:
+            results (list): (function_name, result) pairs.
+            contents (list): The conversation to send if the model is asked to narrate.
+
+        Returns:
+            list: The mode applied to each tool.
+        """
+        modes = [self.mode_for(function_name, result) for function_name, result in results]
+        with self._lock:
+            self._stats.update(modes)
+        for (function_name, result), mode in zip(results, modes):
+            if mode == TEMPLATE:
+                print(render_template(function_name, result))
+        narrated = ", ".join(name for (name, _), mode in zip(results, modes) if mode in (ASYNC, SYNC))
+        if SYNC in modes:
+            self._narrate(narrated, contents)
+        elif ASYNC in modes:
+            self._executor.submit(self._narrate, narrated, contents)
+        return modes
+
+    def _narrate(self, function_name, contents):
+        start = time.perf_counter()
+        try:
+            response = self.generate(contents)
+            print(response.text)
+        except Exception as e:
+            print(f"Sir, I tripped over the function response of {function_name}: {e}")
+        with self._lock:
+            self._seconds += time.perf_counter() - start
+            self._narrated += 1
+
+    def stats(self):
+        """
+        Returns:
+            dict: Follow-ups per mode, model calls avoided (skip + template), model calls
+            taken off the critical path (async) and the average model follow-up time.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            return {
+                "by_mode": stats,
+                "calls_avoided": self._stats[SKIP] + self._stats[TEMPLATE],
+                "calls_deferred": self._stats[ASYNC],
+                "model_ms_avg": self._seconds * 1000 / self._narrated if self._narrated else None
+            }
+
+    def close(self):
+        self._executor.shutdown(wait=False)
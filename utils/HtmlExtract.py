@@ -0,0 +1,370 @@
+import os
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+except ImportError:
+    etree = None
+
+# Streaming HTML extraction. Browser tools only ever need a small slice of a page (the
+# first 200 words, the first N search results, the anchors of one kind), so instead of
+# building a full BeautifulSoup tree the page is fed to an event-driven parser in chunks
+# and parsing stops as soon as the extractor has what it needs.
+#
+# Backends: "lxml" (libxml2 HTML parser, used when lxml is installed) and "stdlib"
+# (html.parser). Select one with JARVIS_HTML_BACKEND or set_backend(); a JARVIS_HTML_BACKEND
+# that is unknown or not installed is ignored with a warning.
+
+CHUNK_SIZE = 16384
+SUMMARY_TAGS = ("p", "h1", "h2", "h3", "li")
+
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "param", "source",
+             "track", "wbr"}
+# Start tags that implicitly close an open <p> (html.parser doesn't do this for us)
+CLOSES_P_TAGS = {"address", "article", "aside", "blockquote", "div", "dl", "fieldset", "footer", "form", "h1", "h2",
+                 "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "pre", "section", "table",
+                 "ul"}
+# Start tags that implicitly close an open element of their own kind, unless one of the
+# boundary tags comes first: <li>a<li>b is two items, but a <li> in a nested list
+# doesn't close the item the list is in
+IMPLIED_END_TAGS = {
+    "li": ({"li"}, {"ul", "ol", "menu", "table"}),
+    "dt": ({"dt", "dd"}, {"dl", "table"}),
+    "dd": ({"dt", "dd"}, {"dl", "table"}),
+}
+SKIP_TEXT_TAGS = {"script", "style", "noscript", "template"}
+
+BACKENDS = ("lxml", "stdlib")
+_backend = "lxml" if etree is not None else "stdlib"
+
+
+def set_backend(name):
+    """Switch the parser backend ("lxml" or "stdlib")."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown HTML backend '{name}', expected one of {BACKENDS}")
+    if name == "lxml" and etree is None:
+        raise ValueError("lxml backend requested but lxml is not installed")
+    _backend = name
+
+
+def get_backend():
+    return _backend
+
+
+if os.getenv("JARVIS_HTML_BACKEND"):
+    try:
+        set_backend(os.getenv("JARVIS_HTML_BACKEND").strip().lower())
+    except ValueError as e:
+        print(f"Warning: {e}, using the {_backend} backend")
+
+
+class _Node:
+    __slots__ = ("tag", "attrs", "state")
+
+    def __init__(self, tag, attrs):
+        self.tag = tag
+        self.attrs = attrs
+        self.state = None
+
+    def has_class(self, name):
+        return name in (self.attrs.get("class") or "").split()
+
+
+class _Extractor:
+    """
+    Base class for extractors: keeps a tolerant stack of open elements and forwards
+    open/text/close events to the subclass hooks. Setting self.done stops parsing.
+    """
+
+    def __init__(self):
+        self.stack = []
+        self.done = False
+        self._skip_depth = 0
+
+    def start(self, tag, attrs):
+        if self.done:
+            return
+        tag = tag.lower()
+        if tag in CLOSES_P_TAGS and self.stack and self.stack[-1].tag == "p":
+            self._close_top()
+        if tag in IMPLIED_END_TAGS:
+            self._close_implied(*IMPLIED_END_TAGS[tag])
+        node = _Node(tag, attrs)
+        self.handle_open(node)
+        if tag in VOID_TAGS:
+            self.handle_close(node)
+            return
+        if tag in SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+        self.stack.append(node)
+
+    def end(self, tag):
+        if self.done:
+            return
+        tag = tag.lower()
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i].tag == tag:
+                while len(self.stack) > i and not self.done:
+                    self._close_top()
+                return
+
+    def data(self, text):
+        if self.done or self._skip_depth:
+            return
+        self.handle_text(text)
+
+    def _close_implied(self, tags, boundaries):
+        for i in range(len(self.stack) - 1, -1, -1):
+            if self.stack[i].tag in boundaries:
+                return
+            if self.stack[i].tag in tags:
+                while len(self.stack) > i and not self.done:
+                    self._close_top()
+                return
+
+    def finish(self):
+        while self.stack and not self.done:
+            self._close_top()
+
+    def _close_top(self):
+        node = self.stack.pop()
+        if node.tag in SKIP_TEXT_TAGS:
+            self._skip_depth -= 1
+        self.handle_close(node)
+
+    def handle_open(self, node):
+        pass
+
+    def handle_text(self, text):
+        pass
+
+    def handle_close(self, node):
+        pass
+
+
+class _StdlibParser(HTMLParser):
+    def __init__(self, extractor):
+        super().__init__(convert_charrefs=True)
+        self.extractor = extractor
+
+    def handle_starttag(self, tag, attrs):
+        self.extractor.start(tag, {k: v or "" for k, v in attrs})
+
+    def handle_startendtag(self, tag, attrs):
+        self.extractor.start(tag, {k: v or "" for k, v in attrs})
+        if tag.lower() not in VOID_TAGS:
+            self.extractor.end(tag)
+
+    def handle_endtag(self, tag):
+        self.extractor.end(tag)
+
+    def handle_data(self, data):
+        self.extractor.data(data)
+
+
+class _LxmlTarget:
+    def __init__(self, extractor):
+        self.extractor = extractor
+
+    def start(self, tag, attrib):
+        self.extractor.start(tag, dict(attrib))
+
+    def end(self, tag):
+        self.extractor.end(tag)
+
+    def data(self, data):
+        self.extractor.data(data)
+
+    def close(self):
+        self.extractor.finish()
+
+
+def _run(html, extractor):
+    """Feed html to the active backend in chunks until the extractor is done."""
+    if not html:
+        return extractor
+    if _backend == "lxml":
+        parser = etree.HTMLParser(target=_LxmlTarget(extractor))
+    else:
+        parser = _StdlibParser(extractor)
+    for i in range(0, len(html), CHUNK_SIZE):
+        parser.feed(html[i:i + CHUNK_SIZE])
+        if extractor.done:
+            return extractor
+    parser.close()
+    if _backend != "lxml":
+        extractor.finish()
+    return extractor
+
+
+class _TextBlocks(_Extractor):
+    def __init__(self, tags, max_words):
+        super().__init__()
+        self.tags = set(tags)
+        self.max_words = max_words
+        self.blocks = []
+        self.active = []
+        self.next_block = 0
+        self.words = []
+
+    def handle_open(self, node):
+        if node.tag in self.tags:
+            node.state = len(self.blocks)
+            self.blocks.append(None)
+            self.active.append((node, []))
+
+    def handle_text(self, text):
+        for _, parts in self.active:
+            parts.append(text)
+
+    def handle_close(self, node):
+        if node.state is None:
+            return
+        for i in range(len(self.active) - 1, -1, -1):
+            if self.active[i][0] is node:
+                _, parts = self.active.pop(i)
+                self.blocks[node.state] = "".join(parts).strip()
+                break
+        # Blocks are emitted in document (start tag) order; stop once enough words are in
+        while self.next_block < len(self.blocks) and self.blocks[self.next_block] is not None:
+            self.words.extend(self.blocks[self.next_block].split())
+            self.next_block += 1
+            if self.max_words is not None and len(self.words) >= self.max_words:
+                self.done = True
+                return
+
+
+class _ResultLinks(_Extractor):
+    def __init__(self, container_tag, container_class, max_links):
+        super().__init__()
+        self.container_tag = container_tag
+        self.container_class = container_class
+        self.max_links = max_links
+        self.container = None
+        self.anchor = None
+        self.links = []
+
+    def handle_open(self, node):
+        if self.container is None:
+            if node.tag == self.container_tag and (not self.container_class or node.has_class(self.container_class)):
+                node.state = {"seen_anchor": False}
+                self.container = node
+        elif node.tag == "a" and not self.container.state["seen_anchor"]:
+            # Only the first <a> of each result counts, like result.find('a')
+            self.container.state["seen_anchor"] = True
+            if "href" in node.attrs:
+                node.state = []
+                self.anchor = node
+
+    def handle_text(self, text):
+        if self.anchor is not None:
+            self.anchor.state.append(text)
+
+    def handle_close(self, node):
+        if node is self.anchor:
+            self.links.append({"title": "".join(node.state).strip(), "href": node.attrs["href"]})
+            self.anchor = None
+            if self.max_links is not None and len(self.links) >= self.max_links:
+                self.done = True
+        elif node is self.container:
+            self.container = None
+
+
+class _Anchors(_Extractor):
+    def __init__(self, href_filter, within, limit):
+        super().__init__()
+        self.href_filter = href_filter
+        self.within = within
+        self.limit = limit
+        self.container_depth = 0
+        self.anchors = []
+        self.open_anchors = []
+
+    def _is_container(self, node):
+        for tag, cls in self.within:
+            if node.tag == tag and (cls is None or node.has_class(cls)):
+                return True
+        return False
+
+    def handle_open(self, node):
+        if self.within and self._is_container(node):
+            node.state = "container"
+            self.container_depth += 1
+        if node.tag != "a" or "href" not in node.attrs:
+            return
+        if self.within and not self.container_depth:
+            return
+        if self.href_filter and not self.href_filter(node.attrs["href"]):
+            return
+        node.state = []
+        self.open_anchors.append(node)
+
+    def handle_text(self, text):
+        for node in self.open_anchors:
+            node.state.append(text)
+
+    def handle_close(self, node):
+        if node.state == "container":
+            self.container_depth -= 1
+        elif node in self.open_anchors:
+            self.open_anchors.remove(node)
+            self.anchors.append({"title": "".join(node.state).strip(), "href": node.attrs["href"]})
+            if self.limit is not None and len(self.anchors) >= self.limit:
+                self.done = True
+
+
+class _TextNodes(_Extractor):
+    def __init__(self):
+        super().__init__()
+        self.texts = []
+
+    def handle_text(self, text):
+        self.texts.append(text)
+
+
+def extract_text_blocks(html, tags=SUMMARY_TAGS, max_words=200):
+    """
+    Join the text of the given block tags in document order, stopping after max_words.
+
+    Returns:
+        str: At most max_words words of text.
+    """
+    extractor = _run(html, _TextBlocks(tags, max_words))
+    if not extractor.done:
+        # Parsing ran to the end; pick up blocks that closed out of order
+        for block in extractor.blocks[extractor.next_block:]:
+            if block:
+                extractor.words.extend(block.split())
+    words = extractor.words if max_words is None else extractor.words[:max_words]
+    return " ".join(words)
+
+
+def extract_result_links(html, max_links=None, container_tag="li", container_class="b_algo"):
+    """
+    Return the first <a> of each search result container (Bing's <li class="b_algo"> by default).
+
+    Returns:
+        list: Dictionaries with "title" and raw "href", at most max_links of them.
+    """
+    return _run(html, _ResultLinks(container_tag, container_class, max_links)).links
+
+
+def extract_anchors(html, href_filter=None, within=None, limit=None):
+    """
+    Return <a href> elements, optionally only those inside given containers.
+
+    Args:
+        href_filter (callable, optional): Keep anchors whose href passes this check.
+        within (list, optional): (tag, class or None) pairs; anchors must be inside one of them.
+        limit (int, optional): Stop after this many anchors.
+
+    Returns:
+        list: Dictionaries with "title" and raw "href".
+    """
+    return _run(html, _Anchors(href_filter, within, limit)).anchors
+
+
+def extract_text_nodes(html):
+    """Return every visible text node of the page (script and style contents are skipped)."""
+    return _run(html, _TextNodes()).texts
@@ -0,0 +1,162 @@
+import os
+import re
+import threading
+from collections import Counter, deque
+from utils.Transport import make_session
+from utils.HtmlExtract import extract_text_blocks
+from utils.PageCache import get_page_cache
+
+# First tier of page fetching: a pooled HTTP client. Most search results are plain
+# server-rendered HTML, so a GET is enough; pages that only render with JavaScript are
+# detected and handed back to the caller to load in a real browser. A page with little
+# text is not escalated on that alone (plenty of real pages are short); it needs a sign
+# of a JavaScript shell: an empty root element, a <noscript> asking for JavaScript, or a
+# body that is mostly scripts.
+
+HTTP_TIMEOUT = float(os.getenv("JARVIS_HTTP_TIMEOUT", "8"))
+NO_CONTENT = "No content found to summarize."
+POOL_SIZE = 16
+SUMMARY_WORDS = 200
+MIN_TEXT_WORDS = 40
+MAX_SCRIPT_RATIO = 0.6
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9"
+}
+
+# Markers of single page apps that ship an empty shell and render in the browser
+JS_SHELL_PATTERNS = [
+    re.compile(r"<noscript>[^<]*(enable|turn on)\s+javascript", re.IGNORECASE),
+    re.compile(r"<div\s+id=[\"'](root|app|__next|__nuxt)[\"']\s*>\s*</div>", re.IGNORECASE),
+]
+
+# Status codes that usually mean "bot check" rather than "page gone"
+ESCALATE_STATUS_CODES = {401, 403, 429, 503}
+
+_session = None
+_session_lock = threading.Lock()
+_stats_lock = threading.Lock()
+fetch_stats = Counter()
+recent_fetches = deque(maxlen=100)
+
+
+def get_http_session():
+    """Return the shared keep-alive session used for page fetches."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            # Kept apart from the API session: it sends browser headers and has a bigger pool.
+            # No retries: a 429/503 is a bot check to hand to the browser right away, and a
+            # failed connection falls back to the browser as well
+            session = make_session(pool_size=POOL_SIZE, retries=False)
+            session.headers.update(HEADERS)
+            _session = session
+        return _session
+
+
+def record_fetch(url, tier, reason=""):
+    """Remember which tier served a URL, for get_fetch_stats()."""
+    with _stats_lock:
+        fetch_stats[tier] += 1
+        recent_fetches.append({"url": url, "tier": tier, "reason": reason})
+
+
+def get_fetch_stats():
+    """
+    Return counters of how pages were served.
+
+    Returns:
+        dict: {"tiers": {"http": n, "browser": n, ...}, "recent": [{"url", "tier", "reason"}, ...]}
+    """
+    with _stats_lock:
+        return {"tiers": dict(fetch_stats), "recent": list(recent_fetches)}
+
+
+def extract_summary(page_source, max_words=SUMMARY_WORDS):
+    """Join the text of headings, paragraphs and list items and keep the first max_words words."""
+    return extract_text_blocks(page_source, max_words=max_words)
+
+
+def needs_browser(html, summary):
+    """
+    Decide whether a page fetched over HTTP has to be re-fetched with a browser.
+
+    Returns:
+        str: The reason to escalate, or "" when the HTTP result is good enough.
+    """
+    if len(summary.split()) >= MIN_TEXT_WORDS:
+        return ""
+    for pattern in JS_SHELL_PATTERNS:
+        if pattern.search(html):
+            return "javascript shell"
+    script_bytes = sum(len(m) for m in re.findall(r"<script\b.*?</script>", html, re.DOTALL | re.IGNORECASE))
+    if html and script_bytes / len(html) > MAX_SCRIPT_RATIO:
+        return "mostly scripts"
+    return ""
+
+
+def fetch_summary_over_http(url, max_words=SUMMARY_WORDS):
+    """
+    Try to summarize a page from the page cache or with a plain HTTP GET.
+
+    Fresh cache entries are returned as is; stale ones with an ETag or Last-Modified
+    value are revalidated with a conditional GET.
+
+    Returns:
+        tuple: (summary, reason). summary is None when the page needs a browser, and
+        reason then says why.
+    """
+    cache = get_page_cache()
+    cached = cache.get_page(url)
+    if cached and cached["fresh"]:
+        record_fetch(url, "cache")
+        return cached["summary"], ""
+
+    headers = {}
+    if cached:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    try:
+        response = get_http_session().get(url, headers=headers, timeout=HTTP_TIMEOUT)
+    except Exception as e:
+        print(f"Debug: HTTP fetch failed for {url}: {e}")
+        return None, "http error"
+
+    if response.status_code == 304 and cached:
+        cache.touch_page(url)
+        record_fetch(url, "cache", "revalidated")
+        return cached["summary"], ""
+    if response.status_code in ESCALATE_STATUS_CODES:
+        print(f"Debug: HTTP fetch of {url} returned {response.status_code}, escalating to browser")
+        return None, f"status {response.status_code}"
+    if response.status_code != 200:
+        record_fetch(url, "http", f"status {response.status_code}")
+        return f"Error summarizing page {url}.", ""
+
+    content_type = response.headers.get("Content-Type", "")
+    if "html" not in content_type and "xml" not in content_type:
+        record_fetch(url, "http", f"non-html ({content_type or 'unknown'})")
+        return NO_CONTENT, ""
+
+    html = response.text
+    summary = extract_summary(html, max_words)
+    reason = needs_browser(html, summary)
+    if reason:
+        print(f"Debug: {url} needs a browser ({reason})")
+        return None, reason
+    if not summary:
+        # No shell signals, so a browser would extract the same nothing; not worth caching either
+        record_fetch(url, "http", "no text")
+        return NO_CONTENT, ""
+
+    record_fetch(url, "http")
+    cache.put_page(url, summary, response.headers.get("ETag"), response.headers.get("Last-Modified"))
+    return summary, ""
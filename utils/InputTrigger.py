@@ -0,0 +1,194 @@
+import os
+import sys
+import time
+import queue
+import socket
+import threading
+
+# Pluggable "start listening" triggers. Each source runs on its own thread (or on the
+# keyboard library's hook thread) and puts TriggerEvents on a queue; the main loop blocks
+# on wait() instead of polling keyboard.is_pressed(), so it uses no CPU while idle and
+# wakes up the moment the key goes down.
+#
+#   keyboard - push-to-talk on a hotkey (default, needs the keyboard hook)
+#   socket   - line commands on a local TCP port, for headless machines:
+#              python -m utils.InputTrigger listen
+#   stdin    - press Enter in the terminal
+#   manual   - nothing but fire(), for tests and for other components to drive
+#
+# Other components can fire into any trigger too (see WakeWord.WakeWordDetector).
+
+TRIGGER = os.getenv("JARVIS_TRIGGER", "keyboard")
+HOTKEY = os.getenv("JARVIS_HOTKEY", "space")
+TRIGGER_HOST = "127.0.0.1"
+TRIGGER_PORT = int(os.getenv("JARVIS_TRIGGER_PORT", "8765"))
+
+LISTEN = "listen"
+RELEASE = "release"
+QUIT = "quit"
+
+
+class TriggerEvent:
+    __slots__ = ("kind", "time", "source")
+
+    def __init__(self, kind, source, at=None):
+        self.kind = kind
+        self.source = source
+        self.time = time.monotonic() if at is None else at  # When it happened, for mic pre-roll
+
+    def __repr__(self):
+        return f"TriggerEvent({self.kind!r}, {self.source!r})"
+
+
+class InputTrigger:
+    """Base trigger: a queue of events plus start/close hooks for the subclasses."""
+
+    name = "manual"
+    prompt = "Waiting for a trigger..."
+
+    def __init__(self):
+        self.events = queue.Queue()
+
+    def start(self):
+        return self
+
+    def close(self):
+        pass
+
+    def fire(self, kind=LISTEN, at=None, source=None):
+        self.events.put(TriggerEvent(kind, source or self.name, at))
+
+    def wait(self, timeout=None, kinds=(LISTEN, QUIT)):
+        """
+        Block until an event of one of kinds arrives.
+
+        Returns:
+            TriggerEvent or None: None when timeout passed without one.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = 0.5 if deadline is None else min(0.5, deadline - time.monotonic())
+            if remaining <= 0:
+                return None
+            try:
+                # Short gets so Ctrl+C still reaches the main thread on Windows
+                event = self.events.get(timeout=remaining)
+            except queue.Empty:
+                continue
+            if event.kind in kinds:
+                return event
+
+
+class KeyboardTrigger(InputTrigger):
+    """Push-to-talk: LISTEN when the hotkey goes down, RELEASE when it comes back up."""
+
+    name = "keyboard"
+
+    def __init__(self, key=HOTKEY):
+        super().__init__()
+        self.key = key
+        self.prompt = f"Hold {key} and say your command (or 'quit' to exit)."
+        self._held = False
+        self._hooks = []
+
+    def start(self):
+        import keyboard
+        self._hooks = [keyboard.on_press_key(self.key, self._on_press),
+                       keyboard.on_release_key(self.key, self._on_release)]
+        return self
+
+    def close(self):
+        import keyboard
+        for hook in self._hooks:
+            keyboard.unhook(hook)
+        self._hooks = []
+
+    def _on_press(self, event):
+        # Key repeat sends a stream of down events while the key is held; only the first counts
+        if not self._held:
+            self._held = True
+            self.fire(LISTEN)
+
+    def _on_release(self, event):
+        self._held = False
+        self.fire(RELEASE)
+
+
+class SocketTrigger(InputTrigger):
+    """Accepts newline separated commands ("listen", "quit") on a local TCP port."""
+
+    name = "socket"
+
+    def __init__(self, host=TRIGGER_HOST, port=TRIGGER_PORT):
+        super().__init__()
+        self.address = (host, port)
+        self.prompt = f"Send 'listen' to {host}:{port} (python -m utils.InputTrigger listen) to give a command."
+        self._server = None
+
+    def start(self):
+        self._server = socket.create_server(self.address)
+        threading.Thread(target=self._serve, name="trigger-socket", daemon=True).start()
+        return self
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+
+    def _serve(self):
+        server = self._server
+        while True:
+            try:
+                conn, _ = server.accept()
+            except OSError:
+                return  # closed
+            with conn, conn.makefile("r", encoding="utf-8") as lines:
+                for line in lines:
+                    command = line.strip().lower()
+                    if command in (LISTEN, QUIT):
+                        self.fire(command)
+                        conn.sendall(b"ok\n")
+                    elif command:
+                        conn.sendall(f"unknown command {command}\n".encode("utf-8"))
+
+
+class StdinTrigger(InputTrigger):
+    """Press Enter to talk, type quit to exit."""
+
+    name = "stdin"
+    prompt = "Press Enter and say your command (type 'quit' to exit)."
+
+    def start(self):
+        threading.Thread(target=self._read, name="trigger-stdin", daemon=True).start()
+        return self
+
+    def _read(self):
+        for line in sys.stdin:
+            self.fire(QUIT if line.strip().lower() == QUIT else LISTEN)
+
+
+TRIGGERS = {
+    "keyboard": KeyboardTrigger,
+    "socket": SocketTrigger,
+    "stdin": StdinTrigger,
+    "manual": InputTrigger
+}
+
+
+def make_trigger(name=None):
+    """Create and start the trigger source name (default JARVIS_TRIGGER)."""
+    name = name or TRIGGER
+    if name not in TRIGGERS:
+        raise ValueError(f"Unknown trigger '{name}', expected one of {list(TRIGGERS)}")
+    return TRIGGERS[name]().start()
+
+
+def send_command(command=LISTEN, host=TRIGGER_HOST, port=TRIGGER_PORT):
+    """Send a command to a running SocketTrigger and return its reply."""
+    with socket.create_connection((host, port), timeout=5) as conn:
+        conn.sendall(f"{command}\n".encode("utf-8"))
+        return conn.makefile("r", encoding="utf-8").readline().strip()
+
+
+if __name__ == "__main__":
+    print(send_command(sys.argv[1] if len(sys.argv) > 1 else LISTEN))
@@ -0,0 +1,289 @@
+import os
+import re
+import math
+import time
+import threading
+from collections import Counter, defaultdict
+
+# Local fast path in front of Gemini. Short, unambiguous commands ("go back", "scroll
+# down", "pause the music") are mapped straight to a tool call, so they run without an
+# LLM round trip. Two stages:
+#
+#   rules      - anchored regular expressions, confidence 1.0
+#   classifier - multinomial naive Bayes over the example phrases below, only for short
+#                utterances made of words it knows, and only above MIN_CONFIDENCE
+#
+# Anything else returns None and goes to the model as before. A single word is never
+# enough: "back", "pause" or "repeat" on their own are as likely to be about the page,
+# a video or what JARVIS just said, so the rules want an object ("pause the music",
+# "repeat this song") and the classifier needs MIN_CLASSIFIER_WORDS.
+
+MIN_CONFIDENCE = float(os.getenv("JARVIS_ROUTER_MIN_CONFIDENCE", "0.9"))
+MIN_CLASSIFIER_WORDS = 2
+MAX_CLASSIFIER_WORDS = 6
+MIN_KNOWN_WORD_RATIO = 0.8  # With four words or fewer, one the classifier doesn't know is too many
+ENABLED = os.getenv("JARVIS_LOCAL_ROUTER", "1") != "0"
+
+FILLER = r"(?:(?:please|jarvis|sir|can you|could you|would you|now|hey|ok|okay)[\s,]*)*"
+FILLER_WORDS = {"please", "jarvis", "sir", "can", "could", "would", "you", "now", "hey", "ok", "okay"}
+
+
+def _spotify(command, **extra):
+    data = {"command": command}
+    data.update(extra)
+    return "process_spotify_command", data
+
+
+# intent -> (regular expressions, example phrases for the classifier, tool)
+INTENTS = {
+    "go_back": (
+        [r"(?:go|take me) back", r"(?:go to the )?previous page", r"back (?:a|one) page"],
+        ["go back", "go back a page", "previous page", "back a page", "take me back", "go to the previous page",
+         "navigate back", "back one page"],
+        ("go_back", None)
+    ),
+    "go_forward": (
+        # Not "next page": on a results page that means the next page of results, left to the model
+        [r"go forward", r"forward (?:a|one) page"],
+        ["go forward", "forward a page", "navigate forward", "forward one page"],
+        ("go_forward", None)
+    ),
+    "scroll_down": (
+        [r"scroll(?: the page)? down(?: a bit| more)?", r"page down"],
+        ["scroll down", "scroll down a bit", "scroll down more", "page down", "move down the page",
+         "scroll the page down", "go down the page"],
+        ("scroll_down", None)
+    ),
+    "scroll_up": (
+        [r"scroll(?: the page)? up(?: a bit| more)?", r"page up"],
+        ["scroll up", "scroll up a bit", "scroll up more", "page up", "move up the page", "scroll the page up",
+         "go up the page"],
+        ("scroll_up", None)
+    ),
+    "close_tab": (
+        [r"close (?:this |the |current )?tab"],
+        ["close tab", "close this tab", "close the tab", "close the current tab", "shut this tab"],
+        ("close_tab", None)
+    ),
+    "list_jobs": (
+        [r"(?:list|show)(?: me)?(?: my| the)?(?: background)? jobs", r"what are you working on"],
+        ["list jobs", "list my jobs", "show the jobs", "show background jobs", "what are you working on"],
+        ("list_jobs", None)
+    ),
+    "music_pause": (
+        [r"(?:pause|stop)(?: the| my)? (?:music|song|spotify|playback)"],
+        ["pause the music", "pause spotify", "stop the music", "pause the song", "stop playback",
+         "pause my music"],
+        _spotify("pause")
+    ),
+    "music_next": (
+        [r"(?:next|skip)(?: this| the)? (?:song|track)", r"play the next (?:song|track)"],
+        ["next song", "skip this song", "next track", "play the next song", "skip track",
+         "skip the song"],
+        _spotify("next")
+    ),
+    "music_previous": (
+        [r"previous (?:song|track)", r"play the previous (?:song|track)", r"last (?:song|track)"],
+        ["previous song", "previous track", "play the previous song", "last song", "play the last track"],
+        _spotify("previous")
+    ),
+    "music_repeat": (
+        [r"(?:repeat|loop) (?:this|the|my) (?:song|track)", r"(?:turn on|toggle|enable) repeat(?: mode)?",
+         r"repeat mode(?: on)?"],
+        ["repeat this song", "loop this track", "turn on repeat", "toggle repeat", "repeat mode",
+         "enable repeat mode"],
+        _spotify("repeat")
+    ),
+    "music_open": (
+        [r"open spotify", r"(?:launch|start) spotify"],
+        ["open spotify", "launch spotify", "start spotify"],
+        _spotify("open")
+    ),
+    "music_close": (
+        [r"(?:close|quit|exit) spotify"],
+        ["close spotify", "quit spotify", "exit spotify"],
+        _spotify("close")
+    ),
+    "music_mute": (
+        [r"mute (?:the )?(?:music|spotify)"],
+        ["mute the music", "mute spotify"],
+        _spotify("volume", volume_level=0)
+    ),
+    "music_unmute": (
+        [r"unmute (?:the )?(?:music|spotify)"],
+        ["unmute the music", "unmute spotify"],
+        _spotify("volume", volume_level=50)
+    ),
+}
+
+VOLUME_PATTERN = re.compile(
+    rf"^{FILLER}(?:set |turn |change )?(?:the )?(?:music |spotify )?volume (?:to |at )?(\d{{1,3}})(?: ?%| percent)?[\s,]*{FILLER}[.!?]*$")
+
+
+class Route:
+    __slots__ = ("intent", "name", "args", "confidence", "stage")
+
+    def __init__(self, intent, name, args, confidence, stage):
+        self.intent = intent
+        self.name = name
+        self.args = args
+        self.confidence = confidence
+        self.stage = stage
+
+    def __repr__(self):
+        return f"Route({self.intent!r} -> {self.name}, {self.confidence:.2f} via {self.stage})"
+
+
+def _tokens(text):
+    return re.findall(r"[a-z]+", text.lower())
+
+
+class NaiveBayesClassifier:
+    """Multinomial naive Bayes with Laplace smoothing over word unigrams and bigrams."""
+
+    def __init__(self, examples):
+        self.word_counts = {}
+        self.totals = {}
+        self.priors = {}
+        self.vocabulary = set()
+        total_examples = sum(len(phrases) for phrases in examples.values())
+        for label, phrases in examples.items():
+            counts = Counter()
+            for phrase in phrases:
+                features = self._features(phrase)
+                counts.update(features)
+                self.vocabulary.update(_tokens(phrase))
+            self.word_counts[label] = counts
+            self.totals[label] = sum(counts.values())
+            self.priors[label] = math.log(len(phrases) / total_examples)
+        self.feature_space = len({f for counts in self.word_counts.values() for f in counts}) + 1
+
+    @staticmethod
+    def _features(text):
+        words = _tokens(text)
+        return words + [f"{a}_{b}" for a, b in zip(words, words[1:])]
+
+    def known_ratio(self, text):
+        words = _tokens(text)
+        return sum(word in self.vocabulary for word in words) / len(words) if words else 0.0
+
+    def predict(self, text):
+        """Return (label, posterior probability) of the most likely intent."""
+        features = self._features(text)
+        scores = {}
+        for label, counts in self.word_counts.items():
+            denominator = self.totals[label] + self.feature_space
+            scores[label] = self.priors[label] + sum(math.log((counts[f] + 1) / denominator) for f in features)
+        best = max(scores, key=scores.get)
+        normalizer = max(scores.values())
+        total = sum(math.exp(score - normalizer) for score in scores.values())
+        return best, 1.0 / total
+
+
+class IntentRouter:
+    """Routes utterances to tool calls locally and keeps hit-rate and saved-latency counters."""
+
+    def __init__(self, intents=INTENTS, min_confidence=MIN_CONFIDENCE):
+        self.intents = intents
+        self.min_confidence = min_confidence
+        self.rules = [
+            (intent, re.compile(rf"^{FILLER}(?:{'|'.join(patterns)})[\s,]*{FILLER}[.!?]*$"))
+            for intent, (patterns, _, _) in intents.items()
+        ]
+        self.classifier = NaiveBayesClassifier({intent: examples for intent, (_, examples, _) in intents.items()})
+        self._lock = threading.Lock()
+        self._stats = Counter()
+        self._by_intent = defaultdict(int)
+        self._model_seconds = 0.0
+        self._model_calls = 0
+        self._route_seconds = 0.0
+
+    def _make_route(self, intent, text, confidence, stage):
+        name, data = self.intents[intent][2]
+        if name == "process_spotify_command":
+            # Pre-parsed, so SpotifyAI doesn't ask Gemini to interpret the command either
+            return Route(intent, name, {"text": text, "command_data": dict(data)}, confidence, stage)
+        return Route(intent, name, {}, confidence, stage)
+
+    def route(self, utterance):
+        """
+        Map utterance to a tool call if it is a simple command we are sure about.
+
+        Returns:
+            Route or None: name and args of the tool to call, or None to ask the model.
+        """
+        start = time.perf_counter()
+        route = self._route(utterance.strip().lower()) if ENABLED else None
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            self._stats["utterances"] += 1
+            self._route_seconds += elapsed
+            if route:
+                self._stats[route.stage] += 1
+                self._by_intent[route.intent] += 1
+        return route
+
+    def _route(self, text):
+        if not text:
+            return None
+        match = VOLUME_PATTERN.match(text)
+        if match:
+            command_data = {"command": "volume", "volume_level": min(100, int(match.group(1)))}
+            return Route("music_volume", "process_spotify_command", {"text": text, "command_data": command_data},
+                         1.0, "rule")
+        for intent, pattern in self.rules:
+            if pattern.match(text):
+                return self._make_route(intent, text, 1.0, "rule")
+
+        # Politeness doesn't count as words the classifier doesn't know
+        words = " ".join(word for word in _tokens(text) if word not in FILLER_WORDS)
+        if not MIN_CLASSIFIER_WORDS <= len(_tokens(words)) <= MAX_CLASSIFIER_WORDS:
+            return None
+        if self.classifier.known_ratio(words) < MIN_KNOWN_WORD_RATIO:
+            return None
+        intent, confidence = self.classifier.predict(words)
+        if confidence < self.min_confidence:
+            return None
+        return self._make_route(intent, text, confidence, "classifier")
+
+    def record_model_latency(self, seconds):
+        """Report how long a model call took, to estimate what a local route saves."""
+        with self._lock:
+            self._model_seconds += seconds
+            self._model_calls += 1
+
+    def stats(self):
+        """
+        Returns:
+            dict: utterances seen, hits per stage and intent, hit rate, average routing time,
+            average model latency and the estimated total latency saved.
+        """
+        with self._lock:
+            utterances = self._stats["utterances"]
+            hits = self._stats["rule"] + self._stats["classifier"]
+            average_model = self._model_seconds / self._model_calls if self._model_calls else None
+            average_route = self._route_seconds / utterances if utterances else 0.0
+            return {
+                "utterances": utterances,
+                "hits": hits,
+                "rule_hits": self._stats["rule"],
+                "classifier_hits": self._stats["classifier"],
+                "hit_rate": hits / utterances if utterances else 0.0,
+                "by_intent": dict(self._by_intent),
+                "route_ms_avg": average_route * 1000,
+                "model_ms_avg": average_model * 1000 if average_model is not None else None,
+                "saved_seconds_estimate": hits * (average_model - average_route) if average_model else None
+            }
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_intent_router():
+    """Return the process-wide IntentRouter."""
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = IntentRouter()
+        return _router
@@ -0,0 +1,283 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from utils.FollowUpPolicy import render_template
+
+# Background jobs for tools that take minutes (do_homework: login, CDP polling,
+# downloads, two Gemini calls, PDF rendering). The tool call only submits the job and
+# returns, so the voice loop keeps taking commands while it runs. Jobs report progress
+# with report_progress(), stop at check_cancelled() when cancelled, and JARVIS says so
+# when one finishes. list_jobs, job_status and cancel_job are exposed as tools.
+#
+# A job fails when it raises, or when it returns an error the way the tools report one
+# ({"status": "error", ...} or a "result"/"message" starting with "Error").
+
+MAX_WORKERS = int(os.getenv("JARVIS_JOB_WORKERS", "2"))
+MAX_FINISHED_JOBS = 20
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised by check_cancelled() inside a job that was asked to stop."""
+
+
+_current = threading.local()
+
+
+def current_job():
+    """The Job running on this thread, or None outside of the job manager."""
+    return getattr(_current, "job", None)
+
+
+def report_progress(fraction, message):
+    """Record how far the current job got (a no-op when not running as a job)."""
+    job = current_job()
+    if job is not None:
+        job.progress = max(0.0, min(1.0, fraction))
+        job.message = message
+        print(f"Debug: Job {job.id} ({job.name}) {job.progress:.0%}: {message}")
+
+
+def check_cancelled():
+    """Raise JobCancelled if the current job was cancelled (a no-op when not running as a job)."""
+    job = current_job()
+    if job is not None and job.cancelled.is_set():
+        raise JobCancelled(f"Job {job.id} was cancelled")
+
+
+def result_error(result):
+    """The error message of a tool-style error result, or None if result isn't one."""
+    if not isinstance(result, dict):
+        return None
+    if result.get("status") == "error":
+        return str(result.get("message") or result.get("result") or "unknown error")
+    for key in ("result", "message"):
+        value = result.get(key)
+        if isinstance(value, str) and value.startswith("Error"):
+            return value[len("Error"):].lstrip(": ") or value
+    return None
+
+
+class Job:
+    def __init__(self, job_id, name, args):
+        self.id = job_id
+        self.name = name
+        self.args = dict(args or {})
+        self.state = QUEUED
+        self.progress = 0.0
+        self.message = "Waiting for a free worker"
+        self.result = None
+        self.error = None
+        self.submitted_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.cancelled = threading.Event()
+        self.future = None
+
+    def elapsed(self):
+        if self.started_at is None:
+            return 0.0
+        return (self.finished_at or time.time()) - self.started_at
+
+    def summary(self):
+        """One sentence about the job, to be spoken."""
+        label = f"Job {self.id}, {self.name.replace('_', ' ')}"
+        if self.state == QUEUED:
+            return f"{label}, is queued."
+        if self.state == RUNNING:
+            return f"{label}, is {self.progress:.0%} done: {self.message}."
+        if self.state == DONE:
+            return f"{label}, has finished. {render_template(self.name, self.result)}"
+        if self.state == FAILED:
+            return f"{label}, failed: {self.error}"
+        return f"{label}, was cancelled."
+
+    def describe(self):
+        """The job as a tool result."""
+        return {
+            "status": "success",
+            "message": self.summary(),
+            "job_id": self.id,
+            "name": self.name,
+            "args": self.args,
+            "state": self.state,
+            "progress": round(self.progress, 2),
+            "elapsed_seconds": round(self.elapsed(), 1)
+        }
+
+
+class JobManager:
+    """Runs jobs on a worker pool and keeps the recent ones around for status queries."""
+
+    def __init__(self, max_workers=MAX_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._jobs = OrderedDict()
+        self._next_id = 1
+        self._notify = None
+
+    def set_notifier(self, notify):
+        """notify(job) is called from the worker thread whenever a job finishes."""
+        self._notify = notify
+
+    def submit(self, name, fn, args=None):
+        """
+        Start fn(**args) as a background job.
+
+        Returns:
+            Job: The queued job.
+        """
+        with self._lock:
+            job = Job(self._next_id, name, args)
+            self._next_id += 1
+            self._jobs[job.id] = job
+            self._prune()
+        job.future = self._executor.submit(self._run, job, fn)
+        print(f"Debug: Submitted job {job.id} ({name}) with args {job.args}")
+        return job
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self._jobs.items() if job.state in FINISHED]
+        for job_id in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job_id]
+
+    def _run(self, job, fn):
+        if job.cancelled.is_set():
+            job.state = CANCELLED
+            job.finished_at = time.time()
+            self._notify_finished(job)
+            return
+        _current.job = job
+        job.state = RUNNING
+        job.started_at = time.time()
+        job.message = "Started"
+        try:
+            job.result = fn(**job.args)
+            job.error = result_error(job.result)
+            if job.error is None:
+                job.state = DONE
+                job.progress = 1.0
+            else:
+                job.state = FAILED
+        except JobCancelled:
+            job.state = CANCELLED
+        except Exception as e:
+            job.error = str(e)
+            job.state = FAILED
+        finally:
+            _current.job = None
+            job.finished_at = time.time()
+        print(f"Debug: Job {job.id} ({job.name}) {job.state} after {job.elapsed():.1f}s")
+        self._notify_finished(job)
+
+    def _notify_finished(self, job):
+        if self._notify is None:
+            return
+        try:
+            self._notify(job)
+        except Exception as e:
+            print(f"Warning: Could not announce job {job.id}: {e}")
+
+    def get(self, job_id=None):
+        """The job with job_id, or the most recent one when job_id is None."""
+        with self._lock:
+            if job_id is None:
+                return next(reversed(self._jobs.values()), None)
+            return self._jobs.get(int(job_id))
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id=None):
+        """
+        Cancel a job; without job_id the most recent unfinished one.
+
+        Queued jobs never start. Running jobs stop at their next check_cancelled().
+
+        Returns:
+            Job or None: The job that was asked to stop.
+        """
+        with self._lock:
+            if job_id is None:
+                candidates = [job for job in self._jobs.values() if job.state not in FINISHED]
+                job = candidates[-1] if candidates else None
+            else:
+                job = self._jobs.get(int(job_id))
+        if job is None or job.state in FINISHED:
+            return None
+        job.cancelled.set()
+        if job.future is not None and job.future.cancel():
+            job.state = CANCELLED
+            job.finished_at = time.time()
+            self._notify_finished(job)
+        return job
+
+    def cancel_all(self):
+        for job in self.jobs():
+            if job.state not in FINISHED:
+                self.cancel(job.id)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Job counts per state and the average run time of finished jobs.
+        """
+        jobs = self.jobs()
+        states = {}
+        for job in jobs:
+            states[job.state] = states.get(job.state, 0) + 1
+        finished = [job.elapsed() for job in jobs if job.state in FINISHED and job.started_at]
+        return {"by_state": states, "run_seconds_avg": sum(finished) / len(finished) if finished else None}
+
+    def close(self):
+        self.cancel_all()
+        self._executor.shutdown(wait=False)
+
+    # Tool handlers; they take the call's argument dict like the other registered tools
+
+    def list_jobs_tool(self, args):
+        jobs = self.jobs()
+        if not jobs:
+            return {"status": "success", "message": "There are no background jobs, sir.", "jobs": []}
+        active = [job for job in jobs if job.state not in FINISHED]
+        shown = active or jobs[-3:]
+        return {
+            "status": "success",
+            "message": " ".join(job.summary() for job in shown),
+            "jobs": [job.describe() for job in jobs]
+        }
+
+    def job_status_tool(self, args):
+        job = self.get(args.get("job_id"))
+        if job is None:
+            return {"status": "error", "message": "I couldn't find that job, sir."}
+        return job.describe()
+
+    def cancel_job_tool(self, args):
+        job = self.cancel(args.get("job_id"))
+        if job is None:
+            return {"status": "error", "message": "There is no running job to cancel, sir."}
+        return {"status": "success", "message": f"Cancelling job {job.id}, {job.name.replace('_', ' ')}.",
+                "job_id": job.id}
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """Return the process-wide JobManager."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
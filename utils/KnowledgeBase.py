@@ -0,0 +1,187 @@
+import os
+import json
+import logging
+import threading
+
+# In-memory knowledge base. main asks for it on every turn, so the files are only
+# stat()ed then: contacts.json is re-parsed when its mtime or size changes, and
+# knowledgebase.txt (which remember_info only ever appends to) is read from where the
+# last read stopped. A turn costs the same however big the knowledge base gets.
+
+KNOWLEDGEBASE_FILE = os.path.join(os.getcwd(), "../knowledgebase.txt")
+CONTACTS_FILE = os.path.join(os.getcwd(), "../contacts.json")
+TAIL_CHECK_BYTES = 64  # Bytes before the read offset compared to tell an append from a rewrite
+_UNKNOWN = object()  # File signature of a file that has to be looked at again
+
+
+def _signature(path):
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def parse_knowledgebase_lines(lines):
+    """Keep the non-empty, non-comment lines, stripped."""
+    return [line.strip() for line in lines if line.strip() and not line.startswith("#")]
+
+
+class KnowledgeBase:
+    """
+    Parsed knowledgebase.txt and contacts.json, refreshed on demand.
+
+    version increases whenever the content changes, so derived data (like a search index)
+    can tell when it needs rebuilding.
+    """
+
+    def __init__(self, knowledgebase_file=KNOWLEDGEBASE_FILE, contacts_file=CONTACTS_FILE):
+        self.knowledgebase_file = knowledgebase_file
+        self.contacts_file = contacts_file
+        self.version = 0
+        self._lock = threading.Lock()
+        self._entries = []
+        self._text_signature = _UNKNOWN
+        self._text_offset = 0
+        self._text_tail = b""
+        self._contacts = []
+        self._contacts_signature = _UNKNOWN
+        self._contacts_error = None
+        self._result = None
+
+    def invalidate(self):
+        """Force the next load() to look at both files again (after writing to them)."""
+        with self._lock:
+            self._text_signature = _UNKNOWN
+            self._contacts_signature = _UNKNOWN
+
+    def _refresh_text(self):
+        signature = _signature(self.knowledgebase_file)
+        if signature == self._text_signature:
+            return False
+        self._text_signature = signature
+        if signature is None:
+            changed = bool(self._entries) or self._result is None
+            self._entries, self._text_offset, self._text_tail = [], 0, b""
+            return changed
+
+        with open(self.knowledgebase_file, "rb") as f:
+            appended = False
+            if 0 < self._text_offset <= signature[1]:
+                f.seek(self._text_offset - len(self._text_tail))
+                appended = f.read(len(self._text_tail)) == self._text_tail
+            if not appended:
+                # Rewritten or truncated: start over
+                f.seek(0)
+                self._entries, self._text_offset = [], 0
+            data = f.read()
+
+        # Only consume complete lines; a line still being written is picked up next time
+        end = data.rfind(b"\n") + 1
+        new_lines = data[:end].decode("utf-8", errors="replace").splitlines()
+        new_entries = parse_knowledgebase_lines(new_lines)
+        self._entries = self._entries + new_entries
+        self._text_offset += end
+        if end:
+            consumed = data[:end]
+            self._text_tail = (self._text_tail + consumed)[-TAIL_CHECK_BYTES:]
+        elif not appended:
+            self._text_tail = b""
+        if new_entries or not appended:
+            logging.info(f"Loaded {len(new_entries)} {'new ' if appended else ''}entries from {self.knowledgebase_file}")
+            return True
+        return False
+
+    def _refresh_contacts(self):
+        signature = _signature(self.contacts_file)
+        if signature == self._contacts_signature:
+            return False
+        self._contacts_signature = signature
+        self._contacts_error = None
+        if signature is None:
+            self._contacts = []
+            return True
+        try:
+            with open(self.contacts_file, "r", encoding="utf-8") as f:
+                contacts = json.load(f)
+        except json.JSONDecodeError as e:
+            logging.error(f"Failed to parse {self.contacts_file}: {str(e)}")
+            self._contacts_error = f"Failed to parse {self.contacts_file}: {str(e)}"
+            contacts = []
+        if isinstance(contacts, list):
+            logging.info(f"Loaded {len(contacts)} contacts from {self.contacts_file}")
+        else:
+            logging.error(f"Invalid format in {self.contacts_file}: expected a JSON array")
+            self._contacts_error = f"Invalid format in {self.contacts_file}: expected a JSON array"
+            contacts = []
+        self._contacts = contacts
+        return True
+
+    def _build_result(self):
+        text_missing = self._text_signature is None
+        contacts_missing = self._contacts_signature is None
+        result = {
+            "status": "success",
+            "message": "Successfully loaded knowledge base and contacts",
+            "data": {
+                "knowledgebase": self._entries,
+                "contacts": self._contacts
+            }
+        }
+        if self._contacts_error:
+            result["status"] = "error"
+            result["message"] = self._contacts_error
+        elif text_missing and contacts_missing:
+            result["message"] = "Warning: Both knowledgebase.txt and contacts.json not found"
+        elif text_missing:
+            result["message"] = f"Warning: {self.knowledgebase_file} not found, returning empty knowledgebase"
+        elif contacts_missing:
+            result["message"] = f"Warning: {self.contacts_file} not found, returning empty contacts"
+        return result
+
+    def load(self):
+        """
+        Return the knowledge base, re-reading only what changed on disk.
+
+        Returns:
+            dict: Same shape as bot.jarvis.load_knowledge_base(): status, message and
+            data with "knowledgebase" (list of lines) and "contacts" (list of dicts).
+            The same dict is returned until something changes; treat it as read-only.
+        """
+        with self._lock:
+            try:
+                changed = self._refresh_text()
+                changed = self._refresh_contacts() or changed
+            except Exception as e:
+                logging.error(f"Failed to load knowledge base: {str(e)}")
+                self._text_signature = self._contacts_signature = _UNKNOWN
+                return {
+                    "status": "error",
+                    "message": f"Failed to load knowledge base: {str(e)}",
+                    "data": {"knowledgebase": [], "contacts": []}
+                }
+            if changed or self._result is None:
+                self.version += 1
+                self._result = self._build_result()
+            return self._result
+
+
+_knowledge_bases = {}
+_knowledge_bases_lock = threading.Lock()
+
+
+def get_knowledge_base(knowledgebase_file=KNOWLEDGEBASE_FILE, contacts_file=CONTACTS_FILE):
+    """Return the shared KnowledgeBase for this pair of files."""
+    key = (os.path.abspath(knowledgebase_file), os.path.abspath(contacts_file))
+    with _knowledge_bases_lock:
+        if key not in _knowledge_bases:
+            _knowledge_bases[key] = KnowledgeBase(*key)
+        return _knowledge_bases[key]
+
+
+def invalidate_knowledge_bases():
+    """Called after writing to the knowledge base files outside of this module."""
+    with _knowledge_bases_lock:
+        knowledge_bases = list(_knowledge_bases.values())
+    for knowledge_base in knowledge_bases:
+        knowledge_base.invalidate()
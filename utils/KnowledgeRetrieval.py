@@ -0,0 +1,128 @@
+import os
+import re
+import math
+import time
+import threading
+from collections import Counter, defaultdict
+from utils.KnowledgeBase import get_knowledge_base
+
+# Picks the few knowledge base entries that matter for the current utterance, so the
+# context sent with every Gemini request stays the same size however many notes and
+# contacts accumulate. Entries are scored with BM25 over an inverted index that is
+# rebuilt only when the KnowledgeBase version changes.
+
+TOP_K = int(os.getenv("JARVIS_KB_TOP_K", "6"))
+MAX_ENTRY_CHARS = 300
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does", "for", "from", "has", "have", "he",
+    "her", "his", "how", "i", "in", "is", "it", "its", "me", "my", "of", "on", "or", "please", "she", "so",
+    "that", "the", "their", "them", "there", "they", "this", "to", "was", "what", "when", "where", "which",
+    "who", "why", "will", "with", "you", "your", "jarvis", "sir", "tell", "about", "know"
+}
+TIMESTAMP_PREFIX = re.compile(r"^\[[^\]]*\]\s*")  # remember_info's "[Tue May  6 09:13:19 2025] "
+TOKEN = re.compile(r"[a-z0-9@.']+")
+
+
+def tokenize(text):
+    """Lower-case word tokens without stopwords, possessives or trailing punctuation."""
+    tokens = []
+    for token in TOKEN.findall(text.lower()):
+        token = token.strip(".'")
+        if token.endswith("'s"):
+            token = token[:-2]
+        token = token.replace("'", "")
+        if token and token not in STOPWORDS:
+            tokens.append(token)
+            # Split "cyyu@truman.edu" and "dr." style tokens so their parts match too
+            if "@" in token or "." in token:
+                tokens.extend(part for part in re.split(r"[@.]", token) if part and part not in STOPWORDS)
+    return tokens
+
+
+def contact_text(contact):
+    """One line of text for a contact dict, e.g. "Contact Alice: phone_number 0987654321"."""
+    details = ", ".join(f"{key} {value}" for key, value in contact.items() if key != "name")
+    return f"Contact {contact.get('name', '')}: {details}".strip()
+
+
+class BM25Index:
+    """Inverted index over short text entries with Okapi BM25 scoring."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.postings = defaultdict(list)  # term -> [(entry index, term frequency)]
+        self.lengths = []
+        for i, entry in enumerate(entries):
+            counts = Counter(tokenize(entry))
+            self.lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self.postings[term].append((i, tf))
+        self.average_length = (sum(self.lengths) / len(self.lengths)) if self.lengths else 0.0
+
+    def search(self, query, k=TOP_K):
+        """
+        Score entries against query.
+
+        Returns:
+            list: Up to k (score, entry) tuples, best first; entries sharing no term with
+            the query are never returned.
+        """
+        scores = defaultdict(float)
+        n = len(self.entries)
+        for term in set(tokenize(query)):
+            postings = self.postings.get(term)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[i] / (self.average_length or 1))
+                scores[i] += idf * tf * (BM25_K1 + 1) / (tf + norm)
+        best = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(score, self.entries[i]) for i, score in best]
+
+
+_indexes = {}  # KnowledgeBase -> (version, BM25Index)
+_indexes_lock = threading.Lock()
+
+
+def _current_index(knowledge_base):
+    data = knowledge_base.load()["data"]
+    with _indexes_lock:
+        version, index = _indexes.get(knowledge_base, (None, None))
+        if index is None or version != knowledge_base.version:
+            start = time.perf_counter()
+            entries = [TIMESTAMP_PREFIX.sub("", line) for line in data["knowledgebase"]]
+            entries += [contact_text(contact) for contact in data["contacts"] if isinstance(contact, dict)]
+            index = BM25Index(entries)
+            _indexes[knowledge_base] = (knowledge_base.version, index)
+            print(f"Debug: Indexed {len(entries)} knowledge base entries in {(time.perf_counter() - start) * 1000:.1f} ms")
+        return index
+
+
+def retrieve_knowledge(query, k=TOP_K, knowledge_base=None):
+    """
+    Return the k knowledge base entries most relevant to query.
+
+    Args:
+        query (str): The user's utterance.
+        k (int): Maximum number of entries.
+        knowledge_base (KnowledgeBase, optional): Defaults to the shared one.
+
+    Returns:
+        list: Entry strings (notes without their timestamp, contacts as one line each),
+        each cut to MAX_ENTRY_CHARS.
+    """
+    index = _current_index(knowledge_base or get_knowledge_base())
+    return [entry[:MAX_ENTRY_CHARS] for _, entry in index.search(query, k)]
+
+
+def build_context_prompt(query, k=TOP_K):
+    """The knowledge base context for one turn, bounded by k entries."""
+    entries = retrieve_knowledge(query, k)
+    if not entries:
+        return "Context from knowledge base: nothing relevant to this request."
+    lines = "\n".join(f"- {entry}" for entry in entries)
+    return f"Context from knowledge base:\n{lines}\n\nUse the above context to inform your response."
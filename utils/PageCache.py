@@ -0,0 +1,176 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import threading
+
+# Disk-backed cache of what research already fetched: page URL -> extracted summary and
+# search query -> result links. Follow-up questions on a topic that was just researched
+# are answered from here without touching the network.
+
+CACHE_PATH = os.path.join(os.getcwd(), "../page_cache.sqlite3")
+PAGE_TTL = int(os.getenv("JARVIS_PAGE_CACHE_TTL", str(24 * 60 * 60)))
+SEARCH_TTL = int(os.getenv("JARVIS_SEARCH_CACHE_TTL", str(6 * 60 * 60)))
+MAX_CACHE_BYTES = int(os.getenv("JARVIS_PAGE_CACHE_MB", "20")) * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    summary TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS searches (
+    query TEXT PRIMARY KEY,
+    links TEXT NOT NULL,
+    max_links INTEGER NOT NULL,
+    fetched_at REAL NOT NULL,
+    accessed_at REAL NOT NULL,
+    size INTEGER NOT NULL
+);
+"""
+
+
+def normalize_query(query):
+    """Case and whitespace insensitive key for a search query."""
+    return re.sub(r"\s+", " ", query or "").strip().lower()
+
+
+class PageCache:
+    """
+    SQLite cache with per-table TTLs and a total size cap.
+
+    Stale page entries are kept around while they have an ETag or Last-Modified value so
+    the HTTP fetcher can revalidate them with a conditional GET instead of re-downloading.
+    Once the cache is over max_bytes the least recently accessed rows are evicted.
+    """
+
+    def __init__(self, path=CACHE_PATH, max_bytes=MAX_CACHE_BYTES, page_ttl=PAGE_TTL, search_ttl=SEARCH_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.page_ttl = page_ttl
+        self.search_ttl = search_ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=10, check_same_thread=False)
+        self._conn.executescript(SCHEMA)
+        self._conn.commit()
+
+    def get_page(self, url):
+        """
+        Look up a page summary.
+
+        Returns:
+            dict or None: {"summary", "etag", "last_modified", "fresh"} for a known URL.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, etag, last_modified, fetched_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            summary, etag, last_modified, fetched_at = row
+            fresh = time.time() - fetched_at < self.page_ttl
+            if not fresh and not (etag or last_modified):
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                self._conn.commit()
+                return None
+            self._conn.execute("UPDATE pages SET accessed_at = ? WHERE url = ?", (time.time(), url))
+            self._conn.commit()
+        return {"summary": summary, "etag": etag, "last_modified": last_modified, "fresh": fresh}
+
+    def put_page(self, url, summary, etag=None, last_modified=None):
+        if not summary:
+            return  # An empty summary would be served as the page's content until it expires
+        now = time.time()
+        size = len(url) + len(summary.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, summary, etag, last_modified, fetched_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, summary, etag, last_modified, now, now, size)
+            )
+            self._evict()
+            self._conn.commit()
+
+    def touch_page(self, url):
+        """Mark a page as just revalidated (HTTP 304)."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE url = ?", (now, now, url))
+            self._conn.commit()
+
+    def get_search(self, query, max_links):
+        """Return cached result links for query if at least max_links were stored and they are fresh."""
+        key = normalize_query(query)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT links, max_links, fetched_at FROM searches WHERE query = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            links, stored_max, fetched_at = row
+            if time.time() - fetched_at >= self.search_ttl:
+                self._conn.execute("DELETE FROM searches WHERE query = ?", (key,))
+                self._conn.commit()
+                return None
+            if stored_max < max_links:
+                return None
+            self._conn.execute("UPDATE searches SET accessed_at = ? WHERE query = ?", (time.time(), key))
+            self._conn.commit()
+        return json.loads(links)[:max_links]
+
+    def put_search(self, query, links, max_links):
+        key = normalize_query(query)
+        if not key:
+            return
+        now = time.time()
+        payload = json.dumps(links)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO searches (query, links, max_links, fetched_at, accessed_at, size) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, payload, max_links, now, now, len(key) + len(payload))
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute(
+            "SELECT (SELECT COALESCE(SUM(size), 0) FROM pages) + (SELECT COALESCE(SUM(size), 0) FROM searches)"
+        ).fetchone()[0]
+        while total > self.max_bytes:
+            oldest = self._conn.execute(
+                "SELECT 'pages', url, size, accessed_at FROM pages "
+                "UNION ALL SELECT 'searches', query, size, accessed_at FROM searches "
+                "ORDER BY accessed_at LIMIT 1"
+            ).fetchone()
+            if oldest is None:
+                break
+            table, key, size, _ = oldest
+            column = "url" if table == "pages" else "query"
+            self._conn.execute(f"DELETE FROM {table} WHERE {column} = ?", (key,))
+            total -= size
+
+    def stats(self):
+        with self._lock:
+            pages, page_bytes = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM pages").fetchone()
+            searches, search_bytes = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM searches").fetchone()
+        return {"pages": pages, "searches": searches, "bytes": page_bytes + search_bytes}
+
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache():
+    """Return the process-wide PageCache."""
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache()
+        return _page_cache
@@ -0,0 +1,47 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from utils.BrowserController import summarize_page
+from utils.BrowserPool import lease_browser
+from utils.HttpFetcher import fetch_summary_over_http, record_fetch
+
+# Fetches and summarizes several result pages at once, so a research query costs about
+# as much as its slowest page instead of the sum of all of them.
+
+MAX_FETCH_WORKERS = int(os.getenv("JARVIS_FETCH_WORKERS", "6"))
+LEASE_TIMEOUT = 60
+
+
+def _summarize(url):
+    # Plain HTTP first; only pages that need JavaScript take a browser from the pool
+    summary, reason = fetch_summary_over_http(url)
+    if summary is not None:
+        return summary
+    try:
+        with lease_browser(timeout=LEASE_TIMEOUT) as driver:
+            return summarize_page(driver, url, http_first=False)
+    except Exception as e:
+        print(f"Error summarizing page {url}: {e}")
+        record_fetch(url, "failed", reason or str(e))
+        return f"Error summarizing page {url}."
+
+
+def summarize_pages(urls, max_workers=MAX_FETCH_WORKERS):
+    """
+    Summarize a list of URLs concurrently with a bounded worker pool.
+
+    Each URL is fetched over HTTP first and escalated to a pooled browser only when
+    the page needs JavaScript; see HttpFetcher.get_fetch_stats() for which tier served what.
+
+    Args:
+        urls (list): URLs to summarize.
+        max_workers (int): Upper bound on pages fetched at the same time.
+
+    Returns:
+        list: One summary string per URL, in the same order as urls.
+    """
+    if not urls:
+        return []
+
+    workers = max(1, min(max_workers, len(urls)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="page-fetch") as executor:
+        return list(executor.map(_summarize, urls))
@@ -0,0 +1,138 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+# On-disk cache of synthesized speech, so fixed phrases ("Okay, sir") don't cost an
+# ElevenLabs round trip every time they are spoken.
+
+CACHE_DIR = os.path.join(os.getcwd(), "../tts_cache")
+MAX_CACHE_BYTES = int(os.getenv("JARVIS_TTS_CACHE_MB", "50")) * 1024 * 1024
+
+
+def make_cache_key(voice_id, model_id, voice_settings, text, output_format):
+    """
+    Build a content-addressed key for a piece of synthesized speech.
+
+    Everything that changes the audio that comes back from the API is part of the key,
+    so switching voices or settings never plays stale audio.
+    """
+    payload = json.dumps({
+        "voice_id": voice_id,
+        "model_id": model_id,
+        "voice_settings": voice_settings,
+        "text": text,
+        "output_format": output_format
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class SpeechCache:
+    """
+    LRU cache of audio files keyed by make_cache_key().
+
+    The in-memory index mirrors the cache directory and is ordered by last use; file
+    mtimes are bumped on every hit so the order survives restarts.
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=MAX_CACHE_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    def _path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.audio")
+
+    def _load_index(self):
+        files = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(".audio"):
+                continue
+            path = os.path.join(self.cache_dir, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            files.append((stat.st_mtime, name[:-len(".audio")], stat.st_size))
+        for _, key, size in sorted(files):
+            self._entries[key] = size
+            self.total_bytes += size
+
+    def get(self, key):
+        """Return the cached audio bytes for key, or None on a miss."""
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            path = self._path(key)
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                os.utime(path, None)
+            except OSError:
+                self.total_bytes -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        """Store audio bytes under key and evict least recently used entries over the cap."""
+        if not data or len(data) > self.max_bytes:
+            return
+        with self._lock:
+            path = self._path(key)
+            temp_path = f"{path}.{threading.get_ident()}.tmp"
+            try:
+                with open(temp_path, "wb") as f:
+                    f.write(data)
+                os.replace(temp_path, path)
+            except OSError as e:
+                print(f"Warning: Could not write speech cache entry: {e}")
+                return
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)
+            self._entries[key] = len(data)
+            self.total_bytes += len(data)
+            self._evict()
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    def _evict(self):
+        while self.total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def stats(self):
+        return {
+            "entries": len(self._entries),
+            "bytes": self.total_bytes,
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+_speech_cache = None
+_speech_cache_lock = threading.Lock()
+
+
+def get_speech_cache():
+    """Return the process-wide SpeechCache, creating it on first use."""
+    global _speech_cache
+    with _speech_cache_lock:
+        if _speech_cache is None:
+            _speech_cache = SpeechCache()
+        return _speech_cache
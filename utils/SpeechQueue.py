@@ -0,0 +1,110 @@
+import queue
+import threading
+
+# A single worker thread owns the audio mixer. Callers hand it utterances and get a
+# handle back right away, so tool execution and the next model call can run while
+# JARVIS is still talking.
+
+
+class SpeechHandle:
+    """Handle for one queued utterance."""
+
+    def __init__(self, text, generation=0):
+        self.text = text
+        self.generation = generation
+        self.cancelled = threading.Event()
+        self._done = threading.Event()
+
+    def wait(self, timeout=None):
+        """Block until the utterance has finished playing (or was cancelled)."""
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """Stop this utterance, or skip it if it hasn't started yet."""
+        self.cancelled.set()
+
+    @property
+    def done(self):
+        return self._done.is_set()
+
+
+class SpeechQueue:
+    """
+    Plays utterances one at a time, in the order they were submitted.
+
+    Each entry is a (handle, play) pair; play(handle) does the actual synthesis and
+    playback and is expected to return early once handle.cancelled is set.
+
+    cancel_all() bumps a generation counter. The worker checks an utterance's generation
+    under the same lock it sets _current with, so one it had already taken off the queue
+    when cancel_all() ran is skipped rather than played.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._current = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._run, name="speech-queue", daemon=True)
+        self._thread.start()
+
+    def submit(self, text, play):
+        with self._lock:
+            handle = SpeechHandle(text, self._generation)
+            self._queue.put((handle, play))
+        return handle
+
+    def _run(self):
+        while True:
+            handle, play = self._queue.get()
+            try:
+                with self._lock:
+                    if handle.generation != self._generation:
+                        handle.cancel()
+                    if handle.cancelled.is_set():
+                        continue
+                    self._current = handle
+                play(handle)
+            except Exception as e:
+                print(f"Error playing queued speech: {e}")
+            finally:
+                with self._lock:
+                    self._current = None
+                handle._done.set()
+                self._queue.task_done()
+
+    def cancel_all(self):
+        """Barge-in: drop everything queued and cut off the utterance that is playing."""
+        with self._lock:
+            self._generation += 1
+            if self._current is not None:
+                self._current.cancel()
+        while True:
+            try:
+                handle, _ = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            handle.cancel()
+            handle._done.set()
+            self._queue.task_done()
+
+    def wait_until_idle(self):
+        """Block until every queued utterance has played."""
+        self._queue.join()
+
+    def is_busy(self):
+        with self._lock:
+            return self._current is not None or not self._queue.empty()
+
+
+_speech_queue = None
+_speech_queue_lock = threading.Lock()
+
+
+def get_speech_queue():
+    """Return the process-wide SpeechQueue, starting its worker on first use."""
+    global _speech_queue
+    with _speech_queue_lock:
+        if _speech_queue is None:
+            _speech_queue = SpeechQueue()
+        return _speech_queue
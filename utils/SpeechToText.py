@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import threading
+import speech_recognition as sr
+
+# Pluggable speech-to-text. The local backends run on the CPU and are loaded once and
+# kept warm, so short commands don't pay a network round trip to Google every turn.
+#
+#   vosk    - Kaldi based, streaming capable, small English model (~40MB)
+#   whisper - faster-whisper with int8 weights (optional, pip install faster-whisper)
+#   google  - the original recognize_google web API
+#
+# All backends follow speech_recognition's conventions: transcribe() returns the text,
+# raises sr.UnknownValueError when nothing was understood and sr.RequestError when the
+# engine itself failed. open_stream() returns a session that accepts 16 kHz 16-bit PCM
+# frames while the user is still talking; vosk decodes them as they arrive, the others
+# buffer them and transcribe once the utterance ends.
+
+ASR_BACKEND = os.getenv("JARVIS_ASR_BACKEND", "vosk")
+VOSK_MODEL_PATH = os.getenv("JARVIS_VOSK_MODEL", os.path.join(os.getcwd(), "../models/vosk-model-small-en-us-0.15"))
+WHISPER_MODEL = os.getenv("JARVIS_WHISPER_MODEL", "tiny.en")
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+def _audio_bytes(audio):
+    """Raw 16 kHz 16-bit mono PCM for an sr.AudioData."""
+    return audio.get_raw_data(convert_rate=SAMPLE_RATE, convert_width=SAMPLE_WIDTH)
+
+
+def _silence(seconds=0.5):
+    return sr.AudioData(b"\x00\x00" * int(SAMPLE_RATE * seconds), SAMPLE_RATE, SAMPLE_WIDTH)
+
+
+class BufferedStream:
+    """Streaming session for backends that can only transcribe a whole utterance."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.frames = []
+
+    def accept(self, frame):
+        self.frames.append(frame)
+
+    def finish(self):
+        return self.backend.transcribe(sr.AudioData(b"".join(self.frames), SAMPLE_RATE, SAMPLE_WIDTH))
+
+
+class VoskStream:
+    """Streaming session that decodes every frame as it arrives."""
+
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.segments = []
+
+    def accept(self, frame):
+        # AcceptWaveform returns True when vosk closed a segment on its own (a pause mid-sentence)
+        if self.recognizer.AcceptWaveform(frame):
+            self.segments.append(json.loads(self.recognizer.Result()).get("text", ""))
+
+    def finish(self):
+        self.segments.append(json.loads(self.recognizer.FinalResult()).get("text", ""))
+        text = " ".join(segment.strip() for segment in self.segments if segment.strip())
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+
+class GoogleBackend:
+    name = "google"
+
+    def __init__(self):
+        self.recognizer = sr.Recognizer()
+
+    def transcribe(self, audio):
+        return self.recognizer.recognize_google(audio)
+
+    def open_stream(self):
+        return BufferedStream(self)
+
+
+class VoskBackend:
+    name = "vosk"
+
+    def __init__(self, model_path=VOSK_MODEL_PATH):
+        from vosk import Model, SetLogLevel
+        SetLogLevel(-1)
+        if not os.path.isdir(model_path):
+            raise FileNotFoundError(f"Vosk model not found at {model_path}")
+        self.model = Model(model_path)
+
+    def new_recognizer(self, grammar=None):
+        """A fresh KaldiRecognizer; grammar is an optional list of allowed phrases."""
+        from vosk import KaldiRecognizer
+        if grammar:
+            return KaldiRecognizer(self.model, SAMPLE_RATE, json.dumps(grammar))
+        return KaldiRecognizer(self.model, SAMPLE_RATE)
+
+    def transcribe(self, audio):
+        recognizer = self.new_recognizer()
+        recognizer.AcceptWaveform(_audio_bytes(audio))
+        text = json.loads(recognizer.FinalResult()).get("text", "").strip()
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def open_stream(self):
+        return VoskStream(self.new_recognizer())
+
+
+class WhisperBackend:
+    name = "whisper"
+
+    def __init__(self, model_name=WHISPER_MODEL):
+        from faster_whisper import WhisperModel
+        self.model = WhisperModel(model_name, device="cpu", compute_type="int8")
+
+    def transcribe(self, audio):
+        import numpy as np
+        samples = np.frombuffer(_audio_bytes(audio), dtype=np.int16).astype(np.float32) / 32768.0
+        try:
+            segments, _ = self.model.transcribe(samples, language="en", beam_size=1)
+            text = " ".join(segment.text.strip() for segment in segments).strip()
+        except Exception as e:
+            raise sr.RequestError(f"Whisper transcription failed: {e}")
+        if not text:
+            raise sr.UnknownValueError()
+        return text
+
+    def open_stream(self):
+        return BufferedStream(self)
+
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "vosk": VoskBackend,
+    "whisper": WhisperBackend
+}
+
+_backends = {}
+_backends_lock = threading.Lock()
+
+
+def load_asr_backend(name):
+    """Load a backend by name and run one warm-up transcription so the first command is fast."""
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown ASR backend '{name}', expected one of {list(BACKENDS)}")
+    start = time.perf_counter()
+    backend = BACKENDS[name]()
+    if name != "google":
+        try:
+            backend.transcribe(_silence())
+        except sr.UnknownValueError:
+            pass
+    print(f"Loaded {name} speech recognition in {time.perf_counter() - start:.2f}s")
+    return backend
+
+
+def get_asr_backend(name=None):
+    """
+    Return the shared backend for name (default JARVIS_ASR_BACKEND).
+
+    Local backends that fail to load (missing package or model) fall back to google.
+    """
+    name = name or ASR_BACKEND
+    with _backends_lock:
+        if name not in _backends:
+            try:
+                _backends[name] = load_asr_backend(name)
+            except Exception as e:
+                if name == "google":
+                    raise
+                print(f"Warning: Could not load {name} speech recognition ({e}), falling back to google.")
+                _backends[name] = _backends.get("google") or load_asr_backend("google")
+                _backends["google"] = _backends[name]
+        return _backends[name]
+
+
+def transcribe(audio, backend=None):
+    """Transcribe an sr.AudioData with the configured backend."""
+    return get_asr_backend(backend).transcribe(audio)
@@ -0,0 +1,153 @@
+import os
+import re
+import time
+
+# Streaming model turns. The Gemini response is read with the streaming API, cut into
+# sentences as the tokens come in, and every finished sentence goes to the speech queue
+# right away: the first one is streamed from ElevenLabs, later ones are synthesized in
+# the background while the earlier ones play. JARVIS starts talking after roughly the
+# first sentence of the model plus the first sentence of TTS, not after both in full.
+
+STREAM_TURNS = os.getenv("JARVIS_STREAM_TURNS", "1") != "0"
+MIN_SENTENCE_CHARS = 12  # Shorter fragments ("Sure.") are joined with the next sentence
+ABBREVIATIONS = {"mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "vs", "etc", "e.g", "i.e", "u.s", "a.m", "p.m",
+                 "no", "fig", "approx"}
+SENTENCE_END = re.compile(r"[.!?]+[\"')\]]*(?=\s)|\n{2,}|\n(?=\s*[-*\d])")
+MARKDOWN = re.compile(r"[*_#`>]+|\[(.*?)\]\(.*?\)")
+
+
+def clean_for_speech(text):
+    """Drop markdown markup that would otherwise be read out."""
+    text = MARKDOWN.sub(lambda m: m.group(1) or "", text)
+    return re.sub(r"\s+", " ", text).strip()
+
+
+class SentenceSplitter:
+    """Incremental sentence splitter: feed() text deltas, get back the sentences they completed."""
+
+    def __init__(self, min_chars=MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self.buffer = ""
+
+    def _is_boundary(self, text, match):
+        if match.group().startswith("."):
+            words = text[:match.start()].split()
+            last = words[-1].lower().rstrip(".") if words else ""
+            if last in ABBREVIATIONS or (len(last) == 1 and last.isalpha()):
+                return False
+            # Decimal numbers ("3.5") never reach here: the lookahead wants whitespace
+        return True
+
+    def feed(self, delta):
+        self.buffer += delta
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self.buffer):
+            if not self._is_boundary(self.buffer, match):
+                continue
+            sentence = self.buffer[start:match.end()].strip()
+            if len(sentence) < self.min_chars:
+                continue  # Keep it and let the next sentence carry it
+            sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+
+    def flush(self):
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+
+class ModelTurn:
+    """What a model call produced: its function calls and the text, plus timings."""
+
+    def __init__(self):
+        self.function_calls = []
+        self.text = ""
+        self.spoken = False
+        self.first_token_seconds = None
+        self.first_sentence_seconds = None
+        self.total_seconds = None
+
+    @property
+    def function_call(self):
+        """The first function call, or None."""
+        return self.function_calls[0] if self.function_calls else None
+
+
+def _parts(chunk):
+    candidates = getattr(chunk, "candidates", None) or []
+    if not candidates or not candidates[0].content or not candidates[0].content.parts:
+        return []
+    return candidates[0].content.parts
+
+
+def model_turn(response):
+    """Wrap a non-streaming generate_content response in a ModelTurn."""
+    turn = ModelTurn()
+    parts = _parts(response)
+    turn.function_calls = [part.function_call for part in parts if part.function_call]
+    turn.text = "".join(part.text for part in parts if part.text)
+    return turn
+
+
+def stream_model_turn(chunks, speak):
+    """
+    Consume a generate_content_stream response, speaking complete sentences as they arrive.
+
+    Nothing is spoken once a function call shows up, and replies that start with a code
+    fence (the ```tool_outputs workaround in main) are collected silently.
+
+    Args:
+        chunks (iterable): The streamed GenerateContentResponse chunks.
+        speak (callable): speak(text, prefetch=bool), e.g. jarvis_config.speak.
+
+    Returns:
+        ModelTurn: With spoken=True when the text was already handed to TTS.
+    """
+    turn = ModelTurn()
+    splitter = SentenceSplitter()
+    start = time.perf_counter()
+    text = []
+    speaking = None  # Decided on the first non-blank character
+    sentences = 0
+
+    def say(sentence):
+        nonlocal sentences
+        sentence = clean_for_speech(sentence)
+        if not sentence:
+            return
+        if sentences == 0:
+            turn.first_sentence_seconds = time.perf_counter() - start
+        # The first sentence streams straight away, later ones render while earlier ones play
+        speak(sentence, prefetch=sentences > 0)
+        sentences += 1
+
+    for chunk in chunks:
+        for part in _parts(chunk):
+            if part.function_call:
+                turn.function_calls.append(part.function_call)
+                speaking = False
+            if not part.text:
+                continue
+            if turn.first_token_seconds is None:
+                turn.first_token_seconds = time.perf_counter() - start
+            text.append(part.text)
+            delta = part.text
+            if speaking is None:
+                so_far = "".join(text)
+                if not so_far.strip():
+                    continue
+                speaking = not so_far.lstrip().startswith("`")
+                delta = so_far
+            if speaking:
+                for sentence in splitter.feed(delta):
+                    say(sentence)
+
+    if speaking:
+        for sentence in splitter.flush():
+            say(sentence)
+    turn.text = "".join(text)
+    turn.spoken = bool(speaking and sentences)
+    turn.total_seconds = time.perf_counter() - start
+    return turn
@@ -0,0 +1,363 @@
+import os
+import time
+import bisect
+import threading
+from collections import Counter
+
+# Runs the tools Gemini asks for. main used to take the first function_call of a response
+# and run it through an if/elif chain on the voice thread, so a hung tool hung JARVIS.
+# Tools are now looked up in a ToolRegistry and every call of a turn runs on its own
+# thread, so "email Alice and call Bob" does both at once. Each tool has a timeout:
+# when it runs out the call is reported as timed out and main moves on.
+#
+# Tools that drive the shared browser declare the "browser" resource and run one at a
+# time, since a WebDriver session can't take commands from two threads.
+#
+# What timing out or cancelling a call does (Python threads can't be killed):
+#   - a call still waiting for its resource gives up
+#   - a running call is told through its cancelled event; tools that call
+#     check_cancelled() between steps stop at the next one
+#   - the resources of a timed out call are taken back from it and reset (for the
+#     browser: the driver is recycled, which also fails the hung WebDriver command), so
+#     the next command doesn't find the resource busy until the stuck thread returns
+#   - anything else the handler is doing runs to its end and its result is dropped
+
+DEFAULT_TIMEOUT = float(os.getenv("JARVIS_TOOL_TIMEOUT", "60"))
+POLL_SECONDS = 0.05
+LATENCY_BUCKETS_MS = (50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000, 120000)
+
+
+def _parse_overrides(value):
+    overrides = {}
+    for item in (value or "").split(","):
+        name, _, seconds = item.partition("=")
+        try:
+            overrides[name.strip()] = float(seconds)
+        except ValueError:
+            continue
+    return overrides
+
+
+# e.g. JARVIS_TOOL_TIMEOUTS="research_topic=180,call=20"
+TIMEOUT_OVERRIDES = _parse_overrides(os.getenv("JARVIS_TOOL_TIMEOUTS"))
+
+_current = threading.local()
+
+
+def current_call():
+    """The ToolCall running on this thread, or None outside of the engine."""
+    return getattr(_current, "call", None)
+
+
+class ToolCancelled(Exception):
+    """Raised by check_cancelled() in a tool whose call timed out or was cancelled."""
+
+
+def is_cancelled():
+    """True when the tool running on this thread timed out or was cancelled."""
+    call = current_call()
+    return call is not None and call.cancelled.is_set()
+
+
+def check_cancelled():
+    """Raise ToolCancelled if the tool running on this thread should stop (no-op outside the engine)."""
+    if is_cancelled():
+        raise ToolCancelled(f"{current_call().name} was cancelled")
+
+
+class Resource:
+    """
+    Something only one call may use at a time. Unlike a plain lock it knows its owner,
+    so the engine can take it back from a call that timed out.
+    """
+
+    def __init__(self, name, reset=None):
+        self.name = name
+        self.reset = reset
+        self.owner = None
+        self._cond = threading.Condition()
+
+    def acquire(self, call, deadline):
+        with self._cond:
+            while self.owner is not None:
+                if call.cancelled.is_set() or time.monotonic() > deadline:
+                    return False
+                self._cond.wait(POLL_SECONDS)
+            self.owner = call
+            return True
+
+    def release(self, call):
+        """Give the resource up if call still owns it; returns whether it did."""
+        with self._cond:
+            if self.owner is not call:
+                return False
+            self.owner = None
+            self._cond.notify_all()
+            return True
+
+
+class Tool:
+    __slots__ = ("name", "handler", "timeout", "resources")
+
+    def __init__(self, name, handler, timeout, resources):
+        self.name = name
+        self.handler = handler
+        self.timeout = timeout
+        self.resources = resources
+
+
+class ToolRegistry:
+    """Tool name -> handler(args) plus its timeout and the shared resources it needs."""
+
+    def __init__(self):
+        self._tools = {}
+
+    def register(self, name, handler, timeout=None, resources=()):
+        """
+        Add a tool.
+
+        Args:
+            name (str): The function name Gemini uses.
+            handler (callable): Called as handler(args) with the call's argument dict.
+            timeout (float, optional): Seconds the tool may run; defaults to DEFAULT_TIMEOUT.
+                JARVIS_TOOL_TIMEOUTS overrides it.
+            resources (tuple): Names of resources only one tool may hold at a time.
+        """
+        timeout = TIMEOUT_OVERRIDES.get(name, timeout or DEFAULT_TIMEOUT)
+        self._tools[name] = Tool(name, handler, timeout, tuple(sorted(resources)))
+
+    def get(self, name):
+        return self._tools.get(name)
+
+    def names(self):
+        return list(self._tools)
+
+
+class ToolCall:
+    """One function call being executed, and what came of it."""
+
+    def __init__(self, name, args):
+        self.name = name
+        self.args = dict(args or {})
+        self.result = None
+        self.error = None
+        self.timed_out = False
+        self.seconds = None
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.started_at = None
+        self._finish_lock = threading.Lock()
+
+    def finish(self, seconds, result=None, error=None, timed_out=False):
+        """Record the outcome unless the call already has one; returns whether this one counted."""
+        with self._finish_lock:
+            if self.done.is_set():
+                return False
+            self.result, self.error, self.timed_out, self.seconds = result, error, timed_out, seconds
+            if timed_out:
+                self.cancelled.set()
+            self.done.set()
+            return True
+
+    @property
+    def ok(self):
+        return self.error is None and not self.timed_out
+
+    def response(self):
+        """The result to report back to the model (errors as a status dict)."""
+        if self.timed_out:
+            return {"status": "error", "message": f"{self.name} timed out after {self.seconds:.0f} seconds"}
+        if self.error is not None:
+            return {"status": "error", "message": f"{self.name} failed: {self.error}"}
+        return self.result
+
+    def __repr__(self):
+        state = "timed out" if self.timed_out else "error" if self.error else "ok"
+        return f"ToolCall({self.name}, {state}, {self.seconds})"
+
+
+class LatencyHistogram:
+    """Counts of durations per bucket of LATENCY_BUCKETS_MS, plus count, total and max."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS_MS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(self.buckets, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+
+    def percentile(self, p):
+        """Upper bound of the bucket holding the p-th percentile (None if empty)."""
+        if not self.count:
+            return None
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return self.buckets[i] if i < len(self.buckets) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        labels = [f"<={b}" for b in self.buckets] + [f">{self.buckets[-1]}"]
+        return {
+            "count": self.count,
+            "avg_ms": self.total_ms / self.count if self.count else None,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self.max_ms,
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n}
+        }
+
+
+class ToolEngine:
+    """
+    Executes batches of tool calls concurrently with per-tool timeouts.
+
+    resets maps a resource name to a callable that makes the resource usable again after
+    a call timed out while holding it, e.g. {"browser": shared_browser.recycle}. It runs
+    before the resource is handed to the next call, so it must not block.
+    """
+
+    def __init__(self, registry, resets=None):
+        self.registry = registry
+        self.resets = dict(resets or {})
+        self._resources = {}
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._outcomes = Counter()
+        self._running = set()
+
+    def _resource(self, name):
+        with self._lock:
+            if name not in self._resources:
+                self._resources[name] = Resource(name, self.resets.get(name))
+            return self._resources[name]
+
+    def _acquire(self, call, tool):
+        """Take the tool's resources, giving up when cancelled or after the tool's timeout."""
+        held = []
+        deadline = time.monotonic() + tool.timeout
+        for name in tool.resources:
+            resource = self._resource(name)
+            if not resource.acquire(call, deadline):
+                for other in held:
+                    other.release(call)
+                return None
+            held.append(resource)
+        return held
+
+    def _reclaim(self, call):
+        """Reset the resources a timed out call still holds and take them back from it."""
+        tool = self.registry.get(call.name)
+        for name in tool.resources:
+            resource = self._resource(name)
+            if resource.owner is not call:
+                continue
+            if resource.reset is not None:
+                print(f"Warning: Resetting {name} after {call.name} timed out")
+                try:
+                    resource.reset()
+                except Exception as e:
+                    print(f"Warning: Could not reset {name}: {e}")
+            resource.release(call)
+
+    def _execute(self, call, tool):
+        _current.call = call
+        held = self._acquire(call, tool)
+        if held is None:
+            call.finish(0.0, error=f"{', '.join(tool.resources)} busy with another command")
+            _current.call = None
+            with self._lock:
+                self._running.discard(call)
+            return
+        result, error = None, None
+        call.started_at = time.monotonic()
+        try:
+            result = tool.handler(call.args)
+        except BaseException as e:
+            # SystemExit and KeyboardInterrupt included: on this thread they would only
+            # end the thread and leave the call without an outcome
+            error = e if isinstance(e, Exception) else f"{type(e).__name__}({e})"
+        finally:
+            for resource in held:
+                resource.release(call)
+            _current.call = None
+            elapsed = time.monotonic() - call.started_at
+            if not call.finish(elapsed, result=result, error=error):
+                print(f"Debug: {call.name} finished {elapsed:.1f}s after it timed out")
+            with self._lock:
+                self._running.discard(call)
+
+    def start(self, name, args):
+        """Start one call on its own thread and return its ToolCall."""
+        call = ToolCall(name, args)
+        tool = self.registry.get(name)
+        if tool is None:
+            call.finish(0.0, error=f"Unknown function: {name}")
+            return call
+        with self._lock:
+            self._running.add(call)
+        threading.Thread(target=self._execute, args=(call, tool), name=f"tool-{name}", daemon=True).start()
+        return call
+
+    def wait(self, call):
+        """Block until call finishes or runs past its tool's timeout."""
+        tool = self.registry.get(call.name)
+        while not call.done.wait(POLL_SECONDS):
+            if call.started_at is not None and time.monotonic() - call.started_at > tool.timeout:
+                if call.finish(time.monotonic() - call.started_at, timed_out=True):
+                    print(f"Warning: {call.name} timed out after {tool.timeout:.0f}s")
+                    self._reclaim(call)
+        self._record(call)
+        return call
+
+    def run(self, calls):
+        """
+        Run a batch of function calls concurrently.
+
+        Args:
+            calls (list): (name, args) pairs, e.g. from the function_call parts of a response.
+
+        Returns:
+            list: A finished ToolCall per call, in the same order.
+        """
+        started = [self.start(name, args) for name, args in calls]
+        return [self.wait(call) for call in started]
+
+    def cancel_all(self):
+        """
+        Ask every running call to stop: calls waiting for a resource give up right away,
+        running ones at their next check_cancelled().
+        """
+        with self._lock:
+            running = list(self._running)
+        for call in running:
+            call.cancelled.set()
+
+    def _record(self, call):
+        outcome = "timeout" if call.timed_out else "error" if call.error is not None else "ok"
+        with self._lock:
+            self._outcomes[(call.name, outcome)] += 1
+            if outcome == "ok":
+                self._histograms.setdefault(call.name, LatencyHistogram()).add(call.seconds * 1000)
+
+    def stats(self):
+        """
+        Returns:
+            dict: Per tool, the ok/error/timeout counts and the latency histogram of the
+            successful calls.
+        """
+        with self._lock:
+            stats = {}
+            for (name, outcome), n in self._outcomes.items():
+                stats.setdefault(name, {})[outcome] = n
+            for name, histogram in self._histograms.items():
+                stats.setdefault(name, {})["latency"] = histogram.to_dict()
+            return stats
@@ -0,0 +1,147 @@
+import os
+import time
+import threading
+import importlib.util
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# One set of connections for every API JARVIS talks to. Each module used to call
+# requests.post() (a fresh TCP + TLS handshake per call) or build its own genai.Client;
+# they now share:
+#
+#   get_api_session()  - keep-alive requests session for ElevenLabs, Bland and the Gemini
+#                        REST endpoint, with default timeouts and bounded retries
+#   get_genai_client() - one google-genai client (its own pooled httpx connections)
+#
+# prewarm_connections() opens the connections in the background at startup, so the
+# first command doesn't pay for DNS and the TLS handshake.
+
+CONNECT_TIMEOUT = float(os.getenv("JARVIS_CONNECT_TIMEOUT", "3.05"))
+READ_TIMEOUT = float(os.getenv("JARVIS_READ_TIMEOUT", "30"))
+GENAI_TIMEOUT_MS = int(os.getenv("JARVIS_GENAI_TIMEOUT_MS", "60000"))
+POOL_SIZE = 8
+PREWARM_URLS = [
+    "https://api.elevenlabs.io",
+    "https://generativelanguage.googleapis.com",
+    "https://api.bland.ai",
+]
+
+
+def _retry_policy():
+    # Connection failures are retried for every method (nothing reached the server).
+    # Status and read retries only for idempotent methods, so a POST that started a
+    # phone call or a synthesis is never sent twice. Retry-After is ignored to keep the
+    # worst case bounded by the backoff.
+    return Retry(
+        total=2, connect=2, read=1, status=2,
+        backoff_factor=0.3,
+        status_forcelist=(429, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "OPTIONS"}),
+        respect_retry_after_header=False,
+        raise_on_status=False
+    )
+
+
+class TimeoutSession(requests.Session):
+    """A requests session that applies a default (connect, read) timeout to every request."""
+
+    def __init__(self, timeout=(CONNECT_TIMEOUT, READ_TIMEOUT)):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return super().request(method, url, **kwargs)
+
+
+def make_session(pool_size=POOL_SIZE, retries=True):
+    """
+    Create a keep-alive TimeoutSession with a connection pool per host.
+
+    retries=True applies _retry_policy(), meant for API clients; sessions that have a
+    better fallback than waiting (HttpFetcher escalates to a browser) pass False.
+    """
+    session = TimeoutSession()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size,
+                          max_retries=_retry_policy() if retries else 0)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_api_session = None
+_genai_client = None
+_generativeai_configured = False
+_lock = threading.Lock()
+
+
+def get_api_session():
+    """Return the shared session for API calls (ElevenLabs, Bland, Gemini REST)."""
+    global _api_session
+    with _lock:
+        if _api_session is None:
+            _api_session = make_session()
+        return _api_session
+
+
+def get_genai_client():
+    """
+    Return the process-wide google-genai client.
+
+    HTTP/2 is turned on when the h2 package is installed (pip install "httpx[http2]"),
+    otherwise the client keeps HTTP/1.1 keep-alive connections.
+    """
+    global _genai_client
+    with _lock:
+        if _genai_client is None:
+            from google import genai
+            from google.genai import types
+            client_args = {"http2": True} if importlib.util.find_spec("h2") else None
+            http_options = types.HttpOptions(timeout=GENAI_TIMEOUT_MS, client_args=client_args,
+                                             async_client_args=client_args)
+            _genai_client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"), http_options=http_options)
+        return _genai_client
+
+
+def configure_generativeai():
+    """Configure the legacy google.generativeai SDK once and return the module."""
+    global _generativeai_configured
+    import google.generativeai as generativeai
+    with _lock:
+        if not _generativeai_configured:
+            generativeai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            _generativeai_configured = True
+    return generativeai
+
+
+def prewarm_connections(model=None, urls=PREWARM_URLS):
+    """
+    Open the API connections on a background thread.
+
+    Args:
+        model (str, optional): A Gemini model name; when given, the genai client fetches
+            its metadata, which opens the client's connection as well.
+        urls (list): Hosts to connect to through the shared session.
+
+    Returns:
+        threading.Thread: The started warm-up thread.
+    """
+    def warm():
+        start = time.perf_counter()
+        session = get_api_session()
+        for url in urls:
+            try:
+                session.head(url, timeout=(CONNECT_TIMEOUT, 5))
+            except requests.RequestException as e:
+                print(f"Warning: Could not pre-connect to {url}: {e}")
+        if model:
+            try:
+                get_genai_client().models.get(model=model)
+            except Exception as e:
+                print(f"Warning: Could not pre-connect the Gemini client: {e}")
+        print(f"Debug: API connections warmed in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    thread = threading.Thread(target=warm, name="prewarm-connections", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,407 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+import numpy as np
+import speech_recognition as sr
+from utils.SpeechToText import SAMPLE_RATE, SAMPLE_WIDTH, get_asr_backend
+from utils.SpeechQueue import get_speech_queue
+
+try:
+    import webrtcvad
+except ImportError:
+    webrtcvad = None
+
+# Streaming capture with voice activity detection. Audio is read in 30 ms frames and
+# handed to the speech recognizer as it comes in; the utterance ends as soon as the
+# speaker has been quiet for END_SILENCE_MS, so transcription is finished almost at the
+# moment the user stops talking instead of after a fixed listen timeout.
+#
+# The microphone is opened once by MicrophoneStream, whose capture thread keeps the last
+# RING_SECONDS of audio. Push-to-talk and prompts read from that buffer starting
+# PRE_ROLL_MS before the key press, so nothing is lost to device setup.
+#
+# The energy threshold is not calibrated with a fixed wait at startup. AmbientNoise follows
+# the room's noise floor from every captured frame (the quietest second of the last
+# NOISE_WINDOW_SECONDS) and saves it to NOISE_PROFILE_PATH, so the next run starts with
+# the last known value and a change in background noise is picked up within seconds.
+
+FRAME_MS = 30
+FRAME_SAMPLES = SAMPLE_RATE * FRAME_MS // 1000
+FRAME_BYTES = FRAME_SAMPLES * SAMPLE_WIDTH
+END_SILENCE_MS = int(os.getenv("JARVIS_END_SILENCE_MS", "600"))
+START_SPEECH_MS = 90  # Voiced audio needed before an utterance counts as started
+PRE_SPEECH_MS = 300  # Audio kept from before the speech started, so the first syllable isn't clipped
+VAD_AGGRESSIVENESS = int(os.getenv("JARVIS_VAD_AGGRESSIVENESS", "2"))
+RING_SECONDS = 30
+PRE_ROLL_MS = int(os.getenv("JARVIS_PRE_ROLL_MS", "300"))
+DYNAMIC_ENERGY_RATIO = 1.5  # Same margin over ambient noise that sr.Recognizer uses
+DEFAULT_ENERGY_THRESHOLD = 300  # sr.Recognizer's default, used until the noise floor is known
+MIN_ENERGY_THRESHOLD = 50
+NOISE_PROFILE_PATH = os.path.join(os.getcwd(), "../noise_profile.json")
+NOISE_WINDOW_SECONDS = 15
+NOISE_SAVE_INTERVAL = 60
+CALIBRATION_SECONDS = 1.0
+NOISE_MAX_SPEECH_SECONDS = 15  # "Speech" without a pause for longer than this is the room getting louder
+
+
+def frame_energy(frame):
+    """RMS energy of a 16-bit PCM frame, on the same scale as sr.Recognizer.energy_threshold."""
+    samples = np.frombuffer(frame, dtype=np.int16).astype(np.float32)
+    if not samples.size:
+        return 0.0
+    return float(np.sqrt(np.mean(samples * samples)))
+
+
+class AmbientNoise:
+    """
+    Running estimate of the background noise level.
+
+    Frame energies are averaged per second and the quietest of the last window_seconds
+    averages is taken as the noise floor: pauses between words are enough to find it,
+    and when the room gets louder (or quieter) the estimate follows once the old seconds
+    leave the window. The floor is persisted so a restart doesn't need to calibrate.
+    """
+
+    def __init__(self, path=NOISE_PROFILE_PATH, window_seconds=NOISE_WINDOW_SECONDS):
+        self.path = path
+        self.floor = None
+        self._seconds = deque(maxlen=window_seconds)
+        self._sum = 0.0
+        self._count = 0
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        self.load()
+
+    @property
+    def calibrated(self):
+        return self.floor is not None
+
+    @property
+    def threshold(self):
+        if self.floor is None:
+            return DEFAULT_ENERGY_THRESHOLD
+        return max(MIN_ENERGY_THRESHOLD, self.floor * DYNAMIC_ENERGY_RATIO)
+
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                self.floor = float(json.load(f)["noise_floor"])
+            print(f"Loaded noise floor {self.floor:.0f} from {self.path}")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Warning: Could not read noise profile {self.path}: {e}")
+
+    def save(self):
+        if self.floor is None:
+            return
+        try:
+            with open(self.path, "w") as f:
+                json.dump({"noise_floor": self.floor, "updated": time.time()}, f)
+        except Exception as e:
+            print(f"Warning: Could not save noise profile {self.path}: {e}")
+        self._saved_at = time.monotonic()
+
+    def seed(self, energy):
+        """Set the floor from a dedicated calibration measurement."""
+        with self._lock:
+            self.floor = energy
+
+    def update(self, energy):
+        """Account for one non-speech frame's energy; called by the capture thread."""
+        with self._lock:
+            self._sum += energy
+            self._count += 1
+            if self._count * FRAME_MS < 1000:
+                return
+            self._seconds.append(self._sum / self._count)
+            self._sum = 0.0
+            self._count = 0
+            # A few seconds are enough for a first estimate; until then trust the saved value
+            if self.floor is None or len(self._seconds) >= 3:
+                self.floor = min(self._seconds)
+        if time.monotonic() - self._saved_at > NOISE_SAVE_INTERVAL:
+            self.save()
+
+
+class EnergyVad:
+    """Speech when the frame energy is above the current noise threshold."""
+
+    def __init__(self, noise):
+        self.noise = noise
+
+    def is_speech(self, frame):
+        return frame_energy(frame) > self.noise.threshold
+
+
+class WebRtcVad:
+    """WebRTC's GMM voice detector; ignores steady background noise better than an energy gate."""
+
+    def __init__(self, noise=None, aggressiveness=VAD_AGGRESSIVENESS):
+        self.vad = webrtcvad.Vad(aggressiveness)
+        self.noise = noise
+
+    def is_speech(self, frame):
+        # Half the noise threshold keeps the detector from firing on near-silence
+        if self.noise is not None and frame_energy(frame) < self.noise.threshold / 2:
+            return False
+        return self.vad.is_speech(frame, SAMPLE_RATE)
+
+
+def make_vad(noise=None):
+    """
+    Return the WebRTC detector when webrtcvad is installed, otherwise an energy gate.
+    Both follow noise (default: the shared microphone stream's AmbientNoise).
+    """
+    noise = noise or get_microphone_stream().noise
+    if webrtcvad is not None:
+        return WebRtcVad(noise)
+    return EnergyVad(noise)
+
+
+def open_microphone():
+    """An sr.Microphone that delivers frames in the format the VAD and recognizers expect."""
+    return sr.Microphone(sample_rate=SAMPLE_RATE, chunk_size=FRAME_SAMPLES)
+
+
+def read_frames(source):
+    """Yield FRAME_BYTES frames from an open sr.Microphone."""
+    while True:
+        frame = source.stream.read(FRAME_SAMPLES)
+        if len(frame) < FRAME_BYTES:
+            frame += b"\x00" * (FRAME_BYTES - len(frame))
+        yield frame
+
+
+class MicrophoneStream:
+    """
+    Long-lived microphone capture into a fixed-size ring buffer.
+
+    A daemon thread keeps the PyAudio stream open and appends every frame to the ring.
+    Frames are numbered, so any number of readers can follow the stream from a given
+    position (see frames()) without the device ever being reopened.
+
+    The noise floor only learns from frames noise_vad calls non-speech, and not at all
+    while JARVIS is talking: the user's voice, TTS coming back through the microphone or
+    music would otherwise raise the threshold and get saved with the profile.
+
+    noise_vad decides with the threshold the floor is supposed to learn, so a room that
+    gets steadily louder than that threshold would look like speech forever and the floor
+    would never move. "Speech" that goes on for NOISE_MAX_SPEECH_SECONDS without an
+    END_SILENCE_MS pause is no utterance; from then on its frames count as noise too.
+    """
+
+    def __init__(self, ring_seconds=RING_SECONDS, noise=None, noise_vad=None, is_playing=None):
+        self.ring = deque(maxlen=int(ring_seconds * 1000 / FRAME_MS))
+        self.noise = noise or AmbientNoise()
+        self.noise_vad = noise_vad or make_vad(self.noise)
+        self.is_playing = is_playing or (lambda: get_speech_queue().is_busy())
+        self.total = 0  # Frames captured since start; the newest frame is number total - 1
+        self._speech_run = 0  # Speech frames since the last END_SILENCE_MS pause
+        self._quiet_run = 0
+        self.last_frame_time = None
+        self.error = None
+        self._cond = threading.Condition()
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._capture, name="microphone", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        self.noise.save()
+
+    def _capture(self):
+        try:
+            with open_microphone() as source:
+                for frame in read_frames(source):
+                    if self._stopped.is_set():
+                        break
+                    self.track_noise(frame)
+                    with self._cond:
+                        self.ring.append(frame)
+                        self.total += 1
+                        self.last_frame_time = time.monotonic()
+                        self._cond.notify_all()
+        except Exception as e:
+            print(f"Error: Microphone capture stopped: {e}")
+            self.error = e
+        finally:
+            self._stopped.set()
+            with self._cond:
+                self._cond.notify_all()
+
+    def track_noise(self, frame):
+        """Feed frame to the noise floor unless it is speech or JARVIS is speaking."""
+        if self.is_playing():
+            return
+        if self.noise_vad.is_speech(frame):
+            self._quiet_run = 0
+            self._speech_run += 1
+            if self._speech_run * FRAME_MS < NOISE_MAX_SPEECH_SECONDS * 1000:
+                return
+        else:
+            self._quiet_run += 1
+            if self._quiet_run * FRAME_MS >= END_SILENCE_MS:
+                self._speech_run = 0
+        self.noise.update(frame_energy(frame))
+
+    def position(self):
+        """Number of the next frame to be captured."""
+        with self._cond:
+            return self.total
+
+    def position_at(self, moment):
+        """Frame number that was being captured at time.monotonic() value moment."""
+        with self._cond:
+            if self.last_frame_time is None:
+                return self.total
+            frames_ago = int((self.last_frame_time - moment) * 1000 / FRAME_MS)
+            return min(self.total, self.total - frames_ago)
+
+    def frames(self, start=None, pre_roll_ms=PRE_ROLL_MS):
+        """
+        Yield frames from start (default: now) minus pre_roll_ms, blocking for new audio.
+
+        A reader that falls more than the ring length behind skips ahead to the oldest
+        frame still buffered. Ends when the stream is closed.
+        """
+        index = self.position() if start is None else start
+        index -= pre_roll_ms // FRAME_MS
+        while True:
+            with self._cond:
+                while index >= self.total and not self._stopped.is_set():
+                    self._cond.wait(timeout=1)
+                if index >= self.total:
+                    return
+                oldest = self.total - len(self.ring)
+                index = max(index, oldest)
+                frame = self.ring[index - oldest]
+            index += 1
+            yield frame
+
+    def calibrate(self, duration=CALIBRATION_SECONDS):
+        """
+        Measure the room for duration seconds and seed the noise floor with it. Only needed
+        when there is no saved profile; afterwards the floor keeps itself up to date.
+        """
+        frames = []
+        for frame in self.frames(pre_roll_ms=0):
+            frames.append(frame)
+            if len(frames) * FRAME_MS / 1000 >= duration:
+                break
+        if frames:
+            self.noise.seed(frame_energy(b"".join(frames)))
+            self.noise.save()
+        return self.noise.threshold
+
+
+_microphone_stream = None
+_microphone_lock = threading.Lock()
+
+# Held by whoever is listening to the user: main while it takes a command, a background
+# job while it waits for an answer. main skips a trigger it can't take the lock for, so
+# one utterance is never transcribed twice. A job holds it for one question and answer
+# at a time, so main gets a turn between its retries.
+dialog_lock = threading.RLock()
+
+
+def get_microphone_stream():
+    """Return the process-wide MicrophoneStream, starting its capture thread on first use."""
+    global _microphone_stream
+    with _microphone_lock:
+        if _microphone_stream is None or _microphone_stream.error is not None:
+            _microphone_stream = MicrophoneStream().start()
+        return _microphone_stream
+
+
+def capture_utterance(frames, vad, on_frame, start_timeout=None, max_seconds=None, end_silence_ms=END_SILENCE_MS):
+    """
+    Pull frames until one utterance has been spoken and the speaker went quiet.
+
+    Every frame that belongs to the utterance (including PRE_SPEECH_MS of lead-in) is
+    passed to on_frame as soon as it is read.
+
+    Args:
+        frames (iterable): 16 kHz 16-bit mono PCM frames of FRAME_BYTES.
+        vad: Object with is_speech(frame).
+        on_frame (callable): Receives each frame of the utterance.
+        start_timeout (float, optional): Seconds to wait for speech to start.
+        max_seconds (float, optional): Hard limit on the utterance length.
+        end_silence_ms (int): Trailing silence that ends the utterance.
+
+    Returns:
+        float: Seconds of audio in the utterance.
+
+    Raises:
+        sr.WaitTimeoutError: If nobody started speaking within start_timeout.
+    """
+    pre_speech = deque(maxlen=max(1, PRE_SPEECH_MS // FRAME_MS))
+    start_frames = max(1, START_SPEECH_MS // FRAME_MS)
+    end_frames = max(1, end_silence_ms // FRAME_MS)
+    max_frames = int(max_seconds * 1000 / FRAME_MS) if max_seconds else None
+
+    waited = 0
+    voiced_run = 0
+    started = False
+    silent_run = 0
+    captured = 0
+
+    for frame in frames:
+        speech = vad.is_speech(frame)
+        if not started:
+            waited += 1
+            pre_speech.append(frame)
+            voiced_run = voiced_run + 1 if speech else 0
+            if voiced_run >= start_frames:
+                started = True
+                for buffered in pre_speech:
+                    on_frame(buffered)
+                captured = len(pre_speech)
+                pre_speech.clear()
+            elif start_timeout is not None and waited * FRAME_MS / 1000 >= start_timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            continue
+
+        on_frame(frame)
+        captured += 1
+        silent_run = 0 if speech else silent_run + 1
+        if silent_run >= end_frames or (max_frames is not None and captured >= max_frames):
+            break
+
+    return captured * FRAME_MS / 1000
+
+
+def listen_and_transcribe(frames=None, vad=None, start_timeout=None, max_seconds=None, backend=None):
+    """
+    Transcribe one utterance from frames (default: the shared microphone stream from now,
+    including its pre-roll).
+
+    Frames are streamed into the recognizer while the user speaks, so only the last few
+    frames are left to decode when the trailing silence is detected.
+
+    Returns:
+        str: The transcribed text.
+
+    Raises:
+        sr.WaitTimeoutError, sr.UnknownValueError, sr.RequestError: Like sr.Recognizer.listen
+        and the recognize_* methods.
+    """
+    if frames is None:
+        frames = get_microphone_stream().frames()
+    vad = vad or make_vad()
+    stream = get_asr_backend(backend).open_stream()
+    seconds = capture_utterance(frames, vad, stream.accept, start_timeout, max_seconds)
+    start = time.perf_counter()
+    text = stream.finish()
+    print(f"Debug: {seconds:.1f}s utterance, transcribed {(time.perf_counter() - start) * 1000:.0f} ms after end of speech")
+    return text
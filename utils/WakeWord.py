@@ -0,0 +1,182 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+from utils.SpeechToText import get_asr_backend
+from utils.VoiceCapture import FRAME_MS, frame_energy, get_microphone_stream
+from utils.InputTrigger import LISTEN
+
+# Always-on wake word. A background thread follows the shared microphone stream and runs
+# a vosk recognizer restricted to the wake word, so "Jarvis, ..." starts a command the
+# same way the push-to-talk key does. To keep the CPU cost bounded, frames only reach
+# the recognizer while the energy gate is open (someone is making noise above the room's
+# noise floor); silence costs one RMS per frame.
+
+WAKE_WORD = os.getenv("JARVIS_WAKE_WORD", "jarvis").strip().lower()
+GATE_HANGOVER_MS = 400  # Keep decoding this long after the energy drops, so the word isn't cut off
+GATE_PRE_ROLL_MS = 210  # Frames from before the gate opened that are decoded too
+MAX_LAG_MS = 1000  # When decoding falls this far behind the microphone, skip ahead
+
+
+class WakeWordDetector:
+    """
+    Listens for WAKE_WORD on the microphone stream and fires LISTEN events into a trigger.
+
+    Pause it while a command is being captured and processed; resume() starts following
+    the stream again from the current moment.
+    """
+
+    name = "wakeword"
+
+    def __init__(self, trigger, word=WAKE_WORD, microphone=None):
+        backend = get_asr_backend("vosk")
+        if not hasattr(backend, "new_recognizer"):
+            raise RuntimeError("the wake word detector needs the vosk model")
+        self.backend = backend
+        self.trigger = trigger
+        self.word = word
+        self.microphone = microphone or get_microphone_stream()
+        self._active = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._stats_lock = threading.Lock()
+        self._stats = {"frames": 0, "decoded_frames": 0, "cpu_seconds": 0.0, "decode_cpu_seconds": 0.0,
+                       "wall_seconds": 0.0, "detections": 0}
+        self._latencies = deque(maxlen=50)
+
+    def start(self):
+        if self._thread is None:
+            self._active.set()
+            self._thread = threading.Thread(target=self._run, name="wake-word", daemon=True)
+            self._thread.start()
+        return self
+
+    def close(self):
+        self._stopped.set()
+        self._active.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def pause(self):
+        self._active.clear()
+
+    def resume(self):
+        self._active.set()
+
+    def _new_recognizer(self):
+        return self.backend.new_recognizer(grammar=[self.word, "[unk]"])
+
+    def _heard(self, result, key):
+        return self.word in json.loads(result).get(key, "").split()
+
+    def _run(self):
+        hangover_frames = max(1, GATE_HANGOVER_MS // FRAME_MS)
+        max_lag_frames = MAX_LAG_MS // FRAME_MS
+        while not self._stopped.is_set():
+            self._active.wait()
+            if self._stopped.is_set():
+                return
+            recognizer = self._new_recognizer()
+            pre_gate = deque(maxlen=max(1, GATE_PRE_ROLL_MS // FRAME_MS))
+            gate_open = 0  # Frames left before the gate closes
+            index = self.microphone.position()
+            last_tick = time.perf_counter()
+            for frame in self.microphone.frames(start=index, pre_roll_ms=0):
+                if not self._active.is_set() or self._stopped.is_set():
+                    break
+                cpu_start = time.thread_time()
+                index += 1
+
+                decoded = 0
+                detected = False
+                loud = frame_energy(frame) > self.microphone.noise.threshold
+                if loud or gate_open:
+                    gate_open = hangover_frames if loud else gate_open - 1
+                    batch = list(pre_gate) + [frame]
+                    pre_gate.clear()
+                    for chunk in batch:
+                        decoded += 1
+                        if recognizer.AcceptWaveform(chunk):
+                            detected = self._heard(recognizer.Result(), "text")
+                        else:
+                            detected = self._heard(recognizer.PartialResult(), "partial")
+                        if detected:
+                            break
+                    if not gate_open and not detected:
+                        # Gate closed: flush the utterance and start clean for the next one
+                        detected = self._heard(recognizer.FinalResult(), "text")
+                        recognizer = self._new_recognizer()
+                else:
+                    pre_gate.append(frame)
+
+                cpu = time.thread_time() - cpu_start
+                tick = time.perf_counter()
+                with self._stats_lock:
+                    self._stats["frames"] += 1
+                    self._stats["cpu_seconds"] += cpu
+                    self._stats["wall_seconds"] += tick - last_tick
+                    if decoded:
+                        self._stats["decoded_frames"] += decoded
+                        self._stats["decode_cpu_seconds"] += cpu
+                last_tick = tick
+
+                if detected:
+                    self._on_detected(index)
+                    break
+
+                lag = self.microphone.position() - index
+                if lag > max_lag_frames:
+                    print(f"Debug: Wake word detector is {lag * FRAME_MS} ms behind, skipping ahead")
+                    break  # Restart from the live position
+
+    def _on_detected(self, index):
+        now = time.monotonic()
+        mic = self.microphone
+        # Capture time of the frame that completed the word, from the ring's frame clock
+        heard_at = mic.last_frame_time - (mic.position() - index) * FRAME_MS / 1000 if mic.last_frame_time else now
+        latency = max(0.0, now - heard_at)
+        with self._stats_lock:
+            self._stats["detections"] += 1
+            self._latencies.append(latency)
+        print(f"Wake word detected ({latency * 1000:.0f} ms after it was spoken)")
+        self.pause()
+        # The command starts right after the wake word
+        self.trigger.fire(LISTEN, at=heard_at, source=self.name)
+
+    def stats(self):
+        """
+        CPU and latency figures for sizing always-on use.
+
+        Returns:
+            dict: Frame counts, average CPU per frame (all frames and decoded ones), CPU share
+            of one core while running, and detection latencies in ms.
+        """
+        with self._stats_lock:
+            s = dict(self._stats)
+            latencies = sorted(self._latencies)
+        frames = s["frames"] or 1
+        return {
+            "frames": s["frames"],
+            "decoded_frames": s["decoded_frames"],
+            "cpu_ms_per_frame": s["cpu_seconds"] * 1000 / frames,
+            "cpu_ms_per_decoded_frame": s["decode_cpu_seconds"] * 1000 / (s["decoded_frames"] or 1),
+            "cpu_percent": 100 * s["cpu_seconds"] / s["wall_seconds"] if s["wall_seconds"] else 0.0,
+            "detections": s["detections"],
+            "latency_ms_avg": 1000 * sum(latencies) / len(latencies) if latencies else None,
+            "latency_ms_max": 1000 * latencies[-1] if latencies else None
+        }
+
+
+def start_wake_word(trigger, word=WAKE_WORD):
+    """Start a WakeWordDetector feeding trigger, or return None when it can't run (disabled or no vosk)."""
+    if not word:
+        return None
+    try:
+        detector = WakeWordDetector(trigger, word).start()
+    except Exception as e:
+        print(f"Warning: Wake word disabled ({e}).")
+        return None
+    print(f"Say '{word}' to give a command hands-free.")
+    return detector